@@ -0,0 +1 @@
+# Management package for AI Subtitle Editor
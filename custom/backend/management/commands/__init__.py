@@ -0,0 +1 @@
+# Management commands for AI Subtitle Editor
@@ -0,0 +1,87 @@
+"""
+Management command to benchmark per-row PATCH-style updates vs the bulk edit path.
+"""
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from ...models.subtitle_models import SubtitleProject, SubtitleEntry
+from ...serializers.subtitle_serializers import SubtitleEntrySerializer, SubtitleEntryBulkItemSerializer
+from ...services.subtitle_service import SubtitleService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark a retime plus find-and-replace over every cue, per row vs in one bulk edit'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--counts', default='500,2000',
+            help='Comma-separated cue counts to edit'
+        )
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(
+            username='benchmark_user',
+            defaults={'email': 'benchmark@example.com'}
+        )
+        self.stdout.write(f"Database: {connection.vendor}")
+
+        for count in [int(c) for c in options['counts'].split(',') if c.strip()]:
+            # What each PATCH request does: fetch the row, validate, save (and bump the version)
+            project = self._create_project(user, count)
+            started = time.perf_counter()
+            for change in self._changes(project):
+                entry = SubtitleEntry.objects.select_related('project').get(pk=change.pop('id'))
+                serializer = SubtitleEntrySerializer(entry, data=change, partial=True)
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+            self._report('per-row', count, time.perf_counter() - started)
+            project.delete()
+
+            # What the bulk action does: one fetch, validate every item, one transaction
+            project = self._create_project(user, count)
+            started = time.perf_counter()
+            changes = self._changes(project)
+            rows = SubtitleEntry.objects.filter(project=project).in_bulk([c['id'] for c in changes])
+            updates = []
+            for change in changes:
+                entry = rows[change.pop('id')]
+                serializer = SubtitleEntryBulkItemSerializer(entry, data=change, partial=True)
+                serializer.is_valid(raise_exception=True)
+                updates.append((entry.id, serializer.validated_data))
+            SubtitleService.apply_bulk(project, [], updates, [])
+            self._report('bulk', count, time.perf_counter() - started)
+            project.delete()
+
+    def _create_project(self, user, count):
+        project = SubtitleProject.objects.create(
+            user=user,
+            name=f"benchmark-{count}",
+            video_file='videos/benchmark.mp4',
+            status='completed'
+        )
+        SubtitleService.save_transcription(project, [{
+            'start_time': i * 2.0,
+            'end_time': i * 2.0 + 1.5,
+            'text': f"Benchmark subtitle line {i}",
+        } for i in range(count)])
+        return project
+
+    def _changes(self, project):
+        """Shift every cue by half a second and replace a word in its text"""
+        return [{
+            'id': entry_id,
+            'start_time': start_time + 0.5,
+            'end_time': end_time + 0.5,
+            'text': text.replace('line', 'cue'),
+        } for entry_id, start_time, end_time, text in SubtitleEntry.objects.filter(
+            project=project
+        ).values_list('id', 'start_time', 'end_time', 'text')]
+
+    def _report(self, method, count, elapsed):
+        self.stdout.write(
+            f"{method:>10} {count:7d} edits  {elapsed:8.2f}s  "
+            + self.style.SUCCESS(f"{count / elapsed:10.0f} edits/sec")
+        )
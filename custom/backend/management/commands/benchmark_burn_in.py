@@ -0,0 +1,75 @@
+"""
+Management command to benchmark serial vs segment-parallel subtitle burn-in.
+"""
+import os
+import time
+import tempfile
+import ffmpeg
+from django.core.management.base import BaseCommand, CommandError
+from ...models.subtitle_models import SubtitleEntry
+from ...services.parallel_render import ParallelRenderer, probe_keyframes
+from ...services.render_service import RenderService
+from ...services.style_compiler import StyleCompiler
+from ...services.whisper_service import SubtitleFormatter
+
+
+class Command(BaseCommand):
+    help = 'Benchmark subtitle burn-in speed for a range of parallel chunk counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('video', help='Path to the video to render')
+        parser.add_argument(
+            '--chunks', default='1,2,4,8',
+            help='Comma-separated chunk counts; 1 is the serial path'
+        )
+        parser.add_argument(
+            '--project', type=int,
+            help='Burn in the cues of this project instead of synthetic ones'
+        )
+        parser.add_argument(
+            '--style', default='default',
+            help='Subtitle style preset'
+        )
+
+    def handle(self, *args, **options):
+        video_path = options['video']
+        if not os.path.exists(video_path):
+            raise CommandError(f"{video_path} does not exist")
+
+        duration = float(ffmpeg.probe(video_path)['format']['duration'])
+        keyframes = probe_keyframes(video_path)
+
+        if options['project'] is not None:
+            cues = list(SubtitleEntry.objects.filter(project_id=options['project']).order_by(
+                'start_time'
+            ).values_list(*SubtitleFormatter.CUE_FIELDS))
+        else:
+            # One two-second cue every three seconds
+            cues = [(i * 3.0, i * 3.0 + 2.0, f"Benchmark subtitle line {i}")
+                    for i in range(int(duration // 3))]
+
+        self.stdout.write(
+            f"{duration:.1f}s video, {len(keyframes)} keyframes, {len(cues)} cues, "
+            f"{os.cpu_count()} CPUs"
+        )
+
+        ass_header = StyleCompiler.compile_preset(options['style'])
+        baseline = None
+        with tempfile.TemporaryDirectory() as output_dir:
+            for count in [int(c) for c in options['chunks'].split(',') if c.strip()]:
+                output_path = os.path.join(output_dir, f"render_{count}.mp4")
+
+                started = time.perf_counter()
+                if count > 1:
+                    ParallelRenderer(count).render(
+                        video_path, cues, output_path, ass_header, duration, keyframes=keyframes
+                    )
+                else:
+                    RenderService.burn_in(video_path, cues, output_path, {'style': options['style']}, duration)
+                elapsed = time.perf_counter() - started
+
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f"{count:3d} chunks  {elapsed:8.2f}s  {duration / elapsed:6.2f}x realtime  "
+                    + self.style.SUCCESS(f"{baseline / elapsed:5.2f}x speedup")
+                )
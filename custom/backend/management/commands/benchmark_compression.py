@@ -0,0 +1,80 @@
+"""
+Management command to measure compress-to-size accuracy over a corpus of videos.
+"""
+import os
+import json
+import time
+import tempfile
+from django.core.management.base import BaseCommand, CommandError
+from ...services.compression_service import CompressionService
+
+
+class Command(BaseCommand):
+    help = 'Compress each video to a target size and report achieved size versus target'
+
+    def add_arguments(self, parser):
+        parser.add_argument('videos', nargs='+', help='Video files to compress')
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--target-mb', type=float, help='Target size in MiB for every video')
+        target.add_argument(
+            '--ratio', type=float,
+            help='Target size as a share of each input size, e.g. 0.5'
+        )
+        parser.add_argument('--profile', help='Encoder profile, defaults to RENDER_DEFAULT_PROFILE')
+        parser.add_argument('--audio-kbps', type=int, default=128)
+        parser.add_argument('--single-pass', action='store_true', help='Disable two-pass encoding')
+        parser.add_argument('--output', help='Write the report to this JSON file')
+
+    def handle(self, *args, **options):
+        missing = [path for path in options['videos'] if not os.path.exists(path)]
+        if missing:
+            raise CommandError(f"Not found: {', '.join(missing)}")
+
+        results = []
+        with tempfile.TemporaryDirectory(prefix='compression_bench_') as output_dir:
+            for index, video_path in enumerate(options['videos']):
+                target_mb = options['target_mb'] or (
+                    os.path.getsize(video_path) * options['ratio'] / (1024 * 1024)
+                )
+                output_path = os.path.join(output_dir, f"{index}.mp4")
+
+                started = time.perf_counter()
+                try:
+                    report = CompressionService.compress(
+                        video_path, output_path, target_mb, profile=options['profile'],
+                        audio_kbps=options['audio_kbps'], two_pass=not options['single_pass']
+                    )
+                except (ValueError, RuntimeError) as e:
+                    self.stdout.write(self.style.ERROR(f"{video_path}: {e}"))
+                    results.append({'video': video_path, 'error': str(e)})
+                    continue
+                report.update(video=video_path, seconds=round(time.perf_counter() - started, 2))
+                results.append(report)
+
+                style = self.style.SUCCESS if report['accuracy'] <= 1 else self.style.WARNING
+                self.stdout.write(
+                    f"{os.path.basename(video_path):40.40s} {report['target_bytes'] / 2**20:8.1f} MiB target  "
+                    f"{report['achieved_bytes'] / 2**20:8.1f} MiB  "
+                    + style(f"{100 * report['accuracy']:6.1f}%")
+                    + f"  {report['passes']} passes{'  (skipped)' if report['skipped'] else ''}"
+                )
+
+        encoded = [r for r in results if 'accuracy' in r and not r['skipped']]
+        summary = {'videos': len(results), 'encoded': len(encoded)}
+        if encoded:
+            accuracies = [r['accuracy'] for r in encoded]
+            summary.update(
+                mean_accuracy=round(sum(accuracies) / len(accuracies), 4),
+                mean_abs_error=round(sum(abs(a - 1) for a in accuracies) / len(accuracies), 4),
+                worst_overshoot=round(max(accuracies) - 1, 4),
+                over_target=sum(1 for a in accuracies if a > 1),
+            )
+            self.stdout.write(
+                f"Mean {100 * summary['mean_accuracy']:.1f}% of target, mean error "
+                f"{100 * summary['mean_abs_error']:.1f}%, {summary['over_target']} of {len(encoded)} over target"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump({'summary': summary, 'results': results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
@@ -0,0 +1,142 @@
+"""
+Management command to benchmark encoder profiles for speed, size and quality.
+"""
+import os
+import re
+import json
+import time
+import tempfile
+import subprocess
+from typing import Optional
+import ffmpeg
+from django.core.management.base import BaseCommand, CommandError
+from ...services.encoder_profiles import EncoderProfiles
+from ...services.style_compiler import StyleCompiler
+from ...services.video_service import VideoService
+from ...services.render_service import run_ffmpeg
+
+PSNR_PATTERN = re.compile(r'average:([\d.]+|inf)')
+VMAF_PATTERN = re.compile(r'VMAF score[:=]\s*([\d.]+)')
+
+
+class Command(BaseCommand):
+    help = 'Render a clip with each encoder profile and report fps, size and PSNR/VMAF'
+
+    def add_arguments(self, parser):
+        parser.add_argument('video', help='Path to the video fixture')
+        parser.add_argument(
+            '--profiles',
+            help='Comma-separated profile names, defaults to every profile'
+        )
+        parser.add_argument('--start', type=float, default=0.0, help='Clip start in seconds')
+        parser.add_argument('--duration', type=float, default=30.0, help='Clip length in seconds')
+        parser.add_argument('--output', help='Write the report to this JSON file')
+
+    def handle(self, *args, **options):
+        video_path = options['video']
+        if not os.path.exists(video_path):
+            raise CommandError(f"{video_path} does not exist")
+
+        profiles = EncoderProfiles.all()
+        names = [n.strip() for n in (options['profiles'] or ','.join(profiles)).split(',') if n.strip()]
+        unknown = [name for name in names if name not in profiles]
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(unknown)}")
+
+        probe = ffmpeg.probe(video_path)
+        stream = next(s for s in probe['streams'] if s['codec_type'] == 'video')
+        start = options['start']
+        duration = min(options['duration'], float(probe['format']['duration']) - start)
+        num, _, den = stream.get('avg_frame_rate', '0/1').partition('/')
+        frames = duration * float(num) / float(den or 1) if float(num) else 0
+
+        # One two-second cue every three seconds, so every profile encodes text edges
+        cues = [(i * 3.0, i * 3.0 + 2.0, f"Benchmark subtitle line {i}")
+                for i in range(int(duration // 3))]
+        has_vmaf = self._has_filter('libvmaf')
+
+        report = {
+            'video': os.path.abspath(video_path),
+            'start': start,
+            'duration': duration,
+            'resolution': f"{stream.get('width')}x{stream.get('height')}",
+            'cpus': os.cpu_count(),
+            'profiles': [],
+        }
+
+        with tempfile.TemporaryDirectory(prefix='profile_bench_') as work_dir:
+            subtitle_path = VideoService.write_subtitle_file(
+                cues, StyleCompiler.compile_preset('default'), os.path.join(work_dir, 'cues.ass')
+            )
+
+            # Lossless render of the same clip and subtitles: what every profile is scored against
+            reference_path = os.path.join(work_dir, 'reference.mkv')
+            self._render(video_path, subtitle_path, reference_path, start, duration,
+                         {'vcodec': 'libx264', 'preset': 'ultrafast', 'qp': 0})
+
+            for name in names:
+                output_path = os.path.join(work_dir, f"{name}.mp4")
+                elapsed = self._render(video_path, subtitle_path, output_path, start, duration,
+                                       EncoderProfiles.output_args(name))
+                size = os.path.getsize(output_path)
+
+                result = {
+                    'profile': name,
+                    'options': profiles[name],
+                    'seconds': round(elapsed, 3),
+                    'fps': round(frames / elapsed, 2) if elapsed else None,
+                    'realtime': round(duration / elapsed, 2) if elapsed else None,
+                    'bytes': size,
+                    'kbps': round(size * 8 / duration / 1000, 1) if duration else None,
+                    'psnr': self._score(output_path, reference_path, 'psnr', PSNR_PATTERN),
+                    'vmaf': self._score(output_path, reference_path, 'libvmaf', VMAF_PATTERN)
+                    if has_vmaf else None,
+                }
+                report['profiles'].append(result)
+
+                self.stdout.write(
+                    f"{name:14s} {result['seconds']:8.2f}s {result['fps'] or 0:8.1f} fps "
+                    f"{result['kbps'] or 0:9.1f} kbps  PSNR {result['psnr'] or 0:6.2f}"
+                    + (f"  VMAF {result['vmaf']:6.2f}" if result['vmaf'] is not None else '')
+                )
+
+        if not has_vmaf:
+            self.stdout.write(self.style.WARNING('ffmpeg has no libvmaf filter, VMAF not measured'))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    @staticmethod
+    def _render(video_path: str, subtitle_path: str, output_path: str, start: float,
+                duration: float, encoder: dict) -> float:
+        """Burn in the clip with the given encoder options and return the wall time"""
+        stream = VideoService.burn_in_stream(
+            video_path, subtitle_path, output_path,
+            start=start, duration=duration, audio=False, encoder=encoder
+        )
+        started = time.perf_counter()
+        run_ffmpeg(ffmpeg.compile(stream), duration)
+        return time.perf_counter() - started
+
+    @staticmethod
+    def _score(distorted_path: str, reference_path: str, metric: str, pattern) -> Optional[float]:
+        """Run a full-reference quality filter and parse its summary line"""
+        process = subprocess.run(
+            ['ffmpeg', '-nostats', '-i', distorted_path, '-i', reference_path,
+             '-lavfi', metric, '-f', 'null', '-'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        match = pattern.search(process.stderr)
+        if process.returncode != 0 or not match:
+            return None
+        return float('inf') if match.group(1) == 'inf' else float(match.group(1))
+
+    @staticmethod
+    def _has_filter(name: str) -> bool:
+        process = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-filters'], stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True
+        )
+        return any(line.split()[1:2] == [name] for line in process.stdout.splitlines())
@@ -0,0 +1,53 @@
+"""
+Management command to benchmark subtitle export throughput.
+"""
+import io
+import time
+from django.core.management.base import BaseCommand
+from ...models.subtitle_models import SubtitleEntry
+from ...services.whisper_service import SubtitleFormatter
+
+
+class Command(BaseCommand):
+    help = 'Benchmark SubtitleFormatter throughput on a synthetic or stored project'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cues', type=int, default=100000,
+            help='Number of synthetic cues to export'
+        )
+        parser.add_argument(
+            '--project', type=int,
+            help='Export a stored project instead of synthetic cues (reads from the database)'
+        )
+        parser.add_argument(
+            '--formats', default=','.join(SubtitleFormatter.FORMATS),
+            help='Comma-separated formats to benchmark'
+        )
+
+    def handle(self, *args, **options):
+        if options['project'] is not None:
+            count = SubtitleEntry.objects.filter(project_id=options['project']).count()
+        else:
+            count = options['cues']
+
+        for format_type in [f.strip() for f in options['formats'].split(',') if f.strip()]:
+            cues = self._cues(options)
+            output = io.StringIO()
+
+            started = time.perf_counter()
+            written = SubtitleFormatter.write_export(cues, format_type, output)
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{format_type:>4} {elapsed:8.3f}s  {written / (1024 * 1024):7.1f} MB  "
+                + self.style.SUCCESS(f"{count / elapsed:10.0f} cues/sec")
+            )
+
+    def _cues(self, options):
+        if options['project'] is not None:
+            return SubtitleEntry.objects.filter(project_id=options['project']).order_by(
+                'start_time'
+            ).values_list(*SubtitleFormatter.CUE_FIELDS).iterator(chunk_size=2000)
+        return ((i * 2.0, i * 2.0 + 1.5, f"Benchmark subtitle line number {i}")
+                for i in range(options['cues']))
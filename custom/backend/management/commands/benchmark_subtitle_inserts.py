@@ -0,0 +1,82 @@
+"""
+Management command to benchmark per-row vs bulk insertion of subtitle entries.
+"""
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from ...models.subtitle_models import SubtitleProject, SubtitleEntry
+from ...services.subtitle_service import SubtitleService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark rows/sec of per-row creates vs batched bulk inserts for subtitle entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--counts', default='1000,10000,50000',
+            help='Comma-separated segment counts to insert'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Rows per INSERT for the bulk path'
+        )
+        parser.add_argument(
+            '--skip-per-row', action='store_true',
+            help='Only benchmark the bulk path'
+        )
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(
+            username='benchmark_user',
+            defaults={'email': 'benchmark@example.com'}
+        )
+        self.stdout.write(f"Database: {connection.vendor}")
+
+        for count in [int(c) for c in options['counts'].split(',') if c.strip()]:
+            subtitles = [{
+                'start_time': i * 2.0,
+                'end_time': i * 2.0 + 1.5,
+                'text': f"Benchmark subtitle line {i}",
+                'confidence': -0.25,
+                'language': 'en',
+            } for i in range(count)]
+
+            if not options['skip_per_row']:
+                project = self._create_project(user, count)
+                started = time.perf_counter()
+                for subtitle in subtitles:
+                    SubtitleEntry.objects.create(
+                        project=project,
+                        start_time=subtitle['start_time'],
+                        end_time=subtitle['end_time'],
+                        text=subtitle['text'],
+                        confidence=subtitle['confidence'],
+                        language=subtitle['language']
+                    )
+                project.status = 'completed'
+                project.save()
+                self._report('per-row', count, time.perf_counter() - started)
+                project.delete()
+
+            project = self._create_project(user, count)
+            started = time.perf_counter()
+            SubtitleService.save_transcription(project, subtitles, batch_size=options['batch_size'])
+            self._report(f"bulk/{options['batch_size']}", count, time.perf_counter() - started)
+            project.delete()
+
+    def _create_project(self, user, count):
+        return SubtitleProject.objects.create(
+            user=user,
+            name=f"benchmark-{count}",
+            video_file='videos/benchmark.mp4',
+            status='processing'
+        )
+
+    def _report(self, method, count, elapsed):
+        self.stdout.write(
+            f"{method:>10} {count:7d} rows  {elapsed:8.2f}s  "
+            + self.style.SUCCESS(f"{count / elapsed:10.0f} rows/sec")
+        )
@@ -0,0 +1,58 @@
+"""
+Management command to benchmark chunked, parallel transcription against core count.
+"""
+import os
+import time
+from django.core.management.base import BaseCommand
+from ...services.audio_service import AudioService, SAMPLE_RATE
+from ...services.parallel_transcription import ParallelTranscriber
+from ...services.whisper_service import WhisperService
+
+
+class Command(BaseCommand):
+    help = 'Benchmark serial vs parallel Whisper transcription of a video'
+
+    def add_arguments(self, parser):
+        parser.add_argument('video', help='Path to the video to transcribe')
+        parser.add_argument('--model', default='base', help='Whisper model size')
+        parser.add_argument('--language', default='en', help='Language code')
+        parser.add_argument(
+            '--workers', default='2,4,8',
+            help='Comma-separated worker counts to benchmark'
+        )
+        parser.add_argument(
+            '--window-seconds', type=float, default=120.0,
+            help='Target window length for the parallel pipeline'
+        )
+
+    def handle(self, *args, **options):
+        audio = AudioService.load_audio(options['video'])
+        audio_seconds = len(audio) / SAMPLE_RATE
+        self.stdout.write(
+            f"Audio: {audio_seconds:.1f}s, CPUs available: {os.cpu_count()}"
+        )
+
+        # Serial baseline: one model.transcribe call over the whole file
+        service = WhisperService(options['model'])
+        started = time.perf_counter()
+        serial_segments = service.transcribe_audio(audio, options['language'])['segments']
+        serial_seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"serial     {serial_seconds:8.1f}s  {len(serial_segments):5d} segments  "
+            f"{audio_seconds / serial_seconds:6.1f}x realtime"
+        )
+
+        for workers in [int(w) for w in options['workers'].split(',') if w.strip()]:
+            transcriber = ParallelTranscriber(
+                options['model'],
+                workers=workers,
+                window_seconds=options['window_seconds']
+            )
+            started = time.perf_counter()
+            segments = transcriber.transcribe(audio, options['language'])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{workers:2d} workers {elapsed:8.1f}s  {len(segments):5d} segments  "
+                f"{audio_seconds / elapsed:6.1f}x realtime  "
+                + self.style.SUCCESS(f"{serial_seconds / elapsed:.2f}x speedup")
+            )
@@ -0,0 +1,121 @@
+"""
+Management command to hammer split and merge from concurrent threads and check the timeline.
+"""
+import random
+import threading
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from ...models.subtitle_models import SubtitleProject, SubtitleEntry
+from ...services.interval_index import IntervalIndex
+from ...services.subtitle_service import SubtitleService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Run concurrent splits and merges on one project and verify no cue was lost or duplicated'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cues', type=int, default=200, help='Cues in the test project')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent editors')
+        parser.add_argument('--operations', type=int, default=200, help='Operations per thread')
+        parser.add_argument('--seed', type=int, help='Random seed, for reproducible runs')
+        parser.add_argument('--keep', action='store_true', help='Keep the project afterwards')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite' and options['threads'] > 1:
+            self.stdout.write(self.style.WARNING(
+                'SQLite serializes writers with a file lock; expect "database is locked" errors'
+            ))
+
+        user, _ = User.objects.get_or_create(
+            username='benchmark_user',
+            defaults={'email': 'benchmark@example.com'}
+        )
+        project = SubtitleProject.objects.create(
+            user=user,
+            name='stress-split-merge',
+            video_file='videos/benchmark.mp4',
+            status='completed'
+        )
+        # Adjacent cues with gaps, so every split and merge is valid until a neighbour changes
+        SubtitleService.save_transcription(project, [{
+            'start_time': i * 2.0,
+            'end_time': i * 2.0 + 1.5,
+            'text': f"cue {i}",
+        } for i in range(options['cues'])])
+        first_start, last_end = 0.0, (options['cues'] - 1) * 2.0 + 1.5
+
+        rng = random.Random(options['seed'])
+        seeds = [rng.random() for _ in range(options['threads'])]
+        counts = {'splits': 0, 'merged': 0, 'rejected': 0, 'conflicts': 0}
+        lock = threading.Lock()
+        failures = []
+
+        def editor(seed: float):
+            local = random.Random(seed)
+            try:
+                for _ in range(options['operations']):
+                    ids = list(SubtitleEntry.objects.filter(project=project).values_list('id', flat=True))
+                    entry_id = local.choice(ids)
+                    try:
+                        if local.random() < 0.5:
+                            entry = SubtitleEntry.objects.get(pk=entry_id)
+                            SubtitleService.split_entry(
+                                entry_id, local.uniform(entry.start_time, entry.end_time)
+                            )
+                            result = ('splits', 1)
+                        else:
+                            _, merged_ids = SubtitleService.merge_entries(entry_id, local.randint(1, 3))
+                            result = ('merged', len(merged_ids))
+                    except SubtitleEntry.DoesNotExist:
+                        result = ('conflicts', 1)
+                    except ValueError:
+                        result = ('rejected', 1)
+                    with lock:
+                        counts[result[0]] += result[1]
+            except Exception as e:
+                with lock:
+                    failures.append(repr(e))
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=editor, args=(seed,)) for seed in seeds]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        project.refresh_from_db()
+        cues = list(SubtitleEntry.objects.filter(project=project).values_list('id', 'start_time', 'end_time'))
+        expected = options['cues'] + counts['splits'] - counts['merged']
+        overlaps = IntervalIndex(cues).overlaps()
+        starts = [start for _, start, _ in cues]
+        ends = [end for _, _, end in cues]
+
+        self.stdout.write(
+            f"{len(threads)} threads, {elapsed:.2f}s: {counts['splits']} splits, "
+            f"{counts['merged']} cues merged away, {counts['rejected']} rejected, "
+            f"{counts['conflicts']} conflicts"
+        )
+        problems = list(failures)
+        if len(cues) != expected:
+            problems.append(f"{len(cues)} cues, expected {expected}: rows were lost or duplicated")
+        if overlaps:
+            problems.append(f"{len(overlaps)} overlapping pairs, e.g. {overlaps[0]}")
+        if cues and (min(starts) != first_start or max(ends) != last_end):
+            problems.append(f"Timeline now spans {min(starts)}-{max(ends)}, expected {first_start}-{last_end}")
+        logged = list(project.changes.values_list('revision', flat=True))
+        if logged != list(range(1, project.content_version + 1)):
+            problems.append(f"Change log has {len(logged)} revisions, expected 1-{project.content_version}")
+
+        if not options['keep']:
+            project.delete()
+
+        if problems:
+            raise CommandError('Timeline inconsistent:\n' + '\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS(f"Timeline consistent: {len(cues)} cues"))
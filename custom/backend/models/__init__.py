@@ -1,2 +1,4 @@
 # Import models to register them with Django
-from .subtitle_models import SubtitleProject, SubtitleEntry, SubtitleStyle, SubtitleExport 
\ No newline at end of file
+from .subtitle_models import (
+    SubtitleProject, SubtitleEntry, SubtitleChange, SubtitleStyle, SubtitleExport, RenderJob
+) 
\ No newline at end of file
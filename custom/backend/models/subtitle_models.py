@@ -1,9 +1,15 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth import get_user_model
 from django.core.validators import FileExtensionValidator
 
 User = get_user_model()
 
+# Revisions of change log kept per project, and how often older ones are pruned
+CHANGE_LOG_RETENTION = 1000
+CHANGE_LOG_PRUNE_EVERY = 50
+
 class SubtitleProject(models.Model):
     """Model for managing subtitle projects"""
     
@@ -25,6 +31,12 @@ class SubtitleProject(models.Model):
     video_size = models.BigIntegerField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
     language = models.CharField(max_length=10, default='en')
+    skipped_audio_seconds = models.FloatField(
+        null=True, blank=True, help_text='Silent audio skipped by the VAD pre-pass, in seconds'
+    )
+    content_version = models.PositiveIntegerField(
+        default=0, help_text='Incremented whenever any of the project\'s subtitle entries change'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -38,8 +50,44 @@ class SubtitleProject(models.Model):
     
     @property
     def subtitle_count(self):
+        # Querysets annotated with entry_count (see SubtitleProjectViewSet)
+        # avoid a COUNT query per project
+        if hasattr(self, 'entry_count'):
+            return self.entry_count
         return self.subtitle_entries.count()
     
+    def bump_content_version(self, action='updated', deleted_ids=None):
+        """
+        Mark the project's subtitles as changed, invalidating cached exports
+        
+        The increment runs in SQL so concurrent edits never lose a bump, and
+        only content_version is written so stale in-memory fields are not.
+        Every bump is recorded in the change log, which keeps the last
+        SubtitleChange.retention() revisions. Writers bump before touching
+        entries, in the same transaction: the project row lock taken by the
+        increment orders them, so revisions become visible in order.
+        
+        Args:
+            action: SubtitleChange action recorded for this revision
+            deleted_ids: IDs of the entries this change deletes
+        
+        Returns:
+            The new content_version, to store as the revision of the changed entries
+        """
+        SubtitleProject.objects.filter(pk=self.pk).update(content_version=F('content_version') + 1)
+        self.refresh_from_db(fields=['content_version'])
+        SubtitleChange.objects.create(
+            project=self,
+            revision=self.content_version,
+            action=action,
+            deleted_ids=list(deleted_ids or [])
+        )
+        if self.content_version % CHANGE_LOG_PRUNE_EVERY == 0:
+            SubtitleChange.objects.filter(
+                project=self, revision__lte=self.content_version - SubtitleChange.retention()
+            ).delete()
+        return self.content_version
+    
     @property
     def is_processing(self):
         return self.status in ['uploading', 'processing']
@@ -58,6 +106,9 @@ class SubtitleEntry(models.Model):
     language = models.CharField(max_length=10, default='en')
     confidence = models.FloatField(null=True, blank=True, help_text='AI confidence score (0-1)')
     is_edited = models.BooleanField(default=False, help_text='Whether this subtitle has been manually edited')
+    revision = models.PositiveIntegerField(
+        default=0, help_text='Project content_version of the last change to this entry'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -65,10 +116,30 @@ class SubtitleEntry(models.Model):
         ordering = ['start_time']
         verbose_name = 'Subtitle Entry'
         verbose_name_plural = 'Subtitle Entries'
+        indexes = [
+            # Timeline reads, windows and neighbour lookups
+            models.Index(fields=['project', 'start_time'], name='entry_timeline_idx'),
+            # Delta sync: entries changed since a revision
+            models.Index(fields=['project', 'revision'], name='entry_revision_idx'),
+        ]
     
     def __str__(self):
         return f"{self.project.name} - {self.start_time}s to {self.end_time}s"
     
+    def save(self, *args, **kwargs):
+        # Bulk paths (bulk_create, QuerySet.update/delete) skip this and
+        # must call bump_content_version and set revision themselves
+        with transaction.atomic():
+            self.revision = self.project.bump_content_version('created' if self._state.adding else 'updated')
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = list(kwargs['update_fields']) + ['revision']
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            self.project.bump_content_version('deleted', deleted_ids=[self.pk])
+            return super().delete(*args, **kwargs)
+    
     @property
     def duration(self):
         return self.end_time - self.start_time
@@ -88,13 +159,69 @@ class SubtitleEntry(models.Model):
         secs = int(seconds % 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
+class SubtitleChange(models.Model):
+    """Change log of a project's subtitles, one row per content_version"""
+    
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+        ('split', 'Split'),
+        ('merged', 'Merged'),
+        ('bulk', 'Bulk edit'),
+        ('retimed', 'Retimed'),
+        ('transcribed', 'Transcribed'),
+    ]
+    
+    project = models.ForeignKey(SubtitleProject, on_delete=models.CASCADE, related_name='changes')
+    revision = models.PositiveIntegerField(help_text='content_version this change produced')
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    deleted_ids = models.JSONField(default=list, blank=True, help_text='IDs of the entries this change deleted')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['revision']
+        verbose_name = 'Subtitle Change'
+        verbose_name_plural = 'Subtitle Changes'
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'revision'], name='unique_change_revision'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project.name} - r{self.revision} {self.action}"
+    
+    @staticmethod
+    def retention():
+        """Number of most recent revisions a delta sync can start from"""
+        return getattr(settings, 'SUBTITLE_CHANGE_LOG_RETENTION', CHANGE_LOG_RETENTION)
+
 class SubtitleStyle(models.Model):
     """Model for subtitle styling options"""
     
+    BORDER_STYLE_CHOICES = [
+        (1, 'Outline and shadow'),
+        (3, 'Opaque box'),
+    ]
+    
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     css_class = models.CharField(max_length=100)
     is_active = models.BooleanField(default=True)
+    
+    # Rendering, compiled into an ASS [V4+ Styles] entry for burn-in
+    font_name = models.CharField(max_length=100, default='Arial')
+    font_size = models.PositiveIntegerField(default=24, help_text='Font size at a 288-line script resolution')
+    primary_color = models.CharField(max_length=20, default='white', help_text='Color name, #RRGGBB or #RRGGBBAA')
+    outline_color = models.CharField(max_length=20, default='black', help_text='Outline color, or box color for an opaque box')
+    back_color = models.CharField(max_length=20, default='black', help_text='Shadow color')
+    bold = models.BooleanField(default=False)
+    italic = models.BooleanField(default=False)
+    border_style = models.PositiveSmallIntegerField(choices=BORDER_STYLE_CHOICES, default=1)
+    outline = models.FloatField(default=2.0, help_text='Outline width, or box padding for an opaque box')
+    shadow = models.FloatField(default=1.0, help_text='Shadow offset')
+    alignment = models.PositiveSmallIntegerField(default=2, help_text='Numpad position (2 = bottom center)')
+    margin_v = models.PositiveIntegerField(default=10, help_text='Vertical margin')
+    version = models.PositiveIntegerField(default=1, help_text='Incremented on every change, keys compiled styles')
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -104,6 +231,11 @@ class SubtitleStyle(models.Model):
     
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            self.version += 1
+        super().save(*args, **kwargs)
 
 class SubtitleExport(models.Model):
     """Model for tracking subtitle exports"""
@@ -113,18 +245,84 @@ class SubtitleExport(models.Model):
         ('vtt', 'VTT'),
         ('ass', 'ASS'),
         ('txt', 'TXT'),
+        ('burn_in', 'Burned-in video'),
+        ('mux_mp4', 'MP4 with subtitle tracks'),
+        ('mux_mkv', 'MKV with subtitle tracks'),
     ]
     
     project = models.ForeignKey(SubtitleProject, on_delete=models.CASCADE, related_name='exports')
     format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
     file = models.FileField(upload_to='exports/')
     style = models.ForeignKey(SubtitleStyle, on_delete=models.SET_NULL, null=True, blank=True)
+    content_version = models.PositiveIntegerField(
+        default=0, help_text='Project content_version the file was rendered from'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', 'format', 'style', 'content_version'], name='export_cache_key_idx'),
+        ]
+        constraints = [
+            # One cached text export per version. Only enforced on PostgreSQL 15+
+            # (SQLite does not create it), so ExportService also locks the project
+            # on a miss and prunes duplicate rows.
+            # Render outputs are per job and stay unconstrained.
+            models.UniqueConstraint(
+                fields=['project', 'format', 'style', 'content_version'],
+                condition=models.Q(format__in=['srt', 'vtt', 'ass', 'txt']),
+                nulls_distinct=False,
+                name='unique_export_version'
+            ),
+        ]
         verbose_name = 'Subtitle Export'
         verbose_name_plural = 'Subtitle Exports'
     
     def __str__(self):
-        return f"{self.project.name} - {self.format.upper()} export" 
\ No newline at end of file
+        return f"{self.project.name} - {self.format.upper()} export"
+
+class RenderJob(models.Model):
+    """Model for queued video renders (burn-in, track mux) run by Celery workers"""
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    KIND_CHOICES = [
+        ('burn_in', 'Burn-in'),
+        ('mux', 'Subtitle track mux'),
+    ]
+    
+    project = models.ForeignKey(SubtitleProject, on_delete=models.CASCADE, related_name='render_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='burn_in')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    options = models.JSONField(default=dict, blank=True, help_text='Render parameters (style and colors, or container and languages)')
+    progress = models.FloatField(default=0.0, help_text='Percent complete (0-100)')
+    content_version = models.PositiveIntegerField(
+        default=0, help_text='Project content_version the render was started from'
+    )
+    cancel_requested = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    export = models.ForeignKey(
+        SubtitleExport, on_delete=models.SET_NULL, null=True, blank=True, related_name='render_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Render Job'
+        verbose_name_plural = 'Render Jobs'
+    
+    def __str__(self):
+        return f"{self.project.name} - {self.kind} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        return self.status in ['completed', 'failed', 'cancelled']
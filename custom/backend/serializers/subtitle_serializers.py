@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from ..models.subtitle_models import SubtitleProject, SubtitleEntry, SubtitleStyle, SubtitleExport
+from django.conf import settings
+from ..models.subtitle_models import SubtitleProject, SubtitleEntry, SubtitleStyle, SubtitleExport, RenderJob
+from ..services.style_compiler import ass_color
 
 class SubtitleProjectSerializer(serializers.ModelSerializer):
     """Serializer for SubtitleProject model"""
@@ -14,12 +16,13 @@ class SubtitleProjectSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'description', 'video_file', 'video_duration', 
             'video_size', 'status', 'language', 'subtitle_count', 
-            'is_processing', 'is_completed', 'user', 'created_at', 'updated_at'
+            'is_processing', 'is_completed', 'skipped_audio_seconds',
+            'content_version', 'user', 'created_at', 'updated_at'
         ]
         read_only_fields = [
             'id', 'video_duration', 'video_size', 'status', 
             'subtitle_count', 'is_processing', 'is_completed', 
-            'user', 'created_at', 'updated_at'
+            'skipped_audio_seconds', 'content_version', 'user', 'created_at', 'updated_at'
         ]
     
     def validate_name(self, value):
@@ -59,12 +62,12 @@ class SubtitleEntrySerializer(serializers.ModelSerializer):
         model = SubtitleEntry
         fields = [
             'id', 'project', 'project_name', 'start_time', 'end_time', 
-            'text', 'language', 'confidence', 'is_edited', 
+            'text', 'language', 'confidence', 'is_edited', 'revision',
             'formatted_start_time', 'formatted_end_time', 'duration',
             'created_at', 'updated_at'
         ]
         read_only_fields = [
-            'id', 'project_name', 'confidence', 'is_edited',
+            'id', 'project_name', 'confidence', 'is_edited', 'revision',
             'formatted_start_time', 'formatted_end_time', 'duration',
             'created_at', 'updated_at'
         ]
@@ -95,13 +98,90 @@ class SubtitleEntrySerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Subtitle text cannot be empty")
         return value.strip() if value else value
 
+class SubtitleEntryBulkItemSerializer(SubtitleEntrySerializer):
+    """One create or update of a bulk edit; the project comes from the request"""
+    
+    formatted_start_time = None
+    formatted_end_time = None
+    duration = None
+    project_name = None
+    
+    class Meta(SubtitleEntrySerializer.Meta):
+        fields = ['start_time', 'end_time', 'text', 'language']
+        read_only_fields = []
+    
+    def validate(self, data):
+        """Apply the entry rules to the times the row ends up with"""
+        if self.instance is not None:
+            super().validate({
+                'start_time': data.get('start_time', self.instance.start_time),
+                'end_time': data.get('end_time', self.instance.end_time),
+                'text': data.get('text'),
+            })
+            return data
+        return super().validate(data)
+
+class SubtitleBulkEditSerializer(serializers.Serializer):
+    """Serializer for bulk edits of one project's entries"""
+    
+    project = serializers.IntegerField()
+    create = serializers.ListField(child=serializers.DictField(), default=list)
+    update = serializers.ListField(
+        child=serializers.DictField(), default=list,
+        help_text='Each item has the id of the entry and the fields to change'
+    )
+    delete = serializers.ListField(child=serializers.IntegerField(), default=list)
+    revision = serializers.IntegerField(
+        min_value=0, required=False,
+        help_text='Project revision the client last saw; rejected with 409 if an entry changed since'
+    )
+    
+    def validate_update(self, value):
+        """Every update names one entry, once"""
+        ids = [item.get('id') for item in value]
+        if not all(isinstance(entry_id, int) for entry_id in ids):
+            raise serializers.ValidationError("Every update needs an integer id")
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError("An entry can only be updated once per request")
+        return value
+    
+    def validate(self, data):
+        """Validate the batch as a whole"""
+        total = len(data['create']) + len(data['update']) + len(data['delete'])
+        limit = getattr(settings, 'SUBTITLE_BULK_MAX_ITEMS', 5000)
+        if total > limit:
+            raise serializers.ValidationError(f"At most {limit} changes per request")
+        
+        if {item['id'] for item in data['update']} & set(data['delete']):
+            raise serializers.ValidationError("An entry cannot be both updated and deleted")
+        return data
+
 class SubtitleStyleSerializer(serializers.ModelSerializer):
     """Serializer for SubtitleStyle model"""
     
     class Meta:
         model = SubtitleStyle
-        fields = ['id', 'name', 'description', 'css_class', 'is_active', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id', 'name', 'description', 'css_class', 'is_active',
+            'font_name', 'font_size', 'primary_color', 'outline_color', 'back_color',
+            'bold', 'italic', 'border_style', 'outline', 'shadow', 'alignment',
+            'margin_v', 'version', 'created_at'
+        ]
+        read_only_fields = ['id', 'version', 'created_at']
+    
+    def validate(self, data):
+        """Validate that the colors can be compiled into an ASS style"""
+        for field in ('primary_color', 'outline_color', 'back_color'):
+            if field in data:
+                try:
+                    ass_color(data[field])
+                except ValueError as e:
+                    raise serializers.ValidationError({field: str(e)})
+        
+        if 'alignment' in data and not 1 <= data['alignment'] <= 9:
+            raise serializers.ValidationError({'alignment': 'Alignment must be between 1 and 9'})
+        
+        return data
 
 class SubtitleExportSerializer(serializers.ModelSerializer):
     """Serializer for SubtitleExport model"""
@@ -114,10 +194,10 @@ class SubtitleExportSerializer(serializers.ModelSerializer):
         model = SubtitleExport
         fields = [
             'id', 'project', 'project_name', 'format', 'file', 'file_url',
-            'style', 'style_name', 'created_at'
+            'style', 'style_name', 'content_version', 'created_at'
         ]
         read_only_fields = [
-            'id', 'project_name', 'file_url', 'style_name', 'created_at'
+            'id', 'project_name', 'file_url', 'style_name', 'content_version', 'created_at'
         ]
     
     def get_file_url(self, obj):
@@ -128,6 +208,26 @@ class SubtitleExportSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.file.url)
         return None
 
+class RenderJobSerializer(serializers.ModelSerializer):
+    """Serializer for RenderJob model"""
+    
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = RenderJob
+        fields = [
+            'id', 'project', 'kind', 'status', 'options', 'progress',
+            'content_version', 'cancel_requested', 'error', 'export',
+            'download_url', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        """Download URL of the rendered video once the job has completed"""
+        if obj.export_id:
+            return f"/api/subtitle/exports/{obj.export_id}/download/"
+        return None
+
 class SubtitleProjectListSerializer(serializers.ModelSerializer):
     """Simplified serializer for project lists"""
     
@@ -151,7 +251,7 @@ class SubtitleEntryListSerializer(serializers.ModelSerializer):
         model = SubtitleEntry
         fields = [
             'id', 'start_time', 'end_time', 'text', 'formatted_start_time',
-            'formatted_end_time', 'is_edited', 'confidence'
+            'formatted_end_time', 'is_edited', 'confidence', 'revision'
         ]
 
 class VideoUploadSerializer(serializers.Serializer):
@@ -171,8 +271,9 @@ class VideoUploadSerializer(serializers.Serializer):
 class SubtitleExportRequestSerializer(serializers.Serializer):
     """Serializer for subtitle export requests"""
     
-    format = serializers.ChoiceField(choices=['srt', 'vtt', 'txt'], default='srt')
+    format = serializers.ChoiceField(choices=['srt', 'vtt', 'txt', 'ass'], default='srt')
     style_id = serializers.IntegerField(required=False, allow_null=True)
+    stream = serializers.BooleanField(default=False)
     
     def validate_style_id(self, value):
         """Validate style ID if provided"""
@@ -187,9 +288,126 @@ class SubtitleSplitRequestSerializer(serializers.Serializer):
     """Serializer for subtitle split requests"""
     
     split_time = serializers.FloatField()
+    revision = serializers.IntegerField(
+        min_value=0, required=False,
+        help_text='Project revision the client last saw; rejected with 409 if an entry changed since'
+    )
     
     def validate_split_time(self, value):
         """Validate split time"""
         if value <= 0:
             raise serializers.ValidationError("Split time must be positive")
-        return value 
\ No newline at end of file
+        return value
+
+class SubtitleMergeRequestSerializer(serializers.Serializer):
+    """Serializer for subtitle merge requests"""
+    
+    count = serializers.IntegerField(
+        min_value=1, max_value=100, default=1,
+        help_text='Number of following subtitles to merge into this one'
+    )
+    revision = serializers.IntegerField(
+        min_value=0, required=False,
+        help_text='Project revision the client last saw; rejected with 409 if an entry changed since'
+    )
+
+class SubtitleSyncRequestSerializer(serializers.Serializer):
+    """Serializer for delta sync requests"""
+    
+    since = serializers.IntegerField(min_value=0, help_text='Last project revision the client applied')
+    limit = serializers.IntegerField(
+        min_value=1, max_value=10000, required=False,
+        help_text='Most changed entries to return before asking for a full reload'
+    )
+
+class SubtitleRetimeRequestSerializer(serializers.Serializer):
+    """Serializer for project-wide retimes; validated data has the scale and offset to apply"""
+    
+    # Nominal NTSC rates to their exact values, so long videos do not drift
+    NTSC_RATES = {23.976: 24000 / 1001, 29.97: 30000 / 1001, 59.94: 60000 / 1001}
+    
+    mode = serializers.ChoiceField(choices=['offset', 'stretch', 'framerate'])
+    offset = serializers.FloatField(required=False, help_text='Seconds added to every time')
+    anchors = serializers.ListField(
+        child=serializers.ListField(child=serializers.FloatField(min_value=0), min_length=2, max_length=2),
+        min_length=2, max_length=2, required=False,
+        help_text='Two [current_time, new_time] pairs; times in between are stretched linearly'
+    )
+    from_fps = serializers.FloatField(min_value=1, required=False)
+    to_fps = serializers.FloatField(min_value=1, required=False)
+    language = serializers.CharField(max_length=10, required=False)
+    
+    def validate(self, data):
+        """Turn the mode's parameters into new_time = time * scale + offset"""
+        mode = data['mode']
+        if mode == 'offset':
+            if 'offset' not in data:
+                raise serializers.ValidationError({'offset': "Required for an offset retime"})
+            data['scale'] = 1.0
+        elif mode == 'stretch':
+            if 'anchors' not in data:
+                raise serializers.ValidationError({'anchors': "Required for a stretch retime"})
+            (old_a, new_a), (old_b, new_b) = data['anchors']
+            if old_a == old_b or new_a == new_b:
+                raise serializers.ValidationError({'anchors': "Anchors must be at different times"})
+            data['scale'] = (new_b - new_a) / (old_b - old_a)
+            if data['scale'] <= 0:
+                raise serializers.ValidationError({'anchors': "Anchors cannot reverse the timeline"})
+            data['offset'] = new_a - old_a * data['scale']
+        else:
+            if 'from_fps' not in data or 'to_fps' not in data:
+                raise serializers.ValidationError("from_fps and to_fps are required for a framerate retime")
+            from_fps = self.NTSC_RATES.get(round(data['from_fps'], 3), data['from_fps'])
+            to_fps = self.NTSC_RATES.get(round(data['to_fps'], 3), data['to_fps'])
+            # Frame n plays at n / fps, so times scale by the inverse ratio of the rates
+            data['scale'] = from_fps / to_fps
+            data['offset'] = 0.0
+        return data
+
+class SubtitleEmbedRequestSerializer(serializers.Serializer):
+    """Serializer for subtitle burn-in requests"""
+    
+    COLOR_PATTERN = r'^([A-Za-z]+|#[0-9A-Fa-f]{6})$'
+    
+    style = serializers.ChoiceField(choices=['default', 'modern', 'bold', 'minimal'], default='default')
+    style_id = serializers.IntegerField(
+        required=False, allow_null=True,
+        help_text='SubtitleStyle to render with instead of a preset'
+    )
+    font_size = serializers.IntegerField(min_value=8, max_value=200, default=24)
+    font_color = serializers.RegexField(COLOR_PATTERN, default='white')
+    outline_color = serializers.RegexField(COLOR_PATTERN, default='black')
+    chunks = serializers.IntegerField(
+        min_value=1, max_value=32, required=False,
+        help_text='Render keyframe-aligned chunks in this many parallel ffmpeg processes'
+    )
+    smart = serializers.BooleanField(
+        required=False,
+        help_text='Only re-encode the parts of the video that have subtitles'
+    )
+    
+    def validate_style_id(self, value):
+        """Validate style ID if provided"""
+        if value is not None and not SubtitleStyle.objects.filter(id=value, is_active=True).exists():
+            raise serializers.ValidationError("Invalid style ID")
+        return value
+
+class SubtitlePreviewRequestSerializer(SubtitleEmbedRequestSerializer):
+    """Serializer for low-resolution burn-in previews"""
+    
+    timestamp = serializers.FloatField(min_value=0, help_text='Centre of the preview in seconds')
+    seconds = serializers.FloatField(min_value=1, max_value=10, default=4)
+    height = serializers.ChoiceField(choices=[240, 360, 480], default=360)
+
+class SubtitleMuxRequestSerializer(serializers.Serializer):
+    """Serializer for soft-subtitle mux requests"""
+    
+    container = serializers.ChoiceField(choices=['mp4', 'mkv'], default='mp4')
+    languages = serializers.ListField(
+        child=serializers.CharField(max_length=10), required=False, allow_empty=False,
+        help_text='Languages to add as tracks, defaults to every language with subtitles'
+    )
+    subtitle_format = serializers.ChoiceField(
+        choices=['srt', 'ass'], default='srt',
+        help_text='Track format in MKV; MP4 tracks are always mov_text'
+    )
\ No newline at end of file
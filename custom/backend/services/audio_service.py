@@ -0,0 +1,156 @@
+import math
+import logging
+from typing import Iterator, Optional, Tuple
+import numpy as np
+import ffmpeg
+
+logger = logging.getLogger(__name__)
+
+# Whisper expects 16 kHz mono float32 audio
+SAMPLE_RATE = 16000
+# Bytes read from ffmpeg per pipe read (one second of s16le audio)
+CHUNK_BYTES = SAMPLE_RATE * 2
+
+
+class AudioService:
+    """Service for decoding video audio straight into memory for Whisper"""
+
+    @staticmethod
+    def probe_duration(video_path: str) -> Optional[float]:
+        """Return media duration in seconds, or None when unknown"""
+        try:
+            probe = ffmpeg.probe(video_path)
+            return float(probe['format']['duration'])
+        except Exception as e:
+            logger.warning(f"Could not probe duration of {video_path}: {e}")
+            return None
+
+    @staticmethod
+    def iter_pcm(video_path: str, chunk_bytes: int = CHUNK_BYTES) -> Iterator[np.ndarray]:
+        """
+        Decode audio with ffmpeg and yield raw int16 PCM chunks from its stdout
+
+        Args:
+            video_path: Path to video file
+            chunk_bytes: Size of each pipe read in bytes (must be even)
+
+        Yields:
+            int16 NumPy arrays of mono 16 kHz samples
+        """
+        process = (
+            ffmpeg
+            .input(video_path)
+            .output('pipe:', format='s16le', acodec='pcm_s16le', ac=1, ar=str(SAMPLE_RATE))
+            .global_args('-nostdin', '-loglevel', 'error')
+            .run_async(pipe_stdout=True, pipe_stderr=True)
+        )
+
+        try:
+            while True:
+                data = process.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                # ffmpeg only emits whole samples, a trailing odd byte means truncation
+                usable = len(data) - (len(data) % 2)
+                if usable:
+                    yield np.frombuffer(data[:usable], dtype=np.int16)
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            returncode = process.wait()
+
+        if returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg failed to decode audio from {video_path}: "
+                f"{stderr.decode('utf-8', errors='replace').strip()}"
+            )
+
+    @staticmethod
+    def load_audio(video_path: str, duration: Optional[float] = None) -> np.ndarray:
+        """
+        Decode the whole audio track into a preallocated float32 buffer
+
+        Args:
+            video_path: Path to video file
+            duration: Known duration in seconds, probed when omitted
+
+        Returns:
+            float32 NumPy array in [-1, 1] at 16 kHz, ready for model.transcribe
+        """
+        if duration is None:
+            duration = AudioService.probe_duration(video_path)
+
+        # Size the buffer from the container duration (plus one second of slack)
+        # so the samples are written in place instead of concatenated
+        capacity = int(math.ceil(duration * SAMPLE_RATE)) + SAMPLE_RATE if duration else SAMPLE_RATE * 60
+        audio = np.empty(capacity, dtype=np.float32)
+        filled = 0
+
+        for chunk in AudioService.iter_pcm(video_path):
+            end = filled + len(chunk)
+            if end > len(audio):
+                grown = np.empty(max(end, len(audio) * 2), dtype=np.float32)
+                grown[:filled] = audio[:filled]
+                audio = grown
+            np.multiply(chunk, 1.0 / 32768.0, out=audio[filled:end], casting='unsafe')
+            filled = end
+
+        logger.info(f"Decoded {filled / SAMPLE_RATE:.1f}s of audio from {video_path}")
+        return audio[:filled]
+
+    @staticmethod
+    def iter_windows(video_path: str, window_seconds: float = 30.0) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Decode audio into a fixed-size ring buffer and yield it window by window
+
+        Peak memory is one window regardless of video length. The yielded array
+        is reused for the next window, so callers must consume or copy it before
+        advancing the iterator.
+
+        Args:
+            video_path: Path to video file
+            window_seconds: Window length in seconds
+
+        Yields:
+            Tuples of (window start time in seconds, float32 samples)
+        """
+        window_samples = int(window_seconds * SAMPLE_RATE)
+        window = np.empty(window_samples, dtype=np.float32)
+        filled = 0
+        window_start = 0
+
+        for chunk in AudioService.iter_pcm(video_path):
+            offset = 0
+            while offset < len(chunk):
+                take = min(window_samples - filled, len(chunk) - offset)
+                np.multiply(chunk[offset:offset + take], 1.0 / 32768.0,
+                            out=window[filled:filled + take], casting='unsafe')
+                filled += take
+                offset += take
+
+                if filled == window_samples:
+                    yield window_start / SAMPLE_RATE, window
+                    window_start += filled
+                    filled = 0
+
+        if filled:
+            yield window_start / SAMPLE_RATE, window[:filled]
+
+    @staticmethod
+    def frame_rms(audio: np.ndarray, frame_seconds: float = 0.02) -> np.ndarray:
+        """
+        Root-mean-square energy of consecutive non-overlapping frames
+
+        Args:
+            audio: float32 samples at 16 kHz
+            frame_seconds: Frame length in seconds
+
+        Returns:
+            float32 array with one RMS value per frame (trailing partial frame dropped)
+        """
+        frame_samples = max(1, int(frame_seconds * SAMPLE_RATE))
+        frame_count = len(audio) // frame_samples
+        frames = audio[:frame_count * frame_samples].reshape(frame_count, frame_samples)
+        # einsum sums the squares per frame without materializing a squared copy
+        return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_samples)
@@ -0,0 +1,260 @@
+import os
+import glob
+import time
+import fcntl
+import shutil
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+import ffmpeg
+from django.conf import settings
+from .encoder_profiles import EncoderProfiles
+from .render_service import run_ffmpeg
+
+logger = logging.getLogger(__name__)
+
+# Encoders whose -pass/-passlogfile two-pass mode is used; others get one pass
+TWO_PASS_CODECS = ('libx264', 'libvpx-vp9')
+
+# Share of the target kept free for container overhead (moov/index, padding)
+CONTAINER_OVERHEAD = 0.02
+
+# Below this video bitrate a target is rejected rather than encoded unwatchably
+MIN_VIDEO_KBPS = 100
+
+
+class CompressionService:
+    """Compress videos to a target file size"""
+
+    @staticmethod
+    def stats_prefix(input_path: str, encoder: Dict) -> str:
+        """
+        Passlog prefix for the first-pass stats of an input and encoder
+
+        The stats depend on the frames and the encoder settings but not on
+        the target bitrate (the second pass rescales them), so a re-run with
+        another target size reuses them.
+        """
+        stat = os.stat(input_path)
+        options = ','.join(f"{k}={encoder[k]}" for k in sorted(encoder))
+        key = hashlib.sha1(
+            f"{os.path.abspath(input_path)}|{stat.st_size}|{stat.st_mtime_ns}|{options}".encode('utf-8')
+        ).hexdigest()
+        directory = getattr(settings, 'COMPRESSION_STATS_DIR',
+                            os.path.join(settings.MEDIA_ROOT, 'compression_stats'))
+        os.makedirs(directory, exist_ok=True)
+        CompressionService.prune_stats(directory)
+        return os.path.join(directory, key)
+
+    @staticmethod
+    def prune_stats(directory: str) -> int:
+        """Delete first-pass stats unused for COMPRESSION_STATS_MAX_AGE_DAYS, and abandoned pass-one directories"""
+        cutoff = time.time() - getattr(settings, 'COMPRESSION_STATS_MAX_AGE_DAYS', 7) * 86400
+        removed = 0
+        for path in glob.glob(os.path.join(directory, '*')):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    if os.path.isdir(path):
+                        shutil.rmtree(path, ignore_errors=True)
+                    else:
+                        os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    @staticmethod
+    @contextmanager
+    def stats_lock(prefix: str) -> Iterator[None]:
+        """Hold an exclusive file lock on a passlog prefix, across processes"""
+        with open(f"{prefix}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def first_pass(input_path: str, prefix: str, video_bps: int, encoder: Dict,
+                   run: Callable) -> bool:
+        """
+        Make sure complete first-pass stats exist for a prefix
+
+        Pass one writes into a temporary directory and its logs are renamed
+        into place only after ffmpeg succeeds, so a killed pass never leaves
+        a truncated log that later runs would trust. The prefix lock makes
+        concurrent compressions of the same input run pass one once.
+
+        Args:
+            input_path: Source video
+            prefix: Passlog prefix from stats_prefix
+            video_bps: Bitrate for pass one
+            encoder: Encoder output arguments
+            run: Runs an ffmpeg stream with progress
+
+        Returns:
+            True if existing stats were reused
+        """
+        with CompressionService.stats_lock(prefix):
+            # libx264 and libvpx-vp9 both write <prefix>-0.log
+            if os.path.exists(f"{prefix}-0.log"):
+                for path in glob.glob(f"{prefix}-*"):
+                    # Reuse counts as use for prune_stats
+                    os.utime(path)
+                return True
+
+            work_dir = tempfile.mkdtemp(dir=os.path.dirname(prefix), prefix='pass1_')
+            try:
+                temp_prefix = os.path.join(work_dir, 'stats')
+                run(ffmpeg.input(input_path).output(
+                    os.devnull, f='null', an=None, video_bitrate=video_bps, **encoder,
+                    **{'pass': 1, 'passlogfile': temp_prefix}
+                ))
+                # The .log goes last: its presence marks the stats complete
+                logs = sorted(glob.glob(f"{temp_prefix}-*"), key=lambda path: path.endswith('.log'))
+                for path in logs:
+                    os.replace(path, prefix + path[len(temp_prefix):])
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            return False
+
+    @staticmethod
+    def audio_plan(probe: Dict, audio_kbps: int) -> Optional[Dict]:
+        """
+        How the audio is written and the bits per second it takes
+
+        AAC audio already at or under the budget is stream-copied and costs
+        its own bitrate; anything else is encoded to AAC at audio_kbps.
+
+        Returns:
+            None without an audio stream, else {'args': ..., 'bps': ...}
+        """
+        stream = next((s for s in probe['streams'] if s['codec_type'] == 'audio'), None)
+        if stream is None:
+            return None
+        bit_rate = int(stream.get('bit_rate') or 0)
+        if stream.get('codec_name') == 'aac' and 0 < bit_rate <= audio_kbps * 1000:
+            return {'args': {'acodec': 'copy'}, 'bps': bit_rate}
+        return {'args': {'acodec': 'aac', 'audio_bitrate': f"{audio_kbps}k"}, 'bps': audio_kbps * 1000}
+
+    @staticmethod
+    def compress(input_path: str, output_path: str, target_size_mb: float,
+                 profile: Optional[str] = None, audio_kbps: int = 128, two_pass: bool = True,
+                 tolerance: float = 0.02,
+                 progress_callback: Optional[Callable[[float], None]] = None) -> Dict:
+        """
+        Compress a video so the output file fits target_size_mb
+
+        The audio budget and container overhead are reserved first and the
+        rest of the target is spent on video. Two-pass encoding spends it
+        where the video needs it; the first-pass stats are kept in
+        COMPRESSION_STATS_DIR so re-runs on the same input skip pass one.
+        An output that still overshoots by more than tolerance gets one
+        corrective second pass at a proportionally lower bitrate.
+
+        Args:
+            input_path: Source video
+            output_path: Compressed video
+            target_size_mb: Target size in MiB
+            profile: Encoder profile for codec and speed settings (its CRF is not used)
+            audio_kbps: Audio budget when the audio has to be re-encoded
+            two_pass: Use two-pass encoding when the profile's encoder supports it
+            tolerance: Allowed overshoot as a share of the target
+            progress_callback: Called with the percent complete
+
+        Returns:
+            Report with target_bytes, achieved_bytes, accuracy (achieved / target),
+            video_kbps, audio_kbps, passes, stats_cached and skipped
+
+        Raises:
+            ValueError: The target leaves less than MIN_VIDEO_KBPS for video
+        """
+        target_bytes = int(target_size_mb * 1024 * 1024)
+        input_bytes = os.path.getsize(input_path)
+        report = {'target_bytes': target_bytes, 'input_bytes': input_bytes}
+
+        if input_bytes <= target_bytes:
+            # Already fits: copy (or remux into another container) without encoding
+            if os.path.splitext(input_path)[1].lower() == os.path.splitext(output_path)[1].lower():
+                shutil.copyfile(input_path, output_path)
+            else:
+                ffmpeg.input(input_path).output(output_path, c='copy').overwrite_output().run(quiet=True)
+            return CompressionService._finish(report, output_path, skipped=True, passes=0)
+
+        probe = ffmpeg.probe(input_path)
+        duration = float(probe['format']['duration'])
+        audio = CompressionService.audio_plan(probe, audio_kbps)
+        audio_bps = audio['bps'] if audio else 0
+
+        video_bps = int(target_bytes * 8 * (1 - CONTAINER_OVERHEAD) / duration) - audio_bps
+        if video_bps < MIN_VIDEO_KBPS * 1000:
+            raise ValueError(
+                f"{target_size_mb} MB leaves {max(video_bps, 0) // 1000} kbps for "
+                f"{duration:.0f}s of video, below {MIN_VIDEO_KBPS} kbps"
+            )
+
+        # Rate control is by bitrate here, so the profile's CRF is not used
+        encoder = EncoderProfiles.output_args(profile)
+        encoder.pop('crf', None)
+        two_pass = two_pass and encoder.get('vcodec') in TWO_PASS_CODECS
+        audio_args = audio['args'] if audio else {'an': None}
+
+        def run(stream, offset: float, share: float):
+            def on_progress(percent: float):
+                if progress_callback:
+                    progress_callback(offset + share * percent / 100)
+            run_ffmpeg(ffmpeg.compile(stream.overwrite_output()), duration, on_progress)
+
+        def encode(bps: int, offset: float, share: float):
+            run(ffmpeg.input(input_path).output(
+                output_path, video_bitrate=bps, **encoder, **audio_args, **pass_args
+            ), offset, share)
+
+        passes = 0
+        stats_cached = False
+        pass_args = {}
+        if two_pass:
+            prefix = CompressionService.stats_prefix(input_path, encoder)
+            stats_cached = CompressionService.first_pass(
+                input_path, prefix, video_bps, encoder, lambda stream: run(stream, 0.0, 50.0)
+            )
+            if not stats_cached:
+                passes += 1
+            pass_args = {'pass': 2, 'passlogfile': prefix}
+
+        offset = 50.0 if passes else 0.0
+        encode(video_bps, offset, 100.0 - offset)
+        passes += 1
+
+        overshoot = os.path.getsize(output_path) / target_bytes - 1
+        if overshoot > tolerance:
+            # Scale the video share down by the overshoot, keeping the audio as is
+            achieved_video_bps = os.path.getsize(output_path) * 8 / duration - audio_bps
+            video_bps = int(video_bps * video_bps / max(achieved_video_bps, 1) / (1 + tolerance / 2))
+            logger.info(f"Compression overshot by {100 * overshoot:.1f}%, re-encoding at {video_bps // 1000} kbps")
+            encode(video_bps, 100.0, 0.0)
+            passes += 1
+
+        if progress_callback:
+            progress_callback(100.0)
+
+        report.update(
+            duration=duration,
+            video_kbps=video_bps // 1000,
+            audio_kbps=audio_bps // 1000,
+            stats_cached=stats_cached,
+        )
+        return CompressionService._finish(report, output_path, skipped=False, passes=passes)
+
+    @staticmethod
+    def _finish(report: Dict, output_path: str, **fields) -> Dict:
+        report.update(fields)
+        report['achieved_bytes'] = os.path.getsize(output_path)
+        report['accuracy'] = round(report['achieved_bytes'] / report['target_bytes'], 4)
+        logger.info(
+            f"Compressed {output_path}: {report['achieved_bytes']} bytes for a "
+            f"{report['target_bytes']} byte target ({100 * report['accuracy']:.1f}%)"
+        )
+        return report
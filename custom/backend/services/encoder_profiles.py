@@ -0,0 +1,81 @@
+import logging
+from typing import Dict, Optional
+from django.apps import apps
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# ffmpeg output options per named profile. Settings can override or add
+# profiles (RENDER_ENCODER_PROFILES), e.g. to use a hardware encoder.
+ENCODER_PROFILES = {
+    'fast-preview': {'vcodec': 'libx264', 'preset': 'veryfast', 'crf': 26},
+    'balanced': {'vcodec': 'libx264', 'preset': 'medium', 'crf': 21},
+    'archive': {'vcodec': 'libx264', 'preset': 'slow', 'crf': 17, 'tune': 'film'},
+    # Style previews: a few low-resolution seconds, rendered while the user waits
+    'preview': {'vcodec': 'libx264', 'preset': 'ultrafast', 'crf': 28},
+}
+
+# Subscription plan name (lower case) -> profile; overridable with RENDER_PLAN_PROFILES
+PLAN_PROFILES = {
+    'basic': 'fast-preview',
+    'starter': 'fast-preview',
+    'professional': 'balanced',
+    'enterprise': 'archive',
+}
+
+DEFAULT_PROFILE = 'balanced'
+
+
+class EncoderProfiles:
+    """Named encoder settings for renders, selected by plan tier"""
+
+    @staticmethod
+    def all() -> Dict[str, Dict]:
+        """Every profile, with settings overrides applied"""
+        profiles = {name: dict(options) for name, options in ENCODER_PROFILES.items()}
+        for name, options in getattr(settings, 'RENDER_ENCODER_PROFILES', {}).items():
+            profiles[name] = dict(profiles.get(name, {}), **options)
+        return profiles
+
+    @staticmethod
+    def default_name() -> str:
+        return getattr(settings, 'RENDER_DEFAULT_PROFILE', DEFAULT_PROFILE)
+
+    @staticmethod
+    def output_args(name: Optional[str] = None) -> Dict:
+        """
+        ffmpeg-python output options for a profile
+
+        Args:
+            name: Profile name, defaults to RENDER_DEFAULT_PROFILE
+
+        Raises:
+            ValueError: Unknown profile
+        """
+        name = name or EncoderProfiles.default_name()
+        profiles = EncoderProfiles.all()
+        if name not in profiles:
+            raise ValueError(f"Unknown encoder profile: {name}")
+        return dict(profiles[name])
+
+    @staticmethod
+    def for_user(user) -> str:
+        """
+        Profile for a user's active subscription plan
+
+        Users without an active subscription, and deployments without the
+        subscriptions app, get RENDER_DEFAULT_PROFILE.
+        """
+        try:
+            Subscription = apps.get_model('subscriptions', 'Subscription')
+        except LookupError:
+            return EncoderProfiles.default_name()
+
+        subscription = Subscription.objects.filter(
+            user=user, status__in=['active', 'trialing']
+        ).order_by('-current_period_end').first()
+        if subscription is None:
+            return EncoderProfiles.default_name()
+
+        plan_profiles = getattr(settings, 'RENDER_PLAN_PROFILES', PLAN_PROFILES)
+        return plan_profiles.get(subscription.plan_name.lower(), EncoderProfiles.default_name())
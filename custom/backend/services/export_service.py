@@ -0,0 +1,139 @@
+import os
+import hashlib
+import logging
+import tempfile
+from typing import Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from ..models.subtitle_models import SubtitleProject, SubtitleEntry, SubtitleExport
+from .whisper_service import SubtitleFormatter
+from .style_compiler import StyleCompiler
+from .subtitle_service import SubtitleService
+
+logger = logging.getLogger(__name__)
+
+
+class ExportService:
+    """Render subtitle exports once per project content version"""
+
+    @staticmethod
+    def ass_header(format_type: str, style_id: Optional[int]) -> Optional[str]:
+        """Compiled header of the style an export is rendered with, None for the default"""
+        if format_type != 'ass' or style_id is None:
+            return None
+        return StyleCompiler.header_for_options({'style_id': style_id})
+
+    @staticmethod
+    def artifact_name(project: SubtitleProject, format_type: str, style_id: Optional[int],
+                      ass_header: Optional[str] = None) -> str:
+        """Storage name (relative to MEDIA_ROOT) of an export artifact"""
+        style = style_id if style_id is not None else 'default'
+        if ass_header is not None:
+            # The compiled header changes with the style version
+            style = f"{style}_{hashlib.sha1(ass_header.encode('utf-8')).hexdigest()[:12]}"
+        return f"exports/{project.id}_{style}_v{project.content_version}.{format_type}"
+
+    @staticmethod
+    def get_or_render(project: SubtitleProject, format_type: str,
+                      style_id: Optional[int] = None) -> Tuple[SubtitleExport, bool]:
+        """
+        Return the export for the project's current content, rendering it if needed
+
+        Exports are keyed on (project, format, style, content_version), so a
+        repeated request reuses the stored file and row until an entry is
+        created, edited, split, merged or deleted. ASS exports with a style
+        also carry a hash of the compiled header in their file name, so
+        editing the style renders them again.
+
+        Args:
+            project: Project to export
+            format_type: One of SubtitleFormatter.FORMATS
+            style_id: Optional SubtitleStyle the export is rendered with
+
+        Returns:
+            (export, created) where created is False on a cache hit
+        """
+        project.refresh_from_db(fields=['content_version'])
+        version = project.content_version
+        ass_header = ExportService.ass_header(format_type, style_id)
+        name = ExportService.artifact_name(project, format_type, style_id, ass_header)
+        path = os.path.join(settings.MEDIA_ROOT, name)
+
+        exports = SubtitleExport.objects.filter(
+            project=project, format=format_type, style_id=style_id, content_version=version
+        ).order_by('pk')
+        export = exports.first()
+        if export is not None and export.file.name == name and os.path.exists(path):
+            logger.debug(f"Export cache hit for project {project.id} {format_type} v{version}")
+            return export, False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Render to a unique temporary file so concurrent misses never share one,
+        # and a concurrent download never sees a partial file. Both render the
+        # same content under the same name, so the last rename wins harmlessly.
+        cues = SubtitleEntry.objects.filter(project=project).order_by('start_time').values_list(
+            *SubtitleFormatter.CUE_FIELDS
+        ).iterator(chunk_size=2000)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                SubtitleFormatter.write_export(cues, format_type, f, ass_header)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with transaction.atomic():
+            # Concurrent misses queue on the project lock and share one row.
+            # unique_export_version cannot be relied on for that: it does not
+            # cover a NULL style on SQLite or PostgreSQL before 15.
+            SubtitleService.lock_project(project.id)
+            export = exports.first()
+            if export is None:
+                export = SubtitleExport.objects.create(
+                    project=project,
+                    format=format_type,
+                    style_id=style_id,
+                    content_version=version,
+                    file=name
+                )
+            elif export.file.name != name:
+                # Rendered from an older version of the style
+                previous = export.file.path
+                export.file.name = name
+                export.save(update_fields=['file'])
+                if os.path.exists(previous):
+                    os.remove(previous)
+            ExportService.prune(project, format_type, style_id, keep=export)
+
+        logger.info(f"Rendered {format_type} export for project {project.id} v{version}")
+        return export, True
+
+    @staticmethod
+    def prune(project: SubtitleProject, format_type: str, style_id: Optional[int],
+              keep: SubtitleExport) -> int:
+        """
+        Delete exports of the same format and style rendered from older content
+
+        Only older versions are removed, so a request that read the project
+        before a concurrent edit never deletes the newer export. Duplicate
+        rows of keep's version, possible where the project lock is a no-op,
+        are removed too.
+
+        Returns:
+            Number of export rows removed
+        """
+        stale = SubtitleExport.objects.filter(
+            project=project, format=format_type, style_id=style_id,
+            content_version__lte=keep.content_version
+        ).exclude(pk=keep.pk)
+
+        removed = 0
+        for export in stale:
+            if export.file.name != keep.file.name and os.path.exists(export.file.path):
+                os.remove(export.file.path)
+            export.delete()
+            removed += 1
+        return removed
@@ -0,0 +1,109 @@
+import bisect
+import heapq
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from ..models.subtitle_models import SubtitleProject, SubtitleEntry
+
+logger = logging.getLogger(__name__)
+
+
+class IntervalIndex:
+    """Cues of a project in sorted arrays, for bisect lookups by time"""
+
+    _cache: Dict[Tuple, 'IntervalIndex'] = {}
+    _lock = threading.Lock()
+    MAX_CACHED = 64
+
+    def __init__(self, cues: List[Tuple[int, float, float]]):
+        """
+        Build the index
+
+        Args:
+            cues: (id, start_time, end_time) tuples
+        """
+        cues = sorted(cues, key=lambda cue: (cue[1], cue[0]))
+        self.ids = [cue[0] for cue in cues]
+        self.starts = [cue[1] for cue in cues]
+        self.ends = [cue[2] for cue in cues]
+        self.positions = {entry_id: i for i, entry_id in enumerate(self.ids)}
+
+        # Running maximum of the end times: every cue that can contain a time
+        # lies after the last position whose prefix maximum is <= that time
+        self.max_ends = []
+        latest = float('-inf')
+        for end in self.ends:
+            latest = max(latest, end)
+            self.max_ends.append(latest)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def for_project(cls, project: SubtitleProject, language: Optional[str] = None) -> 'IntervalIndex':
+        """
+        Index of a project's cues, built once per content version
+
+        Args:
+            project: Project whose cues are indexed (its content_version is the cache key)
+            language: Only index cues in this language
+        """
+        key = (project.id, project.content_version, language)
+        with cls._lock:
+            index = cls._cache.get(key)
+        if index is not None:
+            return index
+
+        entries = SubtitleEntry.objects.filter(project=project)
+        if language:
+            entries = entries.filter(language=language)
+        index = cls(list(entries.values_list('id', 'start_time', 'end_time')))
+
+        with cls._lock:
+            if len(cls._cache) >= cls.MAX_CACHED:
+                cls._cache.clear()
+            cls._cache[key] = index
+        logger.debug(f"Built interval index of {len(index)} cues for project {project.id}")
+        return index
+
+    def at(self, time: float) -> List[int]:
+        """IDs of the cues showing at a time (start <= time < end), in timeline order"""
+        found = []
+        i = bisect.bisect_right(self.starts, time) - 1
+        while i >= 0 and self.max_ends[i] > time:
+            if self.ends[i] > time:
+                found.append(self.ids[i])
+            i -= 1
+        found.reverse()
+        return found
+
+    def neighbours(self, entry_id: int) -> Tuple[Optional[int], Optional[int]]:
+        """IDs of the cues before and after an entry in timeline order"""
+        i = self.positions[entry_id]
+        previous_id = self.ids[i - 1] if i > 0 else None
+        next_id = self.ids[i + 1] if i + 1 < len(self.ids) else None
+        return previous_id, next_id
+
+    def around(self, time: float) -> Tuple[Optional[int], Optional[int]]:
+        """IDs of the last cue starting at or before a time and the first one starting after it"""
+        i = bisect.bisect_right(self.starts, time)
+        previous_id = self.ids[i - 1] if i > 0 else None
+        next_id = self.ids[i] if i < len(self.ids) else None
+        return previous_id, next_id
+
+    def overlaps(self) -> List[Tuple[int, int, float]]:
+        """
+        Every pair of overlapping cues
+
+        Returns:
+            (earlier_id, later_id, seconds of overlap) in timeline order
+        """
+        pairs = []
+        active = []  # heap of (end, position) of cues not yet ended
+        for i, start in enumerate(self.starts):
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for end, j in sorted(active, key=lambda item: item[1]):
+                pairs.append((self.ids[j], self.ids[i], min(end, self.ends[i]) - start))
+            heapq.heappush(active, (self.ends[i], i))
+        return pairs
@@ -0,0 +1,176 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import whisper
+from django.conf import settings
+from celery.signals import worker_process_init
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str, str]
+
+
+class WhisperModelRegistry:
+    """Process-wide cache of loaded Whisper models with LRU eviction"""
+
+    def __init__(self, memory_budget_mb: int = 4096):
+        """
+        Initialize the registry
+
+        Args:
+            memory_budget_mb: Maximum resident size of all cached models in MB
+        """
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self._models: "OrderedDict[ModelKey, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_name: str = "base", device: Optional[str] = None,
+            dtype: Optional[str] = None):
+        """
+        Return a loaded Whisper model, loading it on first use
+
+        Args:
+            model_name: Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
+            device: Torch device ('cpu', 'cuda'); auto-detected when omitted
+            dtype: 'float32' or 'float16'; float16 is only honoured on CUDA
+
+        Returns:
+            Loaded Whisper model
+        """
+        key = self._make_key(model_name, device, dtype)
+
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                entry['hits'] += 1
+                self.hits += 1
+                return entry['model']
+
+            self.misses += 1
+            entry = self._load(key)
+            self._models[key] = entry
+            self._evict(keep=key)
+            return entry['model']
+
+    def preload(self, model_names: List[str], device: Optional[str] = None,
+                dtype: Optional[str] = None):
+        """Load the given models ahead of the first task"""
+        for model_name in model_names:
+            try:
+                self.get(model_name, device, dtype)
+            except Exception as e:
+                logger.error(f"Failed to preload Whisper model {model_name}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and per-model load time and resident size"""
+        with self._lock:
+            models = [{
+                'model_name': key[0],
+                'device': key[1],
+                'dtype': key[2],
+                'load_seconds': entry['load_seconds'],
+                'resident_bytes': entry['resident_bytes'],
+                'hits': entry['hits'],
+            } for key, entry in self._models.items()]
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'resident_bytes': sum(m['resident_bytes'] for m in models),
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'models': models,
+            }
+
+    def clear(self):
+        """Drop every cached model"""
+        with self._lock:
+            self._models.clear()
+
+    def _make_key(self, model_name: str, device: Optional[str],
+                  dtype: Optional[str]) -> ModelKey:
+        """Resolve defaults so equivalent requests share a cache entry"""
+        if device is None:
+            import torch
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        if dtype is None or device == "cpu":
+            dtype = "float32"
+        return (model_name, device, dtype)
+
+    def _load(self, key: ModelKey) -> Dict[str, Any]:
+        """Load a model from disk and measure it"""
+        model_name, device, dtype = key
+        logger.info(f"Loading Whisper model: {model_name} ({device}, {dtype})")
+
+        started = time.perf_counter()
+        model = whisper.load_model(model_name, device=device)
+        if dtype == "float16":
+            model = model.half()
+        load_seconds = time.perf_counter() - started
+
+        resident_bytes = self._resident_size(model)
+        logger.info(
+            f"Whisper model {model_name} loaded in {load_seconds:.2f}s "
+            f"({resident_bytes / (1024 * 1024):.0f} MB resident)"
+        )
+
+        return {
+            'model': model,
+            'load_seconds': load_seconds,
+            'resident_bytes': resident_bytes,
+            'hits': 0,
+        }
+
+    def _evict(self, keep: ModelKey):
+        """Evict least recently used models until the budget is respected"""
+        total = sum(entry['resident_bytes'] for entry in self._models.values())
+
+        for key in list(self._models.keys()):
+            if total <= self.memory_budget_bytes:
+                break
+            if key == keep:
+                continue
+            entry = self._models.pop(key)
+            total -= entry['resident_bytes']
+            self.evictions += 1
+            logger.info(f"Evicted Whisper model {key[0]} ({key[1]}, {key[2]}) from registry")
+
+    @staticmethod
+    def _resident_size(model) -> int:
+        """Size in bytes of the model parameters and buffers"""
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+
+_registry: Optional[WhisperModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> WhisperModelRegistry:
+    """Return the registry shared by everything running in this process"""
+    global _registry
+
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = WhisperModelRegistry(
+                    memory_budget_mb=getattr(settings, 'WHISPER_MODEL_MEMORY_BUDGET_MB', 4096)
+                )
+    return _registry
+
+
+@worker_process_init.connect
+def preload_whisper_models(**kwargs):
+    """Load the configured models once when a Celery worker process starts"""
+    model_names = getattr(settings, 'WHISPER_PRELOAD_MODELS', ['base'])
+    get_model_registry().preload(
+        model_names,
+        device=getattr(settings, 'WHISPER_DEVICE', None),
+        dtype=getattr(settings, 'WHISPER_DTYPE', None)
+    )
@@ -0,0 +1,191 @@
+import os
+import logging
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import ffmpeg
+from .video_service import VideoService
+from .render_service import RenderCancelled, run_ffmpeg
+
+logger = logging.getLogger(__name__)
+
+Cue = Tuple[float, float, str]
+
+
+def probe_keyframes(video_path: str) -> List[float]:
+    """Timestamps (seconds) of the keyframes of the first video stream"""
+    probe = ffmpeg.probe(
+        video_path, select_streams='v:0', skip_frame='nokey',
+        show_entries='frame=best_effort_timestamp_time'
+    )
+    keyframes = []
+    for frame in probe.get('frames', []):
+        timestamp = frame.get('best_effort_timestamp_time')
+        if timestamp not in (None, 'N/A'):
+            keyframes.append(float(timestamp))
+    return sorted(keyframes)
+
+
+class ParallelRenderer:
+    """Burn subtitles into keyframe-aligned chunks of a video in parallel ffmpeg processes"""
+
+    def __init__(self, chunks: Optional[int] = None, threads_per_chunk: Optional[int] = None,
+                 min_chunk_seconds: float = 10.0):
+        """
+        Initialize the renderer
+
+        Args:
+            chunks: Number of chunks rendered at once, defaults to the CPU count
+            threads_per_chunk: Encoder threads per ffmpeg process, defaults to
+                an even split of the cores
+            min_chunk_seconds: Chunks are merged until they are at least this long
+        """
+        self.chunks = chunks or os.cpu_count() or 1
+        self.threads_per_chunk = threads_per_chunk or max(1, (os.cpu_count() or 1) // self.chunks)
+        self.min_chunk_seconds = min_chunk_seconds
+
+    def plan_chunks(self, keyframes: List[float], duration: float) -> List[Tuple[float, float]]:
+        """
+        Cut the timeline at the keyframe nearest each even split point
+
+        Every chunk starts on a keyframe, so seeking to it decodes no extra
+        frames and the chunk's first frame is the same frame as in the source.
+
+        Returns:
+            (start, end) in seconds, covering [0, duration]
+        """
+        cuts = [0.0]
+        for index in range(1, self.chunks):
+            target = duration * index / self.chunks
+            candidates = [k for k in keyframes if k - cuts[-1] >= self.min_chunk_seconds
+                          and duration - k >= self.min_chunk_seconds]
+            if not candidates:
+                break
+            nearest = min(candidates, key=lambda k: abs(k - target))
+            if nearest > cuts[-1]:
+                cuts.append(nearest)
+        cuts.append(duration)
+        return list(zip(cuts[:-1], cuts[1:]))
+
+    @staticmethod
+    def slice_cues(cues: List[Cue], start: float, end: float) -> List[Cue]:
+        """
+        Cues visible in [start, end), shifted so the chunk starts at 0
+
+        Shifting is done in whole centiseconds, the resolution of the ASS
+        file the serial path renders from, so cue times are the serial ones
+        minus the chunk start rounded to that resolution.
+        """
+        start_cs = round(start * 100)
+        end_cs = round(end * 100)
+        sliced = []
+        for cue_start, cue_end, text in cues:
+            cue_start_cs = round(cue_start * 100)
+            cue_end_cs = round(cue_end * 100)
+            if cue_end_cs <= start_cs or cue_start_cs >= end_cs:
+                continue
+            sliced.append((
+                max(0, cue_start_cs - start_cs) / 100,
+                (cue_end_cs - start_cs) / 100,
+                text
+            ))
+        return sliced
+
+    def render(self, video_path: str, cues: Iterable[Cue], output_path: str, ass_header: str,
+               duration: float, keyframes: Optional[List[float]] = None,
+               progress_callback: Optional[Callable[[float], None]] = None,
+               should_cancel: Optional[Callable[[], bool]] = None,
+               encoder: Optional[Dict] = None):
+        """
+        Render the burned-in video chunk by chunk and join the chunks
+
+        Video chunks are encoded without audio and concatenated with the
+        concat demuxer; the source audio is muxed back in the same -c copy
+        pass, so nothing is encoded twice.
+
+        Args:
+            video_path: Source video
+            cues: (start_time, end_time, text) tuples in timeline order
+            output_path: Rendered MP4
+            ass_header: Compiled style header from StyleCompiler
+            duration: Source duration in seconds
+            keyframes: Keyframe timestamps, probed when not given
+            progress_callback: Called with the overall percent complete
+            should_cancel: Polled while the chunks render; True stops every
+                ffmpeg process
+            encoder: Encoder options from EncoderProfiles.output_args()
+
+        Callbacks are only invoked from the calling thread, so they may use
+        the database connection.
+
+        Raises:
+            RenderCancelled: The render was cancelled
+        """
+        cues = list(cues)
+        if keyframes is None:
+            keyframes = probe_keyframes(video_path)
+        chunks = self.plan_chunks(keyframes, duration)
+        logger.info(f"Rendering {duration:.1f}s of video as {len(chunks)} chunks")
+
+        abort = threading.Event()
+        done = [0.0] * len(chunks)
+
+        with tempfile.TemporaryDirectory(prefix='render_') as work_dir:
+            def render_chunk(index: int) -> str:
+                start, end = chunks[index]
+                subtitle_path = os.path.join(work_dir, f"chunk_{index:04d}.ass")
+                chunk_path = os.path.join(work_dir, f"chunk_{index:04d}.mp4")
+                VideoService.write_subtitle_file(self.slice_cues(cues, start, end), ass_header, subtitle_path)
+
+                def on_progress(percent: float):
+                    done[index] = (end - start) * percent / 100
+
+                args = ffmpeg.compile(VideoService.burn_in_stream(
+                    video_path, subtitle_path, chunk_path,
+                    start=start, duration=end - start, audio=False,
+                    threads=self.threads_per_chunk, encoder=encoder
+                ))
+                run_ffmpeg(args, end - start, on_progress, abort.is_set, cancel_poll_seconds=0)
+                return chunk_path
+
+            chunk_paths = [None] * len(chunks)
+            with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = {pool.submit(render_chunk, index): index for index in range(len(chunks))}
+                pending = set(futures)
+                try:
+                    while pending:
+                        finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            chunk_paths[futures[future]] = future.result()
+                        if progress_callback:
+                            progress_callback(min(100.0, 100.0 * sum(done) / duration))
+                        if pending and should_cancel and should_cancel():
+                            raise RenderCancelled()
+                except BaseException:
+                    # Stop the other ffmpeg processes before re-raising
+                    abort.set()
+                    raise
+
+            list_path = os.path.join(work_dir, 'chunks.txt')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                for chunk_path in chunk_paths:
+                    f.write(f"file '{chunk_path}'\n")
+
+            self.concat(list_path, video_path, output_path)
+
+    @staticmethod
+    def concat(list_path: str, audio_source: str, output_path: str):
+        """Join the rendered chunks and the source audio without re-encoding"""
+        video = ffmpeg.input(list_path, f='concat', safe=0)
+        source = ffmpeg.input(audio_source)
+        args = ffmpeg.compile(ffmpeg.output(
+            video['v:0'], source['a?'], output_path, c='copy', movflags='+faststart'
+        ).overwrite_output())
+        result = subprocess.run(args, stdin=subprocess.DEVNULL, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg concat exited with status {result.returncode}: "
+                f"{result.stderr.decode(errors='replace')[-2000:]}"
+            )
@@ -0,0 +1,197 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from .audio_service import AudioService, SAMPLE_RATE
+from .model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+# Model used by the pool worker this module is running in
+_worker_model = None
+
+
+def _init_worker(model_name: str, device: Optional[str], dtype: Optional[str], threads: int):
+    """Pool initializer: pin torch threads and load the model once per process"""
+    global _worker_model
+    import torch
+    torch.set_num_threads(threads)
+    _worker_model = get_model_registry().get(model_name, device, dtype)
+
+
+def _transcribe_window(window: Dict, samples: np.ndarray, language: str) -> List[Dict]:
+    """Transcribe one window in a pool worker and shift it onto the full timeline"""
+    result = _worker_model.transcribe(
+        samples,
+        language=language,
+        word_timestamps=True,
+        verbose=None
+    )
+
+    offset = window['start'] / SAMPLE_RATE
+    segments = []
+    for segment in result['segments']:
+        segment['start'] += offset
+        segment['end'] += offset
+        for word in segment.get('words', []):
+            word['start'] += offset
+            word['end'] += offset
+        segments.append(segment)
+    return segments
+
+
+class ParallelTranscriber:
+    """
+    Transcribe long audio as overlapping windows across a process pool
+
+    The pool needs a process that may start children. Celery's default
+    prefork pool runs tasks in daemonic processes, which may not, so
+    parallel transcription only runs under the threads or solo pool (or
+    outside Celery); see available().
+    """
+
+    def __init__(self, model_name: str = "base", workers: Optional[int] = None,
+                 device: Optional[str] = None, dtype: Optional[str] = None,
+                 window_seconds: float = 120.0, overlap_seconds: float = 2.0,
+                 search_seconds: float = 10.0):
+        """
+        Initialize the transcriber
+
+        Args:
+            model_name: Whisper model size
+            workers: Number of worker processes, defaults to the CPU count
+            device: Torch device for the workers
+            dtype: Model precision for the workers
+            window_seconds: Target window length before snapping to silence
+            overlap_seconds: Audio shared with each neighbouring window
+            search_seconds: How far around the target cut to look for silence
+        """
+        self.model_name = model_name
+        self.workers = workers or os.cpu_count() or 1
+        self.device = device
+        self.dtype = dtype
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.search_seconds = search_seconds
+
+    @staticmethod
+    def available() -> bool:
+        """Whether this process may start a worker pool (daemonic processes may not)"""
+        return not multiprocessing.current_process().daemon
+
+    def plan_windows(self, audio: np.ndarray, frame_seconds: float = 0.02) -> List[Dict]:
+        """
+        Split audio at the quietest frame near each target cut
+
+        Returns:
+            Windows as dicts with 'start'/'end' (decoded range, overlap included)
+            and 'keep_start'/'keep_end' (range whose segments this window owns),
+            all in samples
+        """
+        total = len(audio)
+        window_samples = int(self.window_seconds * SAMPLE_RATE)
+        search_samples = int(self.search_seconds * SAMPLE_RATE)
+        overlap_samples = int(self.overlap_seconds * SAMPLE_RATE)
+        frame_samples = int(frame_seconds * SAMPLE_RATE)
+
+        rms = AudioService.frame_rms(audio, frame_seconds)
+
+        cuts = [0]
+        while total - cuts[-1] > window_samples + search_samples:
+            target = cuts[-1] + window_samples
+            first = max(cuts[-1] + window_samples // 2, target - search_samples) // frame_samples
+            last = min(total, target + search_samples) // frame_samples
+            quietest = first + int(np.argmin(rms[first:last]))
+            cuts.append(quietest * frame_samples + frame_samples // 2)
+        cuts.append(total)
+
+        return [{
+            'start': max(0, keep_start - overlap_samples),
+            'end': min(total, keep_end + overlap_samples),
+            'keep_start': keep_start,
+            'keep_end': keep_end,
+        } for keep_start, keep_end in zip(cuts[:-1], cuts[1:])]
+
+    def transcribe(self, audio: np.ndarray, language: str = "en",
+                   progress_callback: Optional[Callable[[float, float, int], None]] = None) -> List[Dict]:
+        """
+        Transcribe audio in parallel and stitch the windows back together
+
+        Args:
+            audio: 16 kHz float32 samples
+            language: Language code
+            progress_callback: Called with (seconds done, total seconds, segments
+                emitted) each time a window finishes
+
+        Returns:
+            Whisper-style segments on the original timeline, in order
+        """
+        if not self.available():
+            raise RuntimeError(
+                'Parallel transcription cannot start a process pool from a daemonic process; '
+                'run the Celery worker with --pool=threads or --pool=solo'
+            )
+
+        windows = self.plan_windows(audio)
+        workers = min(self.workers, len(windows))
+        # Split the cores between workers so torch does not oversubscribe them
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+        logger.info(
+            f"Transcribing {len(audio) / SAMPLE_RATE:.1f}s of audio as "
+            f"{len(windows)} windows on {workers} workers"
+        )
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.device, self.dtype, threads)
+        ) as pool:
+            futures = {
+                pool.submit(_transcribe_window, window, audio[window['start']:window['end']], language): index
+                for index, window in enumerate(windows)
+            }
+            window_segments = [None] * len(windows)
+            processed = 0
+            emitted = 0
+            for future in as_completed(futures):
+                index = futures[future]
+                window_segments[index] = future.result()
+                if progress_callback:
+                    processed += windows[index]['keep_end'] - windows[index]['keep_start']
+                    emitted += len(window_segments[index])
+                    progress_callback(processed / SAMPLE_RATE, len(audio) / SAMPLE_RATE, emitted)
+
+        return self.stitch(windows, window_segments)
+
+    @staticmethod
+    def stitch(windows: List[Dict], window_segments: List[List[Dict]]) -> List[Dict]:
+        """
+        Merge per-window segments into a single monotonic timeline
+
+        A segment from the overlap of two windows is kept only by the window
+        that owns its midpoint, so overlapping speech is emitted once.
+        """
+        stitched = []
+
+        for window, segments in zip(windows, window_segments):
+            keep_start = window['keep_start'] / SAMPLE_RATE
+            keep_end = window['keep_end'] / SAMPLE_RATE
+            for segment in segments:
+                midpoint = (segment['start'] + segment['end']) / 2
+                if keep_start <= midpoint < keep_end or (window is windows[-1] and midpoint >= keep_end):
+                    stitched.append(segment)
+
+        stitched.sort(key=lambda segment: segment['start'])
+
+        previous_end = 0.0
+        for index, segment in enumerate(stitched):
+            segment['id'] = index
+            segment['start'] = max(segment['start'], previous_end)
+            segment['end'] = max(segment['end'], segment['start'])
+            previous_end = segment['end']
+
+        return stitched
@@ -0,0 +1,141 @@
+import os
+import glob
+import tempfile
+import hashlib
+import logging
+from typing import Dict, Tuple
+import ffmpeg
+from django.conf import settings
+from ..models.subtitle_models import SubtitleProject, SubtitleEntry
+from .video_service import VideoService
+from .style_compiler import StyleCompiler
+from .encoder_profiles import EncoderProfiles
+from .render_service import run_ffmpeg
+from .parallel_render import ParallelRenderer
+from .whisper_service import SubtitleFormatter
+
+logger = logging.getLogger(__name__)
+
+# Timestamps are snapped to this step (seconds) so scrubbing nearby reuses a preview
+PREVIEW_TIMESTAMP_STEP = 0.5
+
+# Longest a preview encode may hold the web worker, in seconds
+PREVIEW_TIMEOUT_SECONDS = 15.0
+
+
+class PreviewService:
+    """Short low-resolution burn-in previews, cached per content version, style and timestamp"""
+
+    @staticmethod
+    def window(project: SubtitleProject, timestamp: float, seconds: float) -> Tuple[float, float]:
+        """Preview window of the given length around a timestamp, kept inside the video"""
+        step = getattr(settings, 'PREVIEW_TIMESTAMP_STEP', PREVIEW_TIMESTAMP_STEP)
+        timestamp = round(timestamp / step) * step
+        start = max(0.0, timestamp - seconds / 2)
+        if project.video_duration:
+            start = max(0.0, min(start, project.video_duration - seconds))
+            seconds = min(seconds, project.video_duration - start)
+        return start, seconds
+
+    @staticmethod
+    def artifact_name(project: SubtitleProject, ass_header: str, start: float,
+                      seconds: float, height: int) -> str:
+        """Storage name (relative to MEDIA_ROOT) of a preview"""
+        # The compiled header changes with the preset options or the style version
+        style_key = hashlib.sha1(ass_header.encode('utf-8')).hexdigest()[:12]
+        return (
+            f"previews/{project.id}/v{project.content_version}_{style_key}_"
+            f"{round(start * 1000)}_{round(seconds * 1000)}_{height}.mp4"
+        )
+
+    @staticmethod
+    def get_or_render(project: SubtitleProject, options: Dict, timestamp: float,
+                      seconds: float = 4.0, height: int = 360) -> Tuple[str, bool]:
+        """
+        Return a preview of the subtitles around a timestamp, rendering it if needed
+
+        The preview goes through the same style pipeline as a full burn-in,
+        downscaled and encoded with the preview encoder profile. Video only.
+
+        Unlike full renders this runs in the web request, since the editor
+        waits for it while scrubbing. A few seconds at preview size encode in
+        well under a second, and ffmpeg is killed after
+        PREVIEW_TIMEOUT_SECONDS, so a slow source cannot hold the worker
+        for longer than that.
+
+        Args:
+            project: Project to preview
+            options: SubtitleEmbedRequestSerializer data (preset or style_id)
+            timestamp: Centre of the preview in seconds
+            seconds: Preview length
+            height: Output height in pixels
+
+        Returns:
+            (path, created) where created is False on a cache hit
+
+        Raises:
+            RenderTimeout: The encode took longer than PREVIEW_TIMEOUT_SECONDS
+        """
+        project.refresh_from_db(fields=['content_version'])
+        ass_header = StyleCompiler.header_for_options(options)
+        start, seconds = PreviewService.window(project, timestamp, seconds)
+
+        name = PreviewService.artifact_name(project, ass_header, start, seconds, height)
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        if os.path.exists(path):
+            return path, False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        PreviewService.prune(project)
+
+        cues = SubtitleEntry.objects.filter(
+            project=project, start_time__lt=start + seconds, end_time__gt=start
+        ).order_by('start_time').values_list(*SubtitleFormatter.CUE_FIELDS)
+
+        # Render to a unique temporary file so concurrent requests never share one
+        # or serve a partial file; prune only matches v*.mp4
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='tmp', suffix='.mp4')
+        os.close(fd)
+        subtitle_path = VideoService.write_subtitle_file(
+            ParallelRenderer.slice_cues(cues, start, start + seconds), ass_header
+        )
+        try:
+            stream = VideoService.burn_in_stream(
+                project.video_file.path, subtitle_path, temp_path,
+                start=start, duration=seconds, audio=False, height=height,
+                encoder=EncoderProfiles.output_args('preview')
+            )
+            run_ffmpeg(
+                ffmpeg.compile(stream), seconds,
+                timeout=getattr(settings, 'PREVIEW_TIMEOUT_SECONDS', PREVIEW_TIMEOUT_SECONDS)
+            )
+            os.replace(temp_path, path)
+        finally:
+            os.unlink(subtitle_path)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        logger.info(f"Rendered {seconds:.1f}s preview at {start:.1f}s for project {project.id}")
+        return path, True
+
+    @staticmethod
+    def prune(project: SubtitleProject) -> int:
+        """
+        Delete previews rendered from older content, and the oldest ones over
+        PREVIEW_CACHE_MAX_FILES
+
+        Returns:
+            Number of files removed
+        """
+        paths = glob.glob(os.path.join(settings.MEDIA_ROOT, 'previews', str(project.id), 'v*.mp4'))
+        current = f"v{project.content_version}_"
+        stale = [p for p in paths if not os.path.basename(p).startswith(current)]
+        fresh = sorted((p for p in paths if p not in stale), key=os.path.getmtime, reverse=True)
+        stale += fresh[getattr(settings, 'PREVIEW_CACHE_MAX_FILES', 50):]
+
+        for path in stale:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(stale)
@@ -0,0 +1,153 @@
+import time
+import logging
+from typing import Dict, List, Optional
+from asgiref.sync import async_to_sync
+
+try:
+    from channels.layers import get_channel_layer
+except ImportError:  # Channels is optional; progress is then only logged
+    get_channel_layer = None
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressService:
+    """Publish processing progress to the UploadProgressConsumer groups"""
+
+    @staticmethod
+    def group_name(project_id: int) -> str:
+        """Channels group the frontend joins with a 'subscribe_upload' message"""
+        return f"upload_progress_{project_id}"
+
+    @staticmethod
+    def publish(project_id: int, stage: str, progress: float, processed: float = 0,
+                total: float = 0, segments_emitted: int = 0, current_file: str = '',
+                **extra) -> bool:
+        """
+        Send a progress event to everyone subscribed to the project
+
+        Args:
+            project_id: ID of the SubtitleProject
+            stage: Pipeline stage ('queued', 'transcribing', 'completed', 'failed', ...)
+            progress: Percent complete (0-100)
+            processed: Seconds of audio decoded so far
+            total: Total seconds of audio
+            segments_emitted: Subtitle segments produced so far
+            current_file: Name of the file being processed
+            **extra: Additional fields forwarded to the client
+
+        Returns:
+            True if the event was handed to the channel layer
+        """
+        event = {
+            'type': 'upload_progress',
+            'project_id': project_id,
+            'stage': stage,
+            'progress': round(progress, 1),
+            'processed': round(processed, 2),
+            'total': round(total, 2),
+            'segments_emitted': segments_emitted,
+            'current_file': current_file,
+        }
+        event.update(extra)
+        return ProgressService._send(project_id, event)
+
+    @staticmethod
+    def publish_segments(project_id: int, subtitles: List[Dict]) -> bool:
+        """
+        Push newly stored subtitle entries to everyone subscribed to the project
+
+        Args:
+            project_id: ID of the SubtitleProject
+            subtitles: Serialized SubtitleEntry rows, in timeline order
+        """
+        return ProgressService._send(project_id, {
+            'type': 'subtitle_segments',
+            'project_id': project_id,
+            'subtitles': subtitles,
+        })
+
+    @staticmethod
+    def publish_render(project_id: int, job_id: int, status: str, progress: float,
+                       **extra) -> bool:
+        """
+        Send a render job update to everyone subscribed to the project
+
+        Args:
+            project_id: ID of the SubtitleProject
+            job_id: ID of the RenderJob
+            status: Job status ('queued', 'running', 'completed', 'failed', 'cancelled')
+            progress: Percent complete (0-100)
+            **extra: Additional fields forwarded to the client (error, download_url)
+        """
+        event = {
+            'type': 'render_progress',
+            'project_id': project_id,
+            'job_id': job_id,
+            'status': status,
+            'progress': round(progress, 1),
+        }
+        event.update(extra)
+        return ProgressService._send(project_id, event)
+
+    @staticmethod
+    def _send(project_id: int, event: Dict) -> bool:
+        """Hand an event to the project's group on the channel layer"""
+        channel_layer = get_channel_layer() if get_channel_layer else None
+        if channel_layer is None:
+            logger.debug(f"Project {project_id} {event['type']} event dropped (no channel layer)")
+            return False
+
+        try:
+            async_to_sync(channel_layer.group_send)(ProgressService.group_name(project_id), event)
+            return True
+        except Exception as e:
+            # Progress is best effort and must never fail the job
+            logger.warning(f"Failed to publish progress for project {project_id}: {e}")
+            return False
+
+
+class ProgressReporter:
+    """Throttled progress callback for a single project's transcription"""
+
+    def __init__(self, project_id: int, current_file: str = '', min_interval: float = 1.0):
+        """
+        Args:
+            project_id: ID of the SubtitleProject
+            current_file: Name of the file being processed
+            min_interval: Minimum seconds between two published events
+        """
+        self.project_id = project_id
+        self.current_file = current_file
+        self.min_interval = min_interval
+        self._last_published: Optional[float] = None
+
+    def due(self, done: bool = False) -> bool:
+        """
+        Whether an event may be published now, recording it if so
+
+        Final events (done) always go out; others are dropped inside min_interval.
+        """
+        now = time.monotonic()
+        if not done and self._last_published is not None and now - self._last_published < self.min_interval:
+            return False
+        self._last_published = now
+        return True
+
+    def __call__(self, processed_seconds: float, total_seconds: float, segments_emitted: int):
+        """Report transcription progress; events inside min_interval are dropped"""
+        if not self.due(bool(total_seconds and processed_seconds >= total_seconds)):
+            return
+
+        progress = 100.0 * processed_seconds / total_seconds if total_seconds else 0.0
+        ProgressService.publish(
+            self.project_id, 'transcribing', min(progress, 100.0),
+            processed=processed_seconds, total=total_seconds,
+            segments_emitted=segments_emitted, current_file=self.current_file
+        )
+
+    def stage(self, stage: str, progress: float, **extra):
+        """Publish a stage change (queued, completed, failed) immediately"""
+        ProgressService.publish(
+            self.project_id, stage, progress, current_file=self.current_file, **extra
+        )
@@ -0,0 +1,382 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+import subprocess
+from typing import Callable, Dict, List, Optional, Tuple
+import ffmpeg
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from ..models.subtitle_models import SubtitleProject, SubtitleEntry, SubtitleExport, RenderJob
+from .video_service import VideoService
+from .progress_service import ProgressReporter, ProgressService
+from .subtitle_service import SubtitleService
+from .whisper_service import SubtitleFormatter
+from .style_compiler import StyleCompiler
+from .encoder_profiles import EncoderProfiles
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCancelled(Exception):
+    """Raised when a render job is cancelled while ffmpeg is running"""
+
+
+class RenderTimeout(Exception):
+    """Raised when ffmpeg is killed for running longer than its timeout"""
+
+
+def run_ffmpeg(args: List[str], duration: float,
+               progress_callback: Optional[Callable[[float], None]] = None,
+               should_cancel: Optional[Callable[[], bool]] = None,
+               cancel_poll_seconds: float = 1.0, timeout: Optional[float] = None):
+    """
+    Run an ffmpeg command, turning its -progress output into percent complete
+
+    Args:
+        args: Full command line, as returned by ffmpeg.compile()
+        duration: Output duration in seconds, used to compute the percentage
+        progress_callback: Called with the percent complete (0-100)
+        should_cancel: Polled at most every cancel_poll_seconds; returning
+            True terminates ffmpeg and raises RenderCancelled
+        cancel_poll_seconds: Minimum seconds between two should_cancel polls
+        timeout: Kill ffmpeg after this many seconds, even if it stops reporting
+
+    Raises:
+        RenderCancelled: The job was cancelled
+        RenderTimeout: ffmpeg ran longer than timeout
+        RuntimeError: ffmpeg exited with an error (the message ends with its log)
+    """
+    command = args[:1] + ['-progress', 'pipe:1', '-nostats'] + args[1:]
+
+    # stderr goes to a file: an undrained pipe would stall ffmpeg on long renders
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr,
+            text=True, bufsize=1
+        )
+        # A timer rather than a check in the loop: a stalled ffmpeg prints nothing
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, kill) if timeout else None
+        if timer:
+            timer.start()
+        last_poll = time.monotonic()
+        try:
+            for line in process.stdout:
+                key, _, value = line.strip().partition('=')
+                if key == 'out_time_us' and value.isdigit() and duration:
+                    if progress_callback:
+                        progress_callback(min(100.0, int(value) / 1e4 / duration))
+                elif key == 'progress' and value == 'end':
+                    if progress_callback:
+                        progress_callback(100.0)
+
+                now = time.monotonic()
+                if should_cancel and now - last_poll >= cancel_poll_seconds:
+                    last_poll = now
+                    if should_cancel():
+                        raise RenderCancelled()
+
+            returncode = process.wait()
+        finally:
+            if timer:
+                timer.cancel()
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+
+        if timed_out.is_set():
+            raise RenderTimeout(f"ffmpeg was stopped after {timeout:g}s")
+        if returncode != 0:
+            stderr.seek(0)
+            log = stderr.read().decode(errors='replace')
+            raise RuntimeError(f"ffmpeg exited with status {returncode}: {log[-2000:]}")
+
+
+class RenderService:
+    """Queue, run and cancel video render jobs"""
+
+    @staticmethod
+    def enqueue(project: SubtitleProject, kind: str, options: Dict) -> RenderJob:
+        """
+        Queue a render on a Celery worker
+
+        Args:
+            project: Project whose video and subtitles are rendered
+            kind: 'burn_in' or 'mux'
+            options: Validated SubtitleEmbedRequestSerializer or
+                SubtitleMuxRequestSerializer data
+
+        Returns:
+            The queued RenderJob; progress is pushed as render_progress events
+        """
+        project.refresh_from_db(fields=['content_version'])
+        job = RenderJob.objects.create(
+            project=project,
+            kind=kind,
+            options=options,
+            content_version=project.content_version
+        )
+        ProgressService.publish_render(project.id, job.id, 'queued', 0)
+        transaction.on_commit(lambda: render_job_async.delay(job.id))
+        return job
+
+    @staticmethod
+    def cancel(job: RenderJob) -> RenderJob:
+        """
+        Cancel a render job
+
+        A queued job is cancelled immediately. A running job is flagged and the
+        worker terminates ffmpeg the next time it polls the flag.
+        """
+        if job.is_finished:
+            return job
+
+        RenderJob.objects.filter(pk=job.pk).update(cancel_requested=True)
+        cancelled = RenderJob.objects.filter(pk=job.pk, status='queued').update(
+            status='cancelled', finished_at=timezone.now()
+        )
+        if cancelled:
+            ProgressService.publish_render(job.project_id, job.id, 'cancelled', job.progress)
+
+        job.refresh_from_db()
+        return job
+
+    @staticmethod
+    def burn_in(video_path: str, cues, output_path: str, options: Dict, duration: float,
+                progress_callback: Optional[Callable[[float], None]] = None,
+                should_cancel: Optional[Callable[[], bool]] = None):
+        """
+        Burn cues into a video with the renderer the options select
+
+        Args:
+            video_path: Source video
+            cues: (start_time, end_time, text) tuples in timeline order
+            output_path: Rendered MP4
+            options: RenderJob options; 'smart' (or RENDER_SMART_REENCODE)
+                re-encodes only the GOPs under cues when the source allows it,
+                otherwise 'chunks' > 1 (or RENDER_PARALLEL_CHUNKS) selects the
+                segment-parallel renderer; 'profile' names the encoder profile
+            duration: Source duration in seconds
+            progress_callback: Called with the percent complete
+            should_cancel: Returning True stops ffmpeg and raises RenderCancelled
+        """
+        # Compiled once per style (version); every renderer burns the same ASS header
+        ass_header = StyleCompiler.header_for_options(options)
+        chunks = options.get('chunks') or getattr(settings, 'RENDER_PARALLEL_CHUNKS', 1)
+        encoder = EncoderProfiles.output_args(options.get('profile'))
+
+        if options.get('smart', getattr(settings, 'RENDER_SMART_REENCODE', False)):
+            from .smart_render import SmartRenderer
+            cues = list(cues)
+            renderer = SmartRenderer()
+            segments = renderer.plan(video_path, cues, duration)
+            if segments is not None:
+                renderer.render(
+                    video_path, cues, output_path, ass_header, duration, segments=segments,
+                    progress_callback=progress_callback, should_cancel=should_cancel,
+                    encoder=encoder
+                )
+                return
+
+        if chunks > 1:
+            from .parallel_render import ParallelRenderer
+            ParallelRenderer(chunks).render(
+                video_path, cues, output_path, ass_header, duration,
+                progress_callback=progress_callback, should_cancel=should_cancel,
+                encoder=encoder
+            )
+            return
+
+        subtitle_path = VideoService.write_subtitle_file(cues, ass_header)
+        try:
+            args = ffmpeg.compile(VideoService.burn_in_stream(
+                video_path, subtitle_path, output_path, encoder=encoder
+            ))
+            run_ffmpeg(args, duration, progress_callback, should_cancel)
+        finally:
+            os.unlink(subtitle_path)
+
+    @staticmethod
+    def mux(project: SubtitleProject, video_path: str, output_path: str, options: Dict,
+            duration: float, progress_callback: Optional[Callable[[float], None]] = None,
+            should_cancel: Optional[Callable[[], bool]] = None):
+        """
+        Add the project's cues to the video as soft subtitle tracks
+
+        Audio and video are stream-copied, so this takes about as long as
+        copying the file. One track is written per language.
+
+        Args:
+            project: Project whose cues are muxed
+            video_path: Source video
+            output_path: MP4 (mov_text tracks) or MKV (SRT or ASS tracks)
+            options: container, languages (default: every language with
+                cues, the project language first) and subtitle_format (MKV only)
+            duration: Source duration in seconds
+            progress_callback: Called with the percent complete
+            should_cancel: Returning True stops ffmpeg and raises RenderCancelled
+
+        Returns:
+            The project content_version the tracks were written from
+        """
+        container = options.get('container', 'mp4')
+        subtitle_format = options.get('subtitle_format', 'srt') if container == 'mkv' else 'srt'
+
+        with tempfile.TemporaryDirectory(prefix='mux_') as work_dir:
+            tracks = []
+            with transaction.atomic():
+                content_version = RenderService.lock_content_version(project)
+                available = set(SubtitleEntry.objects.filter(project=project).values_list(
+                    'language', flat=True
+                ).distinct())
+                languages = options.get('languages')
+                if languages:
+                    # Languages without cues would produce empty tracks
+                    languages = [language for language in languages if language in available]
+                else:
+                    languages = sorted(available, key=lambda language: (language != project.language, language))
+
+                for language in languages:
+                    cues = SubtitleEntry.objects.filter(project=project, language=language).order_by(
+                        'start_time'
+                    ).values_list(*SubtitleFormatter.CUE_FIELDS).iterator(chunk_size=2000)
+                    track_path = os.path.join(work_dir, f"{len(tracks)}.{subtitle_format}")
+                    with open(track_path, 'w', encoding='utf-8') as f:
+                        SubtitleFormatter.write_export(cues, subtitle_format, f)
+                    tracks.append((track_path, language))
+
+            args = ffmpeg.compile(VideoService.mux_stream(video_path, tracks, output_path, container))
+            run_ffmpeg(args, duration, progress_callback, should_cancel)
+        return content_version
+
+    @staticmethod
+    def lock_content_version(project: SubtitleProject) -> int:
+        """
+        Lock the project and read its content_version, inside transaction.atomic()
+
+        Writers bump the version with the project row locked, so while the
+        lock is held the version and the cues read next describe the same content.
+        """
+        SubtitleService.lock_project(project.id)
+        return SubtitleProject.objects.values_list('content_version', flat=True).get(pk=project.id)
+
+    @staticmethod
+    def cancel_requested(job_id: int) -> bool:
+        return RenderJob.objects.filter(pk=job_id, cancel_requested=True).exists()
+
+    @staticmethod
+    def finish(job: RenderJob, status: str, **fields):
+        """Record the final state of a job and publish it"""
+        fields.update(status=status, finished_at=timezone.now())
+        RenderJob.objects.filter(pk=job.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(job, name, value)
+
+        extra = {}
+        if job.error:
+            extra['error'] = job.error
+        if job.export_id:
+            extra['download_url'] = f"/api/subtitle/exports/{job.export_id}/download/"
+        ProgressService.publish_render(job.project_id, job.id, status, job.progress, **extra)
+
+
+def job_output(job: RenderJob) -> Tuple[str, str]:
+    """Storage name (relative to MEDIA_ROOT) and SubtitleExport format of a job's output"""
+    if job.kind == 'mux':
+        container = job.options.get('container', 'mp4')
+        return f"muxed_videos/{job.project_id}_{job.id}.{container}", f"mux_{container}"
+    return f"embedded_videos/{job.project_id}_{job.id}.mp4", 'burn_in'
+
+
+@shared_task
+def render_job_async(job_id: int):
+    """
+    Celery task that runs a render job (subtitle burn-in or track mux)
+
+    Args:
+        job_id: ID of the RenderJob
+    """
+    # Claim the job; a job cancelled while queued is skipped
+    claimed = RenderJob.objects.filter(pk=job_id, status='queued', cancel_requested=False).update(
+        status='running', started_at=timezone.now()
+    )
+    if not claimed:
+        logger.info(f"Render job {job_id} is no longer queued, skipping")
+        return
+
+    job = RenderJob.objects.select_related('project').get(pk=job_id)
+    project = job.project
+
+    output_name, export_format = job_output(job)
+    output_path = os.path.join(settings.MEDIA_ROOT, output_name)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    # ffmpeg reports several times a second; write and publish at most once per interval
+    throttle = ProgressReporter(project.id, min_interval=getattr(settings, 'RENDER_PROGRESS_INTERVAL', 1.0))
+
+    def on_progress(percent: float):
+        job.progress = percent
+        if not throttle.due(percent >= 100):
+            return
+        RenderJob.objects.filter(pk=job_id).update(progress=percent)
+        ProgressService.publish_render(project.id, job_id, 'running', percent)
+
+    try:
+        video_path = project.video_file.path
+        duration = project.video_duration or float(ffmpeg.probe(video_path)['format']['duration'])
+        ProgressService.publish_render(project.id, job_id, 'running', 0)
+
+        should_cancel = lambda: RenderService.cancel_requested(job_id)
+        if job.kind == 'mux':
+            content_version = RenderService.mux(
+                project, video_path, output_path, job.options, duration,
+                progress_callback=on_progress, should_cancel=should_cancel
+            )
+        else:
+            # The cues as they are now, not when the job was queued, and their version
+            with transaction.atomic():
+                content_version = RenderService.lock_content_version(project)
+                cues = list(SubtitleEntry.objects.filter(project=project).order_by('start_time').values_list(
+                    *SubtitleFormatter.CUE_FIELDS
+                ))
+            RenderService.burn_in(
+                video_path, cues, output_path, job.options, duration,
+                progress_callback=on_progress, should_cancel=should_cancel
+            )
+
+        export = SubtitleExport.objects.create(
+            project=project,
+            format=export_format,
+            file=output_name,
+            content_version=content_version
+        )
+        RenderService.finish(
+            job, 'completed', progress=100.0, export=export, content_version=content_version
+        )
+        logger.info(f"Render job {job_id} ({job.kind}) completed for project {project.id}")
+
+    except RenderCancelled:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        RenderService.finish(job, 'cancelled')
+        logger.info(f"Render job {job_id} cancelled")
+
+    except Exception as e:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        RenderService.finish(job, 'failed', error=str(e))
+        logger.error(f"Render job {job_id} failed for project {project.id}: {e}")
+        raise
@@ -0,0 +1,182 @@
+import os
+import bisect
+import logging
+import tempfile
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import ffmpeg
+from .video_service import VideoService
+from .render_service import RenderCancelled, run_ffmpeg
+from .parallel_render import Cue, ParallelRenderer, probe_keyframes
+
+logger = logging.getLogger(__name__)
+
+# Sources whose stream-copied GOPs can be spliced with libx264 output
+SPLICEABLE_CODECS = ('h264',)
+SPLICEABLE_PIX_FMTS = ('yuv420p', 'yuvj420p')
+
+
+class SmartRenderer:
+    """Burn subtitles by re-encoding only the GOPs that overlap a cue"""
+
+    def __init__(self, max_reencode_ratio: float = 0.7):
+        """
+        Initialize the renderer
+
+        Args:
+            max_reencode_ratio: If more than this share of the video would be
+                re-encoded, plan() reports no gain and a full render is used
+        """
+        self.max_reencode_ratio = max_reencode_ratio
+
+    @staticmethod
+    def cue_spans(cues: Iterable[Cue]) -> List[Tuple[float, float]]:
+        """Merge cue intervals into the disjoint spans where any subtitle is visible"""
+        spans = []
+        for start, end, _ in sorted(cues):
+            if spans and start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+            else:
+                spans.append((start, end))
+        return spans
+
+    @staticmethod
+    def plan_segments(spans: List[Tuple[float, float]], keyframes: List[float],
+                      duration: float) -> List[Tuple[float, float, bool]]:
+        """
+        Expand each span to whole GOPs and list the segments of the timeline
+
+        Returns:
+            (start, end, reencode) in seconds, covering [0, duration], with
+            every boundary on a keyframe
+        """
+        boundaries = sorted(set([0.0] + [k for k in keyframes if 0 < k < duration]))
+        ranges = []
+        for span_start, span_end in spans:
+            # GOP containing the span start through the GOP containing its end
+            first = boundaries[max(0, bisect.bisect_right(boundaries, span_start) - 1)]
+            after = bisect.bisect_right(boundaries, span_end)
+            last = boundaries[after] if after < len(boundaries) else duration
+            if ranges and first <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], last))
+            else:
+                ranges.append((first, last))
+
+        segments = []
+        position = 0.0
+        for start, end in ranges:
+            if start > position:
+                segments.append((position, start, False))
+            segments.append((start, end, True))
+            position = end
+        if position < duration:
+            segments.append((position, duration, False))
+        return segments
+
+    def plan(self, video_path: str, cues: List[Cue], duration: float,
+                 keyframes: Optional[List[float]] = None) -> Optional[List[Tuple[float, float, bool]]]:
+        """
+        Plan a smart render, or return None when a full render should be used
+
+        A full render is used for sources whose codec cannot be spliced with
+        libx264 output, and when the cues cover so much of the video that
+        stream copying would save little.
+        """
+        probe = ffmpeg.probe(video_path, select_streams='v:0')
+        stream = probe['streams'][0] if probe.get('streams') else {}
+        codec, pix_fmt = stream.get('codec_name'), stream.get('pix_fmt')
+        if codec not in SPLICEABLE_CODECS or pix_fmt not in SPLICEABLE_PIX_FMTS:
+            logger.info(f"Smart render unavailable for {codec}/{pix_fmt} video")
+            return None
+
+        if keyframes is None:
+            keyframes = probe_keyframes(video_path)
+        segments = self.plan_segments(self.cue_spans(cues), keyframes, duration)
+        reencoded = sum(end - start for start, end, reencode in segments if reencode)
+        if duration and reencoded / duration > self.max_reencode_ratio:
+            logger.info(f"Smart render skipped, cues cover {100 * reencoded / duration:.0f}% of the video")
+            return None
+        return segments
+
+    def render(self, video_path: str, cues: Iterable[Cue], output_path: str, ass_header: str,
+               duration: float, segments: Optional[List[Tuple[float, float, bool]]] = None,
+               progress_callback: Optional[Callable[[float], None]] = None,
+               should_cancel: Optional[Callable[[], bool]] = None,
+               encoder: Optional[Dict] = None) -> Dict:
+        """
+        Re-encode the GOPs under cues, stream-copy the rest and splice them
+
+        Segments are written as video-only MPEG-TS so stream-copied and
+        re-encoded H.264 carry their parameter sets in-band and can be
+        joined with the concat demuxer; the source audio is muxed back in
+        the final -c copy pass.
+
+        Args:
+            video_path: Source video
+            cues: (start_time, end_time, text) tuples in timeline order
+            output_path: Rendered MP4
+            ass_header: Compiled style header from StyleCompiler
+            duration: Source duration in seconds
+            segments: Plan from plan(), computed when not given
+            progress_callback: Called with the percent of re-encoding done
+            should_cancel: Returning True stops ffmpeg and raises RenderCancelled
+            encoder: Encoder options from EncoderProfiles.output_args()
+
+        Returns:
+            Stats with the segment count and re-encoded/copied seconds
+        """
+        cues = list(cues)
+        if segments is None:
+            segments = self.plan_segments(self.cue_spans(cues), probe_keyframes(video_path), duration)
+
+        reencode_total = sum(end - start for start, end, reencode in segments if reencode)
+        reencoded_done = 0.0
+
+        with tempfile.TemporaryDirectory(prefix='smart_render_') as work_dir:
+            segment_paths = []
+            for index, (start, end, reencode) in enumerate(segments):
+                if should_cancel and should_cancel():
+                    raise RenderCancelled()
+
+                segment_path = os.path.join(work_dir, f"segment_{index:04d}.ts")
+                if reencode:
+                    subtitle_path = os.path.join(work_dir, f"segment_{index:04d}.ass")
+                    VideoService.write_subtitle_file(
+                        ParallelRenderer.slice_cues(cues, start, end), ass_header, subtitle_path
+                    )
+                    stream = VideoService.burn_in_stream(
+                        video_path, subtitle_path, segment_path,
+                        start=start, duration=end - start, audio=False, encoder=encoder
+                    )
+
+                    def on_progress(percent: float, offset=reencoded_done, length=end - start):
+                        if progress_callback and reencode_total:
+                            progress_callback(100.0 * (offset + length * percent / 100) / reencode_total)
+
+                    run_ffmpeg(ffmpeg.compile(stream), end - start, on_progress, should_cancel)
+                    reencoded_done += end - start
+                else:
+                    stream = ffmpeg.input(video_path, ss=start, t=end - start).output(
+                        segment_path, map='0:v:0', c='copy', bsf='h264_mp4toannexb', f='mpegts'
+                    ).overwrite_output()
+                    run_ffmpeg(ffmpeg.compile(stream), end - start, should_cancel=should_cancel)
+                segment_paths.append(segment_path)
+
+            list_path = os.path.join(work_dir, 'segments.txt')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                for segment_path in segment_paths:
+                    f.write(f"file '{segment_path}'\n")
+
+            ParallelRenderer.concat(list_path, video_path, output_path)
+
+        stats = {
+            'segments': len(segments),
+            'reencoded_seconds': reencode_total,
+            'copied_seconds': duration - reencode_total,
+        }
+        logger.info(
+            f"Smart render re-encoded {reencode_total:.1f}s of {duration:.1f}s "
+            f"in {len(segments)} segments"
+        )
+        if progress_callback:
+            progress_callback(100.0)
+        return stats
@@ -0,0 +1,186 @@
+import logging
+import threading
+from typing import Callable, Dict, Tuple
+from ..models.subtitle_models import SubtitleStyle
+
+logger = logging.getLogger(__name__)
+
+# Script resolution the style sizes are expressed in; libass scales it to the
+# video, and 288 lines is the scale ffmpeg uses for SRT, so font sizes keep
+# the meaning they had when burn-in rendered SRT files
+PLAY_RES_X = 384
+PLAY_RES_Y = 288
+
+NAMED_COLORS = {
+    'white': 'FFFFFF', 'black': '000000', 'yellow': 'FFFF00', 'cyan': '00FFFF',
+    'green': '00FF00', 'orange': 'FFA500', 'red': 'FF0000', 'blue': '0000FF',
+    'grey': '808080', 'gray': '808080', 'darkblue': '00008B', 'darkgreen': '006400',
+    'darkred': '8B0000', 'darkgrey': 'A9A9A9', 'darkgray': 'A9A9A9',
+}
+
+# Preset overrides on top of DEFAULT_STYLE; font_size_delta is added to the
+# requested font size
+PRESETS = {
+    'default': {'outline': 2, 'shadow': 1},
+    'modern': {'border_style': 3, 'outline': 2, 'shadow': 0, 'box_opacity': 0x80},
+    'bold': {'font_size_delta': 4, 'bold': True, 'outline': 3, 'shadow': 1},
+    'minimal': {'font_size_delta': -2, 'outline': 1, 'shadow': 0},
+}
+
+DEFAULT_STYLE = {
+    'font_name': 'Arial',
+    'font_size': 24,
+    'primary_color': 'white',
+    'outline_color': 'black',
+    'back_color': 'black',
+    'bold': False,
+    'italic': False,
+    'border_style': 1,
+    'outline': 2,
+    'shadow': 1,
+    'alignment': 2,
+    'margin_v': 10,
+    'box_opacity': 0xFF,
+}
+
+
+def ass_color(color: str, opacity: int = 0xFF) -> str:
+    """
+    Convert a color name, #RRGGBB or #RRGGBBAA to ASS &HAABBGGRR
+
+    Args:
+        color: Color name or hex value
+        opacity: 0-255, used when the color has no alpha of its own
+    """
+    value = NAMED_COLORS.get(color.lower(), color.lstrip('#'))
+    if len(value) == 8:
+        value, opacity = value[:6], int(value[6:], 16)
+    if len(value) != 6:
+        raise ValueError(f"Unsupported color: {color}")
+    red, green, blue = value[0:2], value[2:4], value[4:6]
+    # ASS stores transparency, not opacity
+    return f"&H{0xFF - opacity:02X}{blue}{green}{red}".upper()
+
+
+class StyleCompiler:
+    """Compile subtitle styles into ASS headers, once per style version"""
+
+    _cache: Dict[Tuple, str] = {}
+    _lock = threading.Lock()
+    MAX_CACHED = 512
+
+    @staticmethod
+    def header_for_options(options: Dict) -> str:
+        """
+        ASS header for render options
+
+        Args:
+            options: style_id (a SubtitleStyle row), or a preset name in style
+                with font_size, font_color and outline_color
+        """
+        style_id = options.get('style_id')
+        if style_id is not None:
+            return StyleCompiler.compile_style(SubtitleStyle.objects.get(pk=style_id))
+        return StyleCompiler.compile_preset(
+            options.get('style', 'default'),
+            options.get('font_size', 24),
+            options.get('font_color', 'white'),
+            options.get('outline_color', 'black')
+        )
+
+    @staticmethod
+    def compile_preset(name: str, font_size: int = 24, font_color: str = 'white',
+                       outline_color: str = 'black') -> str:
+        """ASS header for one of the built-in presets"""
+        key = ('preset', name, font_size, font_color, outline_color)
+
+        def build():
+            preset = dict(PRESETS.get(name, PRESETS['default']))
+            size = font_size + preset.pop('font_size_delta', 0)
+            return StyleCompiler.build_header(dict(
+                DEFAULT_STYLE, **preset, font_size=size,
+                primary_color=font_color, outline_color=outline_color
+            ))
+
+        return StyleCompiler._cached(key, build)
+
+    @staticmethod
+    def compile_style(style: SubtitleStyle) -> str:
+        """ASS header for a SubtitleStyle row, rebuilt only when its version changes"""
+        key = ('style', style.pk, style.version)
+
+        def build():
+            return StyleCompiler.build_header(dict(
+                DEFAULT_STYLE,
+                font_name=style.font_name,
+                font_size=style.font_size,
+                primary_color=style.primary_color,
+                outline_color=style.outline_color,
+                back_color=style.back_color,
+                bold=style.bold,
+                italic=style.italic,
+                border_style=style.border_style,
+                outline=style.outline,
+                shadow=style.shadow,
+                alignment=style.alignment,
+                margin_v=style.margin_v,
+            ))
+
+        return StyleCompiler._cached(key, build)
+
+    @staticmethod
+    def build_header(fields: Dict) -> str:
+        """Render [Script Info], [V4+ Styles] and the [Events] format line"""
+        # With an opaque box (BorderStyle 3) libass fills the box with OutlineColour
+        outline_opacity = fields['box_opacity'] if fields['border_style'] == 3 else 0xFF
+        style = ','.join(str(value) for value in (
+            'Default',
+            fields['font_name'],
+            fields['font_size'],
+            ass_color(fields['primary_color']),
+            ass_color(fields['primary_color']),
+            ass_color(fields['outline_color'], outline_opacity),
+            ass_color(fields['back_color'], 0x80),
+            -1 if fields['bold'] else 0,
+            -1 if fields['italic'] else 0,
+            0, 0, 100, 100, 0, 0,
+            fields['border_style'],
+            fields['outline'],
+            fields['shadow'],
+            fields['alignment'],
+            10, 10,
+            fields['margin_v'],
+            1,
+        ))
+        return (
+            "[Script Info]\n"
+            "ScriptType: v4.00+\n"
+            "WrapStyle: 0\n"
+            "ScaledBorderAndShadow: yes\n"
+            f"PlayResX: {PLAY_RES_X}\n"
+            f"PlayResY: {PLAY_RES_Y}\n"
+            "\n"
+            "[V4+ Styles]\n"
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+            "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+            "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+            f"Style: {style}\n"
+            "\n"
+            "[Events]\n"
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+        )
+
+    @staticmethod
+    def _cached(key: Tuple, build: Callable[[], str]) -> str:
+        with StyleCompiler._lock:
+            header = StyleCompiler._cache.get(key)
+        if header is not None:
+            return header
+
+        header = build()
+        with StyleCompiler._lock:
+            if len(StyleCompiler._cache) >= StyleCompiler.MAX_CACHED:
+                StyleCompiler._cache.clear()
+            StyleCompiler._cache[key] = header
+        logger.debug(f"Compiled ASS style {key}")
+        return header
@@ -0,0 +1,468 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+from ..models.subtitle_models import SubtitleProject, SubtitleEntry, SubtitleChange
+
+logger = logging.getLogger(__name__)
+
+
+class RevisionConflict(Exception):
+    """Entries were changed or deleted after the revision a client based its write on"""
+
+    def __init__(self, entries: List[SubtitleEntry], deleted_ids: Iterable[int] = ()):
+        self.entries = entries
+        self.deleted_ids = sorted(deleted_ids)
+        super().__init__(
+            f"{len(self.entries)} entries changed and {len(self.deleted_ids)} deleted since the given revision"
+        )
+
+
+class SubtitleService:
+    """Service for persisting subtitle entries"""
+
+    @staticmethod
+    def build_entry(project: SubtitleProject, subtitle: Dict, revision: int = 0) -> SubtitleEntry:
+        """Build an unsaved SubtitleEntry from a subtitle dictionary"""
+        return SubtitleEntry(
+            project=project,
+            start_time=subtitle['start_time'],
+            end_time=subtitle['end_time'],
+            text=subtitle['text'],
+            language=subtitle.get('language', project.language),
+            confidence=subtitle.get('confidence', 0.0),
+            is_edited=False,
+            revision=revision
+        )
+
+    @staticmethod
+    def lock_project(project_id: int) -> None:
+        """
+        Lock a project row until the end of the transaction
+
+        Every subtitle write takes this lock before any entry row (the
+        content version bump takes it too), so writers queue on the project
+        and never deadlock on each other's entries. Must be called inside
+        transaction.atomic().
+
+        Only databases with SELECT ... FOR UPDATE (PostgreSQL, MySQL) take
+        a row lock. On SQLite this is a no-op: writes are still atomic and
+        validated, but concurrent writers are only serialized by SQLite's
+        database-wide write lock, so check-then-write races remain possible.
+        """
+        list(SubtitleProject.objects.select_for_update().filter(pk=project_id).values_list('pk', flat=True))
+
+    @staticmethod
+    def check_revision(project_id: int, entry_ids: Iterable[int], revision: Optional[int]) -> None:
+        """
+        Reject a write based on a stale revision
+
+        Call with the project locked (see lock_project), so nothing can
+        change between the check and the write.
+
+        Args:
+            project_id: Project the entries belong to
+            entry_ids: Entries the write touches
+            revision: Project revision the client last saw, or None for an unconditional write
+
+        Raises:
+            RevisionConflict: An entry was changed after the revision, or no longer exists
+        """
+        if revision is None:
+            return
+        entry_ids = set(entry_ids)
+        current = SubtitleEntry.objects.filter(project_id=project_id, pk__in=entry_ids)
+        changed = [entry for entry in current if entry.revision > revision]
+        deleted_ids = entry_ids - {entry.id for entry in current}
+        if changed or deleted_ids:
+            raise RevisionConflict(changed, deleted_ids)
+
+    @staticmethod
+    def save_transcription(project: SubtitleProject, subtitles: Iterable[Dict],
+                           batch_size: Optional[int] = None, status: str = 'completed') -> int:
+        """
+        Insert transcribed subtitles and update the project status in one transaction
+
+        Args:
+            project: Project the subtitles belong to
+            subtitles: Subtitle dictionaries from WhisperService
+            batch_size: Rows per INSERT, defaults to SUBTITLE_BULK_BATCH_SIZE
+            status: Project status to set once the rows are written
+
+        Returns:
+            Number of entries created
+        """
+        batch_size = batch_size or getattr(settings, 'SUBTITLE_BULK_BATCH_SIZE', 500)
+        subtitles = list(subtitles)
+
+        with transaction.atomic():
+            revision = project.bump_content_version('transcribed') if subtitles else project.content_version
+            entries = [SubtitleService.build_entry(project, subtitle, revision) for subtitle in subtitles]
+            SubtitleEntry.objects.bulk_create(entries, batch_size=batch_size)
+            project.status = status
+            project.save(update_fields=['status', 'updated_at'])
+
+        logger.info(f"Saved {len(entries)} subtitle entries for project {project.id}")
+        return len(entries)
+
+    @staticmethod
+    def append_entries(project: SubtitleProject, subtitles: List[Dict],
+                       batch_size: Optional[int] = None) -> List[SubtitleEntry]:
+        """
+        Insert a batch of subtitles while transcription is still running
+
+        Args:
+            project: Project the subtitles belong to
+            subtitles: Subtitle dictionaries from WhisperService
+            batch_size: Rows per INSERT, defaults to SUBTITLE_BULK_BATCH_SIZE
+
+        Returns:
+            The created entries (with primary keys on backends that return them)
+        """
+        batch_size = batch_size or getattr(settings, 'SUBTITLE_BULK_BATCH_SIZE', 500)
+
+        with transaction.atomic():
+            revision = project.bump_content_version('transcribed')
+            entries = [SubtitleService.build_entry(project, subtitle, revision) for subtitle in subtitles]
+            created = SubtitleEntry.objects.bulk_create(entries, batch_size=batch_size)
+        return created
+
+    @staticmethod
+    def clear_unedited_entries(project: SubtitleProject) -> int:
+        """
+        Delete the entries of a project nobody has edited, e.g. the ones
+        streamed by a failed transcription
+
+        Entries the user already edited in the editor are kept.
+
+        Returns:
+            Number of entries deleted
+        """
+        with transaction.atomic():
+            SubtitleService.lock_project(project.id)
+            entry_ids = list(SubtitleEntry.objects.filter(
+                project=project, is_edited=False
+            ).values_list('id', flat=True))
+            if not entry_ids:
+                return 0
+            project.bump_content_version('deleted', deleted_ids=entry_ids)
+            SubtitleEntry.objects.filter(pk__in=entry_ids).delete()
+
+        logger.info(f"Cleared {len(entry_ids)} unedited subtitle entries of project {project.id}")
+        return len(entry_ids)
+
+    @staticmethod
+    def next_entry(entry: SubtitleEntry) -> Optional[SubtitleEntry]:
+        """
+        The entry after this one on its language's timeline
+
+        Ties on start_time are broken by id, so cues starting together are
+        still each other's neighbours. Resolved by an index seek on
+        (project, start_time).
+        """
+        return SubtitleService.following(entry).first()
+
+    @staticmethod
+    def following(entry: SubtitleEntry):
+        """Entries after this one on its language's timeline, in order"""
+        return SubtitleEntry.objects.filter(
+            project_id=entry.project_id, language=entry.language
+        ).filter(
+            Q(start_time__gt=entry.start_time) | Q(start_time=entry.start_time, id__gt=entry.id)
+        ).order_by('start_time', 'id')
+
+    @staticmethod
+    def previous_entry(entry: SubtitleEntry) -> Optional[SubtitleEntry]:
+        """The entry before this one on its language's timeline"""
+        return SubtitleEntry.objects.filter(
+            project_id=entry.project_id, language=entry.language
+        ).filter(
+            Q(start_time__lt=entry.start_time) | Q(start_time=entry.start_time, id__lt=entry.id)
+        ).order_by('-start_time', '-id').first()
+
+    @staticmethod
+    def split_entry(entry_id: int, split_time: float,
+                    revision: Optional[int] = None) -> Tuple[SubtitleEntry, SubtitleEntry]:
+        """
+        Split an entry in two at a time, atomically
+
+        The entry is re-read with its project locked, so a second split of
+        the same entry (a double click, another tab) waits for the first and
+        is then validated against the shortened cue instead of duplicating it.
+        Both halves are written at one new revision.
+
+        Args:
+            entry_id: Entry to split
+            split_time: Time in seconds where the new entry starts
+            revision: Only split if the entry is unchanged since this project revision
+
+        Returns:
+            (original entry, now ending at split_time; new entry from split_time)
+
+        Raises:
+            SubtitleEntry.DoesNotExist: The entry was deleted by another edit
+            RevisionConflict: The entry changed after revision
+            ValueError: split_time is not strictly inside the entry
+        """
+        with transaction.atomic():
+            SubtitleService.lock_project(
+                SubtitleEntry.objects.values_list('project_id', flat=True).get(pk=entry_id)
+            )
+            entry = SubtitleEntry.objects.select_related('project').get(pk=entry_id)
+            SubtitleService.check_revision(entry.project_id, [entry.id], revision)
+            if split_time <= entry.start_time or split_time >= entry.end_time:
+                raise ValueError('Split time must be between start and end time')
+
+            entry.revision = entry.project.bump_content_version('split')
+            entry.updated_at = timezone.now()
+            [new_entry] = SubtitleEntry.objects.bulk_create([SubtitleEntry(
+                project=entry.project,
+                start_time=split_time,
+                end_time=entry.end_time,
+                text=entry.text,
+                language=entry.language,
+                confidence=entry.confidence,
+                is_edited=True,
+                revision=entry.revision
+            )])
+            entry.end_time = split_time
+            entry.is_edited = True
+            SubtitleEntry.objects.bulk_update([entry], ['end_time', 'is_edited', 'revision', 'updated_at'])
+        return entry, new_entry
+
+    @staticmethod
+    def merge_entries(entry_id: int, count: int = 1,
+                      revision: Optional[int] = None) -> Tuple[SubtitleEntry, List[int]]:
+        """
+        Merge an entry with the count entries that follow it, atomically
+
+        The rows are read with their project locked, so concurrent splits
+        and merges of neighbouring cues serialize, and a cue merged away by
+        another request is never merged twice.
+
+        Args:
+            entry_id: Entry the following ones are merged into
+            count: Number of following entries to merge
+            revision: Only merge if none of the entries changed since this project revision
+
+        Returns:
+            (merged entry, IDs of the entries merged into it and deleted)
+
+        Raises:
+            SubtitleEntry.DoesNotExist: The entry was deleted by another edit
+            RevisionConflict: One of the entries changed after revision
+            ValueError: Fewer than count entries follow it
+        """
+        with transaction.atomic():
+            SubtitleService.lock_project(
+                SubtitleEntry.objects.values_list('project_id', flat=True).get(pk=entry_id)
+            )
+            entry = SubtitleEntry.objects.select_related('project').get(pk=entry_id)
+            following = list(SubtitleService.following(entry)[:count])
+            if len(following) < count:
+                raise ValueError(
+                    'No next subtitle to merge with' if count == 1
+                    else f"Only {len(following)} subtitles follow this one"
+                )
+            merged_ids = [other.id for other in following]
+            SubtitleService.check_revision(entry.project_id, [entry.id] + merged_ids, revision)
+
+            entry.revision = entry.project.bump_content_version('merged', deleted_ids=merged_ids)
+            entry.updated_at = timezone.now()
+            entry.text = ' '.join([entry.text] + [other.text for other in following])
+            entry.end_time = max([entry.end_time] + [other.end_time for other in following])
+            entry.is_edited = True
+            SubtitleEntry.objects.bulk_update([entry], ['text', 'end_time', 'is_edited', 'revision', 'updated_at'])
+            SubtitleEntry.objects.filter(pk__in=merged_ids).delete()
+        return entry, merged_ids
+
+    @staticmethod
+    def retime(project: SubtitleProject, scale: float, offset: float,
+               language: Optional[str] = None) -> int:
+        """
+        Map every cue time t of a project to t * scale + offset in one UPDATE
+
+        Args:
+            project: Project whose entries are retimed
+            scale: Multiplier for the times, e.g. a framerate ratio
+            offset: Seconds added after scaling
+            language: Only retime entries in this language
+
+        Returns:
+            Number of entries retimed
+
+        Raises:
+            ValueError: The retime would move a cue before 0 seconds
+        """
+        entries = SubtitleEntry.objects.filter(project=project)
+        if language:
+            entries = entries.filter(language=language)
+
+        with transaction.atomic():
+            SubtitleService.lock_project(project.id)
+            # scale is positive, so the earliest start stays the earliest
+            earliest = entries.aggregate(earliest=Min('start_time'))['earliest']
+            if earliest is None:
+                return 0
+            if earliest * scale + offset < 0:
+                raise ValueError(
+                    f"The first cue would start at {earliest * scale + offset:.3f}s, before the video"
+                )
+
+            updated = entries.update(
+                start_time=F('start_time') * scale + offset,
+                end_time=F('end_time') * scale + offset,
+                is_edited=True,
+                revision=project.bump_content_version('retimed'),
+                updated_at=timezone.now()
+            )
+
+        logger.info(f"Retimed {updated} entries of project {project.id}: t * {scale:.6f} + {offset:.3f}")
+        return updated
+
+    @staticmethod
+    def apply_bulk(project: SubtitleProject, creates: List[Dict],
+                   updates: List[Tuple[int, Dict]], delete_ids: List[int],
+                   batch_size: Optional[int] = None, revision: Optional[int] = None) -> Dict[str, List]:
+        """
+        Apply validated creates, updates and deletes to a project in one transaction
+
+        The updated rows are read again once the project is locked and each
+        item's changes are applied to those fresh rows, so a concurrent edit
+        of another field is not overwritten. Rows are written with
+        bulk_create, one bulk_update per set of changed fields and a single
+        DELETE, and the content version is bumped once for the whole batch,
+        so every touched entry gets the same revision. Every touched entry
+        is marked as edited.
+
+        Args:
+            project: Project the entries belong to
+            creates: Validated field dictionaries of new entries
+            updates: (entry ID, validated changes) pairs for existing entries
+            delete_ids: IDs of entries to delete
+            batch_size: Rows per statement, defaults to SUBTITLE_BULK_BATCH_SIZE
+            revision: Only apply if no updated or deleted entry changed since this project revision
+
+        Returns:
+            created and updated entries, and the deleted IDs
+
+        Raises:
+            RevisionConflict: An updated or deleted entry changed after revision,
+                or an updated entry was deleted by another edit
+            ValueError: An update leaves an entry starting at or after its end
+        """
+        batch_size = batch_size or getattr(settings, 'SUBTITLE_BULK_BATCH_SIZE', 500)
+        now = timezone.now()
+
+        entries = [
+            SubtitleEntry(
+                project=project,
+                language=data.get('language', project.language),
+                is_edited=True,
+                **{name: value for name, value in data.items() if name != 'language'}
+            )
+            for data in creates
+        ]
+
+        with transaction.atomic():
+            SubtitleService.lock_project(project.id)
+            SubtitleService.check_revision(
+                project.id, [entry_id for entry_id, _ in updates] + list(delete_ids), revision
+            )
+            if not (delete_ids or updates or entries):
+                return {'created': [], 'updated': [], 'deleted': []}
+
+            # Rows read before the lock may be stale; apply the changes to fresh ones
+            rows = SubtitleEntry.objects.filter(project=project).in_bulk(
+                [entry_id for entry_id, _ in updates]
+            )
+            missing = [entry_id for entry_id, _ in updates if entry_id not in rows]
+            if missing:
+                raise RevisionConflict([], missing)
+            updated = []
+            # bulk_update writes every listed field of every row, so rows are
+            # grouped by the fields they change; it also skips auto_now
+            groups = {}
+            for entry_id, changes in updates:
+                entry = rows[entry_id]
+                for name, value in changes.items():
+                    setattr(entry, name, value)
+                if entry.start_time >= entry.end_time:
+                    raise ValueError(f"Subtitle {entry_id} would start at or after its end")
+                entry.is_edited = True
+                entry.updated_at = now
+                updated.append(entry)
+                groups.setdefault(frozenset(changes), []).append(entry)
+
+            version = project.bump_content_version('bulk', deleted_ids=delete_ids)
+            for entry in entries + updated:
+                entry.revision = version
+
+            deleted = 0
+            if delete_ids:
+                deleted, _ = SubtitleEntry.objects.filter(project=project, pk__in=delete_ids).delete()
+            for fields, group in groups.items():
+                SubtitleEntry.objects.bulk_update(
+                    group, sorted(fields | {'is_edited', 'revision', 'updated_at'}), batch_size=batch_size
+                )
+            created = SubtitleEntry.objects.bulk_create(entries, batch_size=batch_size)
+
+        logger.info(
+            f"Bulk edit of project {project.id}: {len(created)} created, "
+            f"{len(updated)} updated, {deleted} deleted"
+        )
+        return {
+            'created': created,
+            'updated': updated,
+            'deleted': list(delete_ids),
+        }
+
+    @staticmethod
+    def changes_since(project: SubtitleProject, since: int, limit: Optional[int] = None) -> Dict:
+        """
+        Entries created, updated or deleted after a project revision
+
+        The project revision is read first and the rows after it, so a write
+        committing in between is returned now and again on the next sync;
+        applying a delta twice is harmless. The client is told to reload
+        everything when the change log cannot cover the gap (a revision
+        older than the retained log, from before the log existed, or from
+        the future) or the delta would be larger than a full reload.
+
+        Args:
+            project: Project to sync
+            since: Last project revision the client applied
+            limit: Most changed entries to return, defaults to SUBTITLE_SYNC_MAX_CHANGES
+
+        Returns:
+            revision to sync from next time, full_reload, and the changed entries and deleted IDs
+        """
+        limit = limit or getattr(settings, 'SUBTITLE_SYNC_MAX_CHANGES', 1000)
+        revision = SubtitleProject.objects.values_list('content_version', flat=True).get(pk=project.pk)
+        result = {'revision': revision, 'since': since, 'full_reload': True, 'changed': [], 'deleted': []}
+        if since == revision:
+            result['full_reload'] = False
+            return result
+        if since > revision or since < revision - SubtitleChange.retention():
+            return result
+
+        changes = list(SubtitleChange.objects.filter(
+            project=project, revision__gt=since
+        ).values_list('revision', 'deleted_ids'))
+        if len([rev for rev, _ in changes if rev <= revision]) != revision - since:
+            return result
+
+        changed = list(SubtitleEntry.objects.filter(
+            project=project, revision__gt=since
+        ).order_by('start_time', 'id')[:limit + 1])
+        if len(changed) > limit:
+            return result
+
+        result.update(
+            full_reload=False,
+            changed=changed,
+            deleted=sorted({entry_id for _, deleted_ids in changes for entry_id in deleted_ids}),
+        )
+        return result
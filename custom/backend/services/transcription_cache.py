@@ -0,0 +1,147 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionCache:
+    """On-disk, size-bounded LRU cache of subtitles keyed by decoded audio content"""
+
+    def __init__(self, directory: str, max_size_mb: int = 512):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Directory holding one JSON file per cached transcription
+            max_size_mb: Total size above which least recently used entries are evicted
+        """
+        self.directory = directory
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(audio: np.ndarray, model_name: str, language: str, variant: str = "") -> str:
+        """
+        Fingerprint decoded PCM together with everything that changes the output
+
+        Args:
+            audio: 16 kHz float32 samples
+            model_name: Whisper model size
+            language: Language code
+            variant: Extra pipeline options that affect the result (e.g. VAD)
+        """
+        digest = hashlib.blake2b(digest_size=32)
+        # Hash the sample buffer in place rather than through a bytes copy
+        digest.update(np.ascontiguousarray(audio, dtype=np.float32).data)
+        digest.update(f"|{model_name}|{language}|{variant}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Return cached subtitles for the key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                subtitles = json.load(f)
+            # Refresh the mtime so eviction sees this entry as recently used
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return subtitles
+
+    def set(self, key: str, subtitles: List[Dict]):
+        """Store subtitles for the key and evict old entries if over budget"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(subtitles, f)
+            # Atomic rename so concurrent workers never read a partial file
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate counters for this process and the on-disk footprint"""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(entries),
+                'size_bytes': sum(size for _, _, size in entries),
+                'max_size_bytes': self.max_size_bytes,
+            }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _entries(self) -> List:
+        """List (mtime, path, size) of cached files"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits its budget"""
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+
+        for _, path, size in entries:
+            if total <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+
+_cache: Optional[TranscriptionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_transcription_cache() -> TranscriptionCache:
+    """Return the transcription cache shared by this process"""
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TranscriptionCache(
+                    getattr(settings, 'TRANSCRIPTION_CACHE_DIR',
+                            os.path.join(settings.MEDIA_ROOT, 'transcription_cache')),
+                    max_size_mb=getattr(settings, 'TRANSCRIPTION_CACHE_MAX_MB', 512)
+                )
+    return _cache
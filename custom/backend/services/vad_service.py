@@ -0,0 +1,142 @@
+import logging
+from typing import Dict, List, Tuple
+import numpy as np
+from .audio_service import AudioService, SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+
+class VADService:
+    """Energy-based voice activity detection used to skip silence before Whisper"""
+
+    @staticmethod
+    def detect_speech(audio: np.ndarray, frame_seconds: float = 0.03,
+                      threshold_ratio: float = 3.0, min_threshold: float = 0.005,
+                      min_speech_seconds: float = 0.25, min_silence_seconds: float = 0.6,
+                      padding_seconds: float = 0.2) -> List[Tuple[int, int]]:
+        """
+        Find speech regions from frame energy
+
+        The threshold adapts to the recording: a frame is speech when its RMS
+        exceeds `threshold_ratio` times the noise floor (20th percentile of
+        frame RMS), and never below `min_threshold`.
+
+        Args:
+            audio: 16 kHz float32 samples
+            frame_seconds: Analysis frame length
+            threshold_ratio: Speech/noise-floor energy ratio
+            min_threshold: Absolute RMS floor for speech
+            min_speech_seconds: Shorter voiced runs are dropped
+            min_silence_seconds: Shorter pauses are bridged
+            padding_seconds: Context kept on both sides of each region
+
+        Returns:
+            List of (start_sample, end_sample) speech regions in order
+        """
+        rms = AudioService.frame_rms(audio, frame_seconds)
+        if len(rms) == 0:
+            return []
+
+        frame_samples = int(frame_seconds * SAMPLE_RATE)
+        threshold = max(min_threshold, float(np.percentile(rms, 20)) * threshold_ratio)
+        voiced = rms > threshold
+
+        # Run boundaries: +1 where a voiced run starts, -1 where it ends
+        edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if len(starts) == 0:
+            return []
+
+        # Bridge pauses shorter than min_silence_seconds
+        min_silence_frames = int(min_silence_seconds / frame_seconds)
+        keep_gap = (starts[1:] - ends[:-1]) >= min_silence_frames
+        starts = starts[np.concatenate(([True], keep_gap))]
+        ends = ends[np.concatenate((keep_gap, [True]))]
+
+        # Drop blips shorter than min_speech_seconds
+        min_speech_frames = int(min_speech_seconds / frame_seconds)
+        long_enough = (ends - starts) >= min_speech_frames
+        starts, ends = starts[long_enough], ends[long_enough]
+
+        padding = int(padding_seconds * SAMPLE_RATE)
+        start_samples = np.maximum(starts * frame_samples - padding, 0)
+        end_samples = np.minimum(ends * frame_samples + padding, len(audio))
+
+        # Padding can make neighbours touch; merge them
+        regions = []
+        for start, end in zip(start_samples.tolist(), end_samples.tolist()):
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+            else:
+                regions.append((start, end))
+        return regions
+
+    @staticmethod
+    def compact(audio: np.ndarray, regions: List[Tuple[int, int]],
+                gap_seconds: float = 0.3) -> Dict:
+        """
+        Concatenate speech regions, separated by short silent gaps
+
+        Args:
+            audio: 16 kHz float32 samples
+            regions: Speech regions from detect_speech
+            gap_seconds: Silence inserted between regions so Whisper keeps them apart
+
+        Returns:
+            Speech map with the compacted 'audio', the arrays needed by
+            remap_segments, and 'total_seconds'/'speech_seconds'/'skipped_seconds'
+        """
+        gap = int(gap_seconds * SAMPLE_RATE)
+        lengths = np.array([end - start for start, end in regions], dtype=np.int64)
+        original_starts = np.array([start for start, _ in regions], dtype=np.int64)
+        if regions:
+            compact_starts = np.concatenate(([0], np.cumsum(lengths + gap)[:-1])).astype(np.int64)
+        else:
+            compact_starts = np.zeros(0, dtype=np.int64)
+
+        total_samples = int(lengths.sum() + gap * max(len(regions) - 1, 0))
+        compacted = np.zeros(total_samples, dtype=np.float32)
+        for (start, end), offset in zip(regions, compact_starts.tolist()):
+            compacted[offset:offset + end - start] = audio[start:end]
+
+        speech_seconds = float(lengths.sum()) / SAMPLE_RATE
+        total_seconds = len(audio) / SAMPLE_RATE
+        return {
+            'audio': compacted,
+            'compact_starts': compact_starts / SAMPLE_RATE,
+            'original_starts': original_starts / SAMPLE_RATE,
+            'lengths': lengths / SAMPLE_RATE,
+            'total_seconds': total_seconds,
+            'speech_seconds': speech_seconds,
+            'skipped_seconds': total_seconds - speech_seconds,
+        }
+
+    @staticmethod
+    def remap_times(times: np.ndarray, speech_map: Dict) -> np.ndarray:
+        """Map times on the compacted timeline back onto the original timeline"""
+        index = np.searchsorted(speech_map['compact_starts'], times, side='right') - 1
+        index = np.clip(index, 0, len(speech_map['compact_starts']) - 1)
+        # Times that fall inside an inserted gap stick to the end of their region
+        offset = np.clip(times - speech_map['compact_starts'][index], 0, speech_map['lengths'][index])
+        return speech_map['original_starts'][index] + offset
+
+    @staticmethod
+    def remap_segments(segments: List[Dict], speech_map: Dict) -> List[Dict]:
+        """Rewrite segment and word timestamps in place onto the original timeline"""
+        if not segments or len(speech_map['compact_starts']) == 0:
+            return segments
+
+        starts = VADService.remap_times(np.array([s['start'] for s in segments]), speech_map)
+        ends = VADService.remap_times(np.array([s['end'] for s in segments]), speech_map)
+        for segment, start, end in zip(segments, starts.tolist(), ends.tolist()):
+            segment['start'] = start
+            segment['end'] = end
+            words = segment.get('words') or []
+            if words:
+                word_starts = VADService.remap_times(np.array([w['start'] for w in words]), speech_map)
+                word_ends = VADService.remap_times(np.array([w['end'] for w in words]), speech_map)
+                for word, word_start, word_end in zip(words, word_starts.tolist(), word_ends.tolist()):
+                    word['start'] = word_start
+                    word['end'] = word_end
+        return segments
@@ -1,9 +1,21 @@
 import os
 import ffmpeg
+import logging
 import tempfile
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from django.conf import settings
 from .whisper_service import SubtitleFormatter
+from .style_compiler import StyleCompiler
+from .encoder_profiles import EncoderProfiles
+
+logger = logging.getLogger(__name__)
+
+# ISO 639-1 codes (stored on entries) to the ISO 639-2 codes containers expect
+ISO_639_2 = {
+    'ar': 'ara', 'de': 'ger', 'en': 'eng', 'es': 'spa', 'fr': 'fre', 'hi': 'hin',
+    'it': 'ita', 'ja': 'jpn', 'ko': 'kor', 'nl': 'dut', 'pl': 'pol', 'pt': 'por',
+    'ru': 'rus', 'sv': 'swe', 'tr': 'tur', 'uk': 'ukr', 'vi': 'vie', 'zh': 'chi',
+}
 
 class VideoService:
     """Service for video processing operations"""
@@ -49,28 +61,20 @@ class VideoService:
             return False
     
     @staticmethod
-    def compress_video(input_path: str, output_path: str, target_size_mb: int = 100) -> bool:
-        """Compress video to target size"""
+    def compress_video(input_path: str, output_path: str, target_size_mb: int = 100,
+                       profile: Optional[str] = None) -> bool:
+        """
+        Compress video to target size, with the speed settings of an encoder profile
+        
+        Two-pass with an audio budget; see CompressionService.compress for
+        the size report.
+        """
+        from .compression_service import CompressionService
         try:
-            # Get video info
-            probe = ffmpeg.probe(input_path)
-            duration = float(probe['format']['duration'])
-            
-            # Calculate target bitrate (bits per second)
-            target_size_bits = target_size_mb * 8 * 1024 * 1024
-            target_bitrate = int(target_size_bits / duration)
-            
-            ffmpeg.input(input_path).output(
-                output_path,
-                video_bitrate=target_bitrate,
-                acodec='aac',
-                vcodec='libx264',
-                preset='medium'
-            ).run(quiet=True)
-            
+            CompressionService.compress(input_path, output_path, target_size_mb, profile=profile)
             return True
         except Exception as e:
-            print(f"Error compressing video: {e}")
+            logger.error(f"Error compressing video: {e}")
             return False
     
     @staticmethod
@@ -103,114 +107,129 @@ class VideoService:
             font_color: Font color (white, yellow, etc.)
             outline_color: Outline color for better visibility
         """
+        temp_ass_path = VideoService.write_subtitle_file(
+            ((sub['start_time'], sub['end_time'], sub['text']) for sub in subtitles),
+            StyleCompiler.compile_preset(style, font_size, font_color, outline_color)
+        )
         try:
-            # Create temporary SRT file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.srt', delete=False) as temp_srt:
-                srt_content = SubtitleFormatter.format_srt(subtitles)
-                temp_srt.write(srt_content)
-                temp_srt_path = temp_srt.name
-            
-            # Define subtitle filter based on style
-            subtitle_filter = VideoService._get_subtitle_filter(
-                temp_srt_path, style, font_size, font_color, outline_color
-            )
-            
-            # Process video with embedded subtitles
-            ffmpeg.input(video_path).output(
-                output_path,
-                vf=subtitle_filter,
-                acodec='copy',  # Copy audio without re-encoding
-                vcodec='libx264',
-                preset='medium'
-            ).run(quiet=True)
-            
-            # Clean up temporary file
-            os.unlink(temp_srt_path)
-            
+            VideoService.burn_in_stream(video_path, temp_ass_path, output_path).run(quiet=True)
             return True
             
+        except ffmpeg.Error as e:
+            logger.error(f"Error embedding subtitles: {e.stderr.decode(errors='replace') if e.stderr else e}")
+            return False
         except Exception as e:
-            print(f"Error embedding subtitles: {e}")
-            # Clean up temporary file if it exists
-            if 'temp_srt_path' in locals():
-                try:
-                    os.unlink(temp_srt_path)
-                except:
-                    pass
+            logger.error(f"Error embedding subtitles: {e}")
             return False
+        finally:
+            os.unlink(temp_ass_path)
     
     @staticmethod
-    def _get_subtitle_filter(srt_path: str, style: str, font_size: int, 
-                           font_color: str, outline_color: str) -> str:
-        """Generate FFmpeg subtitle filter based on style"""
+    def write_subtitle_file(cues, ass_header: Optional[str] = None, path: Optional[str] = None) -> str:
+        """
+        Write cues to an ASS file for burn-in
         
-        # Base subtitle filter
-        base_filter = f"subtitles={srt_path}"
+        Args:
+            cues: (start_time, end_time, text) tuples in timeline order
+            ass_header: Compiled style header from StyleCompiler, defaults to
+                the 'default' preset
+            path: File to write, defaults to a new temporary file
         
-        # Style-specific configurations
-        style_configs = {
-            'default': {
-                'fontsize': font_size,
-                'fontcolor': font_color,
-                'outline': 2,
-                'outlinecolor': outline_color,
-                'shadow': 1,
-                'shadowcolor': 'black',
-                'shadowoffset': 2
-            },
-            'modern': {
-                'fontsize': font_size,
-                'fontcolor': font_color,
-                'outline': 1,
-                'outlinecolor': outline_color,
-                'shadow': 2,
-                'shadowcolor': 'rgba(0,0,0,0.5)',
-                'shadowoffset': 3,
-                'box': 1,
-                'boxcolor': 'rgba(0,0,0,0.3)',
-                'boxborderw': 5
-            },
-            'bold': {
-                'fontsize': font_size + 4,
-                'fontcolor': font_color,
-                'outline': 3,
-                'outlinecolor': outline_color,
-                'shadow': 1,
-                'shadowcolor': 'black',
-                'shadowoffset': 1
-            },
-            'minimal': {
-                'fontsize': font_size - 2,
-                'fontcolor': font_color,
-                'outline': 1,
-                'outlinecolor': outline_color,
-                'shadow': 0
-            }
-        }
+        Returns:
+            Path of the file; the caller deletes it
+        """
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix='.ass')
+            os.close(fd)
+        with open(path, 'w', encoding='utf-8') as f:
+            SubtitleFormatter.write_export(
+                cues, 'ass', f, ass_header=ass_header or StyleCompiler.compile_preset('default')
+            )
+        return path
+    
+    @staticmethod
+    def burn_in_stream(video_path: str, subtitle_path: str, output_path: str,
+                       start: Optional[float] = None, duration: Optional[float] = None,
+                       audio: bool = True, threads: Optional[int] = None,
+                       encoder: Optional[Dict] = None, height: Optional[int] = None):
+        """
+        Build the ffmpeg command that burns an ASS file into a video
+        
+        Styling comes from the file's compiled [V4+ Styles] header, so the
+        command is the same for every style.
+        
+        Args:
+            video_path: Source video
+            subtitle_path: ASS file from write_subtitle_file
+            output_path: Rendered video
+            start: Seek to this time (seconds) before rendering; subtitle times
+                are then relative to it
+            duration: Only render this many seconds
+            audio: Copy the audio stream, otherwise drop it
+            threads: Encoder threads, overriding the profile's
+            encoder: Encoder options from EncoderProfiles.output_args(),
+                defaults to the default profile
+            height: Downscale to this height before the subtitles are drawn
+        
+        Returns:
+            ffmpeg-python output stream, ready to run() or compile()
+        """
+        input_args = {}
+        if start is not None:
+            input_args['ss'] = start
+        if duration is not None:
+            input_args['t'] = duration
+        
+        output_args = dict(encoder or EncoderProfiles.output_args())
+        output_args['vf'] = VideoService._get_subtitle_filter(subtitle_path)
+        if height:
+            # libass lays the script out on PlayResY, so styles keep their proportions
+            output_args['vf'] = f"scale=-2:{height},{output_args['vf']}"
+        if audio:
+            output_args['acodec'] = 'copy'  # Copy audio without re-encoding
+        else:
+            output_args['an'] = None
+        if threads:
+            output_args['threads'] = threads
+        
+        return ffmpeg.input(video_path, **input_args).output(output_path, **output_args).overwrite_output()
+    
+    @staticmethod
+    def mux_stream(video_path: str, tracks: List[tuple], output_path: str, container: str = 'mp4'):
+        """
+        Build the ffmpeg command that adds subtitle tracks without re-encoding
         
-        config = style_configs.get(style, style_configs['default'])
+        Args:
+            video_path: Source video
+            tracks: (subtitle file path, language code) per track; the first
+                track is marked as the default one
+            output_path: Output file
+            container: 'mp4' (tracks converted to mov_text) or 'mkv' (tracks
+                copied as they are, SRT or ASS)
+        
+        Returns:
+            ffmpeg-python output stream, ready to run() or compile()
+        """
+        source = ffmpeg.input(video_path)
+        streams = [source['v'], source['a?']]
+        output_args = {'c': 'copy'}
         
-        # Build filter string
-        filter_parts = [base_filter]
+        for index, (track_path, language) in enumerate(tracks):
+            streams.append(ffmpeg.input(track_path)['s'])
+            output_args[f'metadata:s:s:{index}'] = f"language={ISO_639_2.get(language, language)}"
+            output_args[f'disposition:s:{index}'] = 'default' if index == 0 else '0'
         
-        if config.get('outline'):
-            filter_parts.append(f":outline={config['outline']}")
-        if config.get('outlinecolor'):
-            filter_parts.append(f":outlinecolor={config['outlinecolor']}")
-        if config.get('shadow'):
-            filter_parts.append(f":shadow={config['shadow']}")
-        if config.get('shadowcolor'):
-            filter_parts.append(f":shadowcolor={config['shadowcolor']}")
-        if config.get('shadowoffset'):
-            filter_parts.append(f":shadowoffset={config['shadowoffset']}")
-        if config.get('box'):
-            filter_parts.append(f":box={config['box']}")
-        if config.get('boxcolor'):
-            filter_parts.append(f":boxcolor={config['boxcolor']}")
-        if config.get('boxborderw'):
-            filter_parts.append(f":boxborderw={config['boxborderw']}")
+        if container == 'mp4':
+            output_args['c:s'] = 'mov_text'
+            output_args['movflags'] = '+faststart'
         
-        return ''.join(filter_parts)
+        return ffmpeg.output(*streams, output_path, **output_args).overwrite_output()
+    
+    @staticmethod
+    def _get_subtitle_filter(ass_path: str) -> str:
+        """libass filter for an ASS file, with the path escaped for the filtergraph"""
+        escaped = ass_path.replace('\\', '/').replace(':', '\\:').replace("'", "\\'")
+        return f"ass='{escaped}'"
 
 class VideoUploadService:
     """Service for handling video uploads and project creation"""
@@ -237,17 +256,9 @@ class VideoUploadService:
             if not video_info['valid']:
                 raise ValueError(f"Invalid video file: {video_info['error']}")
             
-            # Extract audio for processing
-            audio_path = os.path.join(project_dir, f"{project_name}_audio.wav")
-            if not VideoService.extract_audio(video_path, audio_path):
-                raise ValueError("Failed to extract audio from video")
-            
-            # Process video with Whisper
-            from .whisper_service import WhisperService
-            subtitles = WhisperService.process_video(audio_path, language)
-            
             # Create project in database
-            from ..models.subtitle_models import SubtitleProject, SubtitleEntry
+            from ..models.subtitle_models import SubtitleProject
+            from .whisper_service import enqueue_video_processing
             
             project = SubtitleProject.objects.create(
                 user=user,
@@ -257,38 +268,21 @@ class VideoUploadService:
                 video_duration=video_info['duration'],
                 video_size=video_info['size'],
                 language=language,
-                status='completed',
-                is_processing=False,
-                is_completed=True
+                status='processing'
             )
             
-            # Create subtitle entries
-            for i, subtitle in enumerate(subtitles):
-                SubtitleEntry.objects.create(
-                    project=project,
-                    start_time=subtitle['start_time'],
-                    end_time=subtitle['end_time'],
-                    text=subtitle['text'],
-                    language=language,
-                    confidence=subtitle.get('confidence', 0.0),
-                    is_edited=False
-                )
-            
-            # Clean up temporary audio file
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
+            # Transcription runs on a Celery worker, progress goes to upload_progress_{id}
+            enqueue_video_processing(project)
             
             return {
                 'success': True,
                 'project_id': project.id,
-                'subtitle_count': len(subtitles)
+                'status': project.status
             }
             
         except Exception as e:
             # Clean up on error
             if 'video_path' in locals() and os.path.exists(video_path):
                 os.remove(video_path)
-            if 'audio_path' in locals() and os.path.exists(audio_path):
-                os.remove(audio_path)
             
             raise e 
\ No newline at end of file
@@ -1,36 +1,87 @@
 import os
+import time
 import tempfile
 import logging
-from typing import List, Dict, Optional, Tuple
-import whisper
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, TextIO, Tuple, Union
+import numpy as np
 import ffmpeg
 from django.conf import settings
 from django.core.files import File
+from django.db import transaction
 from celery import shared_task
-from ..models.subtitle_models import SubtitleProject, SubtitleEntry
+from ..models.subtitle_models import SubtitleProject
+from .model_registry import get_model_registry
+from .audio_service import AudioService, SAMPLE_RATE
+from .parallel_transcription import ParallelTranscriber
+from .vad_service import VADService
+from .transcription_cache import get_transcription_cache
+from .subtitle_service import SubtitleService
+from .progress_service import ProgressReporter, ProgressService
+from ..serializers.subtitle_serializers import SubtitleEntryListSerializer
 
 logger = logging.getLogger(__name__)
 
+# Whisper advances its progress bar in mel frames, 100 per second of audio
+MEL_FRAMES_PER_SECOND = 100
+
+ProgressCallback = Callable[[float, float, int], None]
+SegmentCallback = Callable[[List[Dict]], None]
+
+@contextmanager
+def _track_decode_progress(callback: ProgressCallback, total_seconds: float):
+    """Route the progress bar updates of model.transcribe to a callback"""
+    import whisper.transcribe as whisper_transcribe
+    original_tqdm = whisper_transcribe.tqdm
+    
+    class _ProgressBar(original_tqdm.tqdm):
+        frames = 0
+        
+        def update(self, n=1):
+            self.frames += n
+            callback(min(self.frames / MEL_FRAMES_PER_SECOND, total_seconds), total_seconds, 0)
+            return super().update(n)
+    
+    whisper_transcribe.tqdm = SimpleNamespace(tqdm=_ProgressBar)
+    try:
+        yield
+    finally:
+        whisper_transcribe.tqdm = original_tqdm
+
 class WhisperService:
     """Service for handling Whisper AI speech-to-text processing"""
     
-    def __init__(self, model_name: str = "base"):
+    def __init__(self, model_name: str = "base", device: Optional[str] = None,
+                 dtype: Optional[str] = None):
         """
         Initialize Whisper service with specified model
         
         Args:
             model_name: Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
+            device: Torch device, auto-detected when omitted
+            dtype: Model precision ('float32', 'float16')
         """
         self.model_name = model_name
+        self.device = device
+        self.dtype = dtype
         self.model = None
+        self.model_load_seconds = 0.0
+        self.vad_stats = None
+        self.cache_hit = False
+        self.progress_callback: Optional[ProgressCallback] = None
+        self.segment_callback: Optional[SegmentCallback] = None
         self._load_model()
     
     def _load_model(self):
-        """Load Whisper model"""
+        """Get Whisper model from the process-wide registry"""
         try:
-            logger.info(f"Loading Whisper model: {self.model_name}")
-            self.model = whisper.load_model(self.model_name)
-            logger.info(f"Whisper model {self.model_name} loaded successfully")
+            started = time.perf_counter()
+            self.model = get_model_registry().get(self.model_name, self.device, self.dtype)
+            self.model_load_seconds = time.perf_counter() - started
+            logger.info(
+                f"Whisper model {self.model_name} ready in {self.model_load_seconds:.2f}s"
+            )
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {e}")
             raise
@@ -46,8 +97,9 @@ class WhisperService:
             Path to extracted audio file
         """
         try:
-            # Create temporary audio file
-            audio_path = tempfile.mktemp(suffix='.wav')
+            # Create temporary audio file (mkstemp reserves the name atomically)
+            fd, audio_path = tempfile.mkstemp(suffix='.wav')
+            os.close(fd)
             
             # Extract audio using FFmpeg
             stream = ffmpeg.input(video_path)
@@ -61,34 +113,242 @@ class WhisperService:
             logger.error(f"Failed to extract audio from {video_path}: {e}")
             raise
     
-    def transcribe_audio(self, audio_path: str, language: str = "en") -> Dict:
+    def load_audio_from_video(self, video_path: str) -> np.ndarray:
+        """
+        Decode audio from video file straight into memory, without a temp file
+        
+        Args:
+            video_path: Path to video file
+            
+        Returns:
+            16 kHz mono float32 samples
+        """
+        try:
+            return AudioService.load_audio(video_path)
+        except Exception as e:
+            logger.error(f"Failed to decode audio from {video_path}: {e}")
+            raise
+    
+    def transcribe_audio(self, audio: Union[str, np.ndarray], language: str = "en",
+                         report_progress: bool = False) -> Dict:
         """
         Transcribe audio using Whisper
         
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file or 16 kHz float32 samples
             language: Language code (e.g., 'en', 'fr', 'es')
+            report_progress: Send decode progress to self.progress_callback
             
         Returns:
             Transcription result dictionary
         """
+        label = audio if isinstance(audio, str) else f"<{len(audio)} samples>"
         try:
-            logger.info(f"Starting transcription of {audio_path} in language {language}")
+            logger.info(f"Starting transcription of {label} in language {language}")
             
             # Transcribe with Whisper
+            if report_progress and self.progress_callback and not isinstance(audio, str):
+                with _track_decode_progress(self.progress_callback, len(audio) / SAMPLE_RATE):
+                    result = self.model.transcribe(
+                        audio,
+                        language=language,
+                        word_timestamps=True,
+                        verbose=True
+                    )
+            else:
+                result = self.model.transcribe(
+                    audio,
+                    language=language,
+                    word_timestamps=True,
+                    verbose=True
+                )
+            
+            logger.info(f"Transcription completed for {label}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to transcribe {label}: {e}")
+            raise
+    
+    def transcribe_windows(self, video_path: str, language: str = "en",
+                           window_seconds: float = 30.0) -> List[Dict]:
+        """
+        Transcribe audio window by window while ffmpeg is still decoding
+        
+        Memory stays bounded by one window, at the cost of Whisper not seeing
+        context across window boundaries.
+        
+        Args:
+            video_path: Path to video file
+            language: Language code
+            window_seconds: Window length in seconds
+            
+        Returns:
+            Whisper segments with timestamps on the original timeline
+        """
+        segments = []
+        total_seconds = AudioService.probe_duration(video_path) or 0.0
+        
+        for window_start, window in AudioService.iter_windows(video_path, window_seconds):
+            result = self.transcribe_audio(window, language)
+            for segment in result['segments']:
+                segment['start'] += window_start
+                segment['end'] += window_start
+                for word in segment.get('words', []):
+                    word['start'] += window_start
+                    word['end'] += window_start
+            segments.extend(result['segments'])
+            
+            if self.segment_callback:
+                self.segment_callback(self.process_segments_to_subtitles(result['segments']))
+            
+            if self.progress_callback:
+                processed = window_start + len(window) / SAMPLE_RATE
+                self.progress_callback(processed, max(total_seconds, processed), len(segments))
+        
+        return segments
+    
+    def transcribe_parallel(self, audio: np.ndarray, language: str = "en",
+                            workers: Optional[int] = None) -> List[Dict]:
+        """
+        Transcribe audio as silence-aligned windows across CPU worker processes
+        
+        Args:
+            audio: 16 kHz float32 samples
+            language: Language code
+            workers: Number of worker processes, defaults to the CPU count
+            
+        Returns:
+            Whisper segments stitched onto the original timeline
+        """
+        try:
+            transcriber = ParallelTranscriber(
+                self.model_name,
+                workers=workers,
+                device=self.device,
+                dtype=self.dtype,
+                window_seconds=getattr(settings, 'WHISPER_PARALLEL_WINDOW_SECONDS', 120.0)
+            )
+            return transcriber.transcribe(audio, language, self.progress_callback)
+        except Exception as e:
+            logger.error(f"Failed to transcribe audio in parallel: {e}")
+            raise
+    
+    def transcribe_incremental(self, audio: np.ndarray, language: str = "en",
+                               speech_map: Optional[Dict] = None) -> List[Dict]:
+        """
+        Transcribe silence-aligned windows in order, handing each window's
+        segments to self.segment_callback as soon as the model emits them
+        
+        Each window is conditioned on the tail of the previous window's text
+        so context carries across the cuts.
+        
+        Args:
+            audio: 16 kHz float32 samples
+            language: Language code
+            speech_map: VAD speech map when audio is the compacted speech track
+            
+        Returns:
+            Whisper segments on the original timeline
+        """
+        planner = ParallelTranscriber(
+            self.model_name,
+            window_seconds=getattr(settings, 'WHISPER_STREAMING_WINDOW_SECONDS', 30.0),
+            overlap_seconds=0.0
+        )
+        windows = planner.plan_windows(audio)
+        total_seconds = len(audio) / SAMPLE_RATE
+        segments = []
+        prompt = None
+        
+        for window in windows:
+            offset = window['start'] / SAMPLE_RATE
             result = self.model.transcribe(
-                audio_path,
+                audio[window['start']:window['end']],
                 language=language,
                 word_timestamps=True,
-                verbose=True
+                initial_prompt=prompt,
+                verbose=None
             )
+            prompt = result['text'][-200:] or None
             
-            logger.info(f"Transcription completed for {audio_path}")
-            return result
+            window_segments = result['segments']
+            for segment in window_segments:
+                segment['start'] += offset
+                segment['end'] += offset
+                for word in segment.get('words', []):
+                    word['start'] += offset
+                    word['end'] += offset
+            if speech_map is not None:
+                VADService.remap_segments(window_segments, speech_map)
+            segments.extend(window_segments)
             
-        except Exception as e:
-            logger.error(f"Failed to transcribe {audio_path}: {e}")
-            raise
+            if window_segments:
+                self.segment_callback(self.process_segments_to_subtitles(window_segments))
+            if self.progress_callback:
+                self.progress_callback(window['end'] / SAMPLE_RATE, total_seconds, len(segments))
+        
+        return segments
+    
+    def transcribe_speech_only(self, audio: np.ndarray, language: str = "en") -> List[Dict]:
+        """
+        Transcribe only the speech regions found by the VAD pre-pass
+        
+        Silence and low-energy stretches are cut out before inference and the
+        segment timestamps are mapped back onto the original timeline. The
+        amount of audio skipped is kept in self.vad_stats.
+        
+        Args:
+            audio: 16 kHz float32 samples
+            language: Language code
+            
+        Returns:
+            Whisper segments on the original timeline
+        """
+        regions = VADService.detect_speech(audio)
+        speech_map = VADService.compact(audio, regions)
+        self.vad_stats = {
+            'total_seconds': speech_map['total_seconds'],
+            'speech_seconds': speech_map['speech_seconds'],
+            'skipped_seconds': speech_map['skipped_seconds'],
+            'regions': len(regions),
+        }
+        logger.info(
+            f"VAD kept {speech_map['speech_seconds']:.1f}s of {speech_map['total_seconds']:.1f}s "
+            f"in {len(regions)} regions, skipping {speech_map['skipped_seconds']:.1f}s"
+        )
+        
+        if not regions:
+            return []
+        
+        return self._transcribe_buffer(speech_map['audio'], language, speech_map)
+    
+    def _transcribe_buffer(self, audio: np.ndarray, language: str,
+                           speech_map: Optional[Dict] = None) -> List[Dict]:
+        """
+        Transcribe in-memory audio incrementally when segments are being
+        streamed, in parallel when it is long enough, serially otherwise
+        """
+        if self.segment_callback is not None:
+            return self.transcribe_incremental(audio, language, speech_map)
+        
+        workers = getattr(settings, 'WHISPER_PARALLEL_WORKERS', 1)
+        min_seconds = getattr(settings, 'WHISPER_PARALLEL_MIN_SECONDS', 600)
+        if workers > 1 and not ParallelTranscriber.available():
+            # Prefork Celery workers are daemonic and cannot start a pool
+            logger.warning(
+                'WHISPER_PARALLEL_WORKERS is ignored in a daemonic worker process; '
+                'use a threads or solo Celery pool for parallel transcription'
+            )
+            workers = 1
+        if workers > 1 and len(audio) / SAMPLE_RATE >= min_seconds:
+            segments = self.transcribe_parallel(audio, language, workers)
+        else:
+            segments = self.transcribe_audio(audio, language, report_progress=True)['segments']
+        
+        if speech_map is not None:
+            VADService.remap_segments(segments, speech_map)
+        return segments
     
     def process_segments_to_subtitles(self, segments: List[Dict]) -> List[Dict]:
         """
@@ -114,30 +374,63 @@ class WhisperService:
         
         return subtitles
     
-    def process_video(self, video_path: str, language: str = "en") -> List[Dict]:
+    def process_video(self, video_path: str, language: str = "en",
+                      progress_callback: Optional[ProgressCallback] = None,
+                      segment_callback: Optional[SegmentCallback] = None) -> List[Dict]:
         """
         Process video file to generate subtitles
         
         Args:
             video_path: Path to video file
             language: Language code
+            progress_callback: Called with (seconds decoded, total seconds, segments emitted)
+            segment_callback: Called with each new batch of subtitle dictionaries,
+                in timeline order, while transcription is still running
             
         Returns:
             List of subtitle dictionaries
         """
+        self.progress_callback = progress_callback
+        self.segment_callback = segment_callback
         try:
-            # Extract audio
-            audio_path = self.extract_audio_from_video(video_path)
+            if getattr(settings, 'WHISPER_AUDIO_MODE', 'buffer') == 'windowed':
+                # Decode and transcribe fixed-size windows with bounded memory
+                segments = self.transcribe_windows(video_path, language)
+                return self.process_segments_to_subtitles(segments)
             
-            # Transcribe audio
-            transcription = self.transcribe_audio(audio_path, language)
+            # Decode the whole track into one preallocated buffer
+            audio = self.load_audio_from_video(video_path)
+            vad_enabled = getattr(settings, 'WHISPER_VAD_ENABLED', False)
+            
+            # Identical audio (e.g. a re-upload) reuses the stored result
+            cache = None
+            if getattr(settings, 'TRANSCRIPTION_CACHE_ENABLED', True):
+                cache = get_transcription_cache()
+                cache_key = cache.make_key(
+                    audio, self.model_name, language, variant=f"vad={vad_enabled}"
+                )
+                cached = cache.get(cache_key)
+                self.cache_hit = cached is not None
+                if self.cache_hit:
+                    logger.info(
+                        f"Transcription cache hit for {video_path} "
+                        f"({cache.stats()['hit_rate']:.0%} hit rate)"
+                    )
+                    if self.segment_callback and cached:
+                        self.segment_callback(cached)
+                    return cached
+            
+            if vad_enabled:
+                # Skip silent and music-only stretches before inference
+                segments = self.transcribe_speech_only(audio, language)
+            else:
+                segments = self._transcribe_buffer(audio, language)
             
             # Convert to subtitle format
-            subtitles = self.process_segments_to_subtitles(transcription['segments'])
+            subtitles = self.process_segments_to_subtitles(segments)
             
-            # Clean up temporary audio file
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
+            if cache is not None:
+                cache.set(cache_key, subtitles)
             
             return subtitles
             
@@ -159,31 +452,59 @@ def process_video_async(project_id: int):
         
         # Update status to processing
         project.status = 'processing'
-        project.save()
+        project.save(update_fields=['status', 'updated_at'])
         
-        # Initialize Whisper service
-        whisper_service = WhisperService()
+        # Initialize Whisper service (model comes from the worker's registry)
+        whisper_service = WhisperService(
+            getattr(settings, 'WHISPER_DEFAULT_MODEL', 'base'),
+            device=getattr(settings, 'WHISPER_DEVICE', None),
+            dtype=getattr(settings, 'WHISPER_DTYPE', None)
+        )
         
-        # Process video
+        # Process video, streaming progress to the project's upload_progress group
         video_path = project.video_file.path
-        subtitles = whisper_service.process_video(video_path, project.language)
-        
-        # Create subtitle entries
-        for subtitle_data in subtitles:
-            SubtitleEntry.objects.create(
-                project=project,
-                start_time=subtitle_data['start_time'],
-                end_time=subtitle_data['end_time'],
-                text=subtitle_data['text'],
-                confidence=subtitle_data['confidence'],
-                language=subtitle_data['language']
-            )
+        reporter = ProgressReporter(project_id, os.path.basename(video_path))
+        reporter.stage('transcribing', 0)
+        
+        # In streaming mode each batch of segments is stored and pushed as soon
+        # as it is decoded, so the editor can open before the job finishes
+        streaming = getattr(settings, 'WHISPER_STREAMING_ENABLED', False)
+        segment_callback = None
+        if streaming:
+            # A retried or re-run job streams everything again; drop what an
+            # earlier attempt stored so no cue is appended twice (cues the
+            # user already edited are kept)
+            SubtitleService.clear_unedited_entries(project)
+            
+            def store_segments(batch):
+                entries = SubtitleService.append_entries(project, batch)
+                ProgressService.publish_segments(
+                    project_id, SubtitleEntryListSerializer(entries, many=True).data
+                )
+            segment_callback = store_segments
+        
+        subtitles = whisper_service.process_video(
+            video_path, project.language,
+            progress_callback=reporter,
+            segment_callback=segment_callback
+        )
+        
+        if whisper_service.vad_stats:
+            project.skipped_audio_seconds = whisper_service.vad_stats['skipped_seconds']
+            project.save(update_fields=['skipped_audio_seconds'])
         
-        # Update project status to completed
-        project.status = 'completed'
-        project.save()
+        # Bulk insert subtitle entries and mark the project completed atomically
+        # (streamed entries are already stored, only the status changes)
+        SubtitleService.save_transcription(project, [] if streaming else subtitles)
+        reporter.stage('completed', 100, segments_emitted=len(subtitles))
         
-        logger.info(f"Successfully processed video for project {project_id}")
+        registry_stats = get_model_registry().stats()
+        logger.info(
+            f"Successfully processed video for project {project_id} "
+            f"(model ready in {whisper_service.model_load_seconds:.2f}s, "
+            f"registry hits={registry_stats['hits']} misses={registry_stats['misses']}, "
+            f"transcription cache hit={whisper_service.cache_hit})"
+        )
         
     except SubtitleProject.DoesNotExist:
         logger.error(f"Project {project_id} not found")
@@ -192,65 +513,200 @@ def process_video_async(project_id: int):
         # Update project status to failed
         try:
             project = SubtitleProject.objects.get(id=project_id)
+            if getattr(settings, 'WHISPER_STREAMING_ENABLED', False):
+                # Entries streamed before the failure are an incomplete
+                # transcript; drop them but keep any the user already edited
+                SubtitleService.clear_unedited_entries(project)
             project.status = 'failed'
-            project.save()
+            project.save(update_fields=['status', 'updated_at'])
+            ProgressReporter(project_id).stage('failed', 0, error=str(e))
         except:
             pass
         
         logger.error(f"Failed to process video for project {project_id}: {e}")
         raise
 
+def enqueue_video_processing(project: SubtitleProject):
+    """
+    Queue transcription of a project's video on a Celery worker
+    
+    The task is only sent once the surrounding transaction commits, so the
+    worker never looks up a project row that does not exist yet.
+    
+    Args:
+        project: Saved SubtitleProject with a video file
+    """
+    project.status = 'processing'
+    project.save(update_fields=['status', 'updated_at'])
+    ProgressReporter(project.id).stage('queued', 0)
+    transaction.on_commit(lambda: process_video_async.delay(project.id))
+
 class SubtitleFormatter:
-    """Utility class for formatting subtitles in different formats"""
+    """Utility class for formatting subtitles in different formats
+    
+    Every format is produced by a generator that yields one chunk per cue, so
+    exports run in linear time and never hold the whole file in memory. Cues
+    are (start_time, end_time, text) tuples, which is what
+    SubtitleEntry.objects.values_list(*SubtitleFormatter.CUE_FIELDS).iterator()
+    yields.
+    """
+    
+    FORMATS = ('srt', 'vtt', 'txt', 'ass')
+    CUE_FIELDS = ('start_time', 'end_time', 'text')
+    
+    # Default ASS header; styled headers come from the caller
+    ASS_HEADER = (
+        "[Script Info]\n"
+        "ScriptType: v4.00+\n"
+        "WrapStyle: 0\n"
+        "ScaledBorderAndShadow: yes\n"
+        "PlayResX: 1920\n"
+        "PlayResY: 1080\n"
+        "\n"
+        "[V4+ Styles]\n"
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+        "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+        "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+        "Style: Default,Arial,48,&H00FFFFFF,&H000000FF,&H00000000,&H80000000,"
+        "0,0,0,0,100,100,0,0,1,2,1,2,20,20,40,1\n"
+        "\n"
+        "[Events]\n"
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+    )
     
     @staticmethod
-    def format_srt(subtitles: List[Dict]) -> str:
-        """Format subtitles as SRT"""
-        srt_content = ""
+    def iter_export(cues: Iterable[Tuple[float, float, str]], format_type: str,
+                    ass_header: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield an export chunk by chunk
         
-        for i, subtitle in enumerate(subtitles, 1):
-            start_time = SubtitleFormatter._format_time_srt(subtitle['start_time'])
-            end_time = SubtitleFormatter._format_time_srt(subtitle['end_time'])
-            
-            srt_content += f"{i}\n"
-            srt_content += f"{start_time} --> {end_time}\n"
-            srt_content += f"{subtitle['text']}\n\n"
+        Args:
+            cues: (start_time, end_time, text) tuples in timeline order
+            format_type: One of SubtitleFormatter.FORMATS
+            ass_header: Script info and styles block used for ASS exports
+        """
+        if format_type == 'srt':
+            return SubtitleFormatter._iter_srt(cues)
+        if format_type == 'vtt':
+            return SubtitleFormatter._iter_vtt(cues)
+        if format_type == 'txt':
+            return SubtitleFormatter._iter_txt(cues)
+        if format_type == 'ass':
+            return SubtitleFormatter._iter_ass(cues, ass_header or SubtitleFormatter.ASS_HEADER)
+        raise ValueError(f"Unsupported export format: {format_type}")
+    
+    @staticmethod
+    def write_export(cues: Iterable[Tuple[float, float, str]], format_type: str, output: TextIO,
+                     ass_header: Optional[str] = None, buffer_size: int = 1 << 16) -> int:
+        """
+        Write an export to a file or response object in large buffered writes
+        
+        Returns:
+            Number of characters written
+        """
+        written = 0
+        pending = []
+        pending_size = 0
+        
+        for chunk in SubtitleFormatter.iter_export(cues, format_type, ass_header):
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= buffer_size:
+                output.write(''.join(pending))
+                written += pending_size
+                pending = []
+                pending_size = 0
         
-        return srt_content
+        if pending:
+            output.write(''.join(pending))
+            written += pending_size
+        return written
+    
+    @staticmethod
+    def export_subtitles(subtitles: List[Dict], format_type: str) -> str:
+        """Format subtitle dictionaries in the given format"""
+        return ''.join(SubtitleFormatter.iter_export(
+            SubtitleFormatter._dicts_to_cues(subtitles), format_type
+        ))
+    
+    @staticmethod
+    def format_srt(subtitles: List[Dict]) -> str:
+        """Format subtitles as SRT"""
+        return SubtitleFormatter.export_subtitles(subtitles, 'srt')
     
     @staticmethod
     def format_vtt(subtitles: List[Dict]) -> str:
         """Format subtitles as VTT"""
-        vtt_content = "WEBVTT\n\n"
-        
-        for subtitle in subtitles:
-            start_time = SubtitleFormatter._format_time_vtt(subtitle['start_time'])
-            end_time = SubtitleFormatter._format_time_vtt(subtitle['end_time'])
-            
-            vtt_content += f"{start_time} --> {end_time}\n"
-            vtt_content += f"{subtitle['text']}\n\n"
-        
-        return vtt_content
+        return SubtitleFormatter.export_subtitles(subtitles, 'vtt')
     
     @staticmethod
     def format_txt(subtitles: List[Dict]) -> str:
         """Format subtitles as plain text"""
-        return "\n".join([subtitle['text'] for subtitle in subtitles])
+        return SubtitleFormatter.export_subtitles(subtitles, 'txt')
+    
+    @staticmethod
+    def format_ass(subtitles: List[Dict], ass_header: Optional[str] = None) -> str:
+        """Format subtitles as ASS"""
+        return ''.join(SubtitleFormatter.iter_export(
+            SubtitleFormatter._dicts_to_cues(subtitles), 'ass', ass_header
+        ))
+    
+    @staticmethod
+    def _dicts_to_cues(subtitles: Iterable[Dict]) -> Iterator[Tuple[float, float, str]]:
+        return ((s['start_time'], s['end_time'], s['text']) for s in subtitles)
+    
+    @staticmethod
+    def _iter_srt(cues) -> Iterator[str]:
+        format_time = SubtitleFormatter._format_time_srt
+        for i, (start, end, text) in enumerate(cues, 1):
+            yield f"{i}\n{format_time(start)} --> {format_time(end)}\n{text}\n\n"
+    
+    @staticmethod
+    def _iter_vtt(cues) -> Iterator[str]:
+        format_time = SubtitleFormatter._format_time_vtt
+        yield "WEBVTT\n\n"
+        for start, end, text in cues:
+            yield f"{format_time(start)} --> {format_time(end)}\n{text}\n\n"
+    
+    @staticmethod
+    def _iter_txt(cues) -> Iterator[str]:
+        separator = ""
+        for _, _, text in cues:
+            yield f"{separator}{text}"
+            separator = "\n"
+    
+    @staticmethod
+    def _iter_ass(cues, header: str) -> Iterator[str]:
+        format_time = SubtitleFormatter._format_time_ass
+        yield header
+        for start, end, text in cues:
+            # ASS forbids raw newlines in an event and treats braces as override tags
+            text = text.replace('\r', '').replace('\n', '\\N').replace('{', '(').replace('}', ')')
+            yield f"Dialogue: 0,{format_time(start)},{format_time(end)},Default,,0,0,0,,{text}\n"
+    
+    @staticmethod
+    def _split_time(seconds: float, units_per_second: int) -> Tuple[int, int, int, int]:
+        """Split seconds into hours, minutes, seconds and rounded sub-second units"""
+        total = int(round(seconds * units_per_second))
+        total_seconds, fraction = divmod(total, units_per_second)
+        minutes, secs = divmod(total_seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return hours, minutes, secs, fraction
     
     @staticmethod
     def _format_time_srt(seconds: float) -> str:
         """Format time for SRT format (HH:MM:SS,mmm)"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        millisecs = int((seconds % 1) * 1000)
+        hours, minutes, secs, millisecs = SubtitleFormatter._split_time(seconds, 1000)
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millisecs:03d}"
     
     @staticmethod
     def _format_time_vtt(seconds: float) -> str:
         """Format time for VTT format (HH:MM:SS.mmm)"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        millisecs = int((seconds % 1) * 1000)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millisecs:03d}" 
\ No newline at end of file
+        hours, minutes, secs, millisecs = SubtitleFormatter._split_time(seconds, 1000)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millisecs:03d}"
+    
+    @staticmethod
+    def _format_time_ass(seconds: float) -> str:
+        """Format time for ASS format (H:MM:SS.cc)"""
+        hours, minutes, secs, centisecs = SubtitleFormatter._split_time(seconds, 100)
+        return f"{hours:d}:{minutes:02d}:{secs:02d}.{centisecs:02d}"
@@ -4,7 +4,8 @@ from .views.subtitle_views import (
     SubtitleProjectViewSet,
     SubtitleEntryViewSet,
     SubtitleStyleViewSet,
-    SubtitleExportViewSet
+    SubtitleExportViewSet,
+    RenderJobViewSet
 )
 
 # Create router for subtitle viewsets
@@ -13,6 +14,7 @@ router.register(r'projects', SubtitleProjectViewSet, basename='subtitle-project'
 router.register(r'entries', SubtitleEntryViewSet, basename='subtitle-entry')
 router.register(r'styles', SubtitleStyleViewSet, basename='subtitle-style')
 router.register(r'exports', SubtitleExportViewSet, basename='subtitle-export')
+router.register(r'renders', RenderJobViewSet, basename='render-job')
 
 urlpatterns = [
     path('', include(router.urls)),
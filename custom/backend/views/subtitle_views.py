@@ -1,44 +1,79 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
+from rest_framework.pagination import CursorPagination
 from django.contrib.auth import get_user_model
-from django.http import FileResponse
-from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Count
 import os
 import tempfile
-from ..models.subtitle_models import SubtitleProject, SubtitleEntry, SubtitleStyle, SubtitleExport
+from ..models.subtitle_models import SubtitleProject, SubtitleEntry, SubtitleStyle, SubtitleExport, RenderJob
 from ..serializers.subtitle_serializers import (
-    SubtitleProjectSerializer, SubtitleEntrySerializer, 
-    SubtitleStyleSerializer, SubtitleExportSerializer,
-    VideoUploadSerializer, SubtitleExportRequestSerializer, SubtitleSplitRequestSerializer
+    SubtitleProjectSerializer, SubtitleEntrySerializer, SubtitleEntryListSerializer,
+    SubtitleStyleSerializer, SubtitleExportSerializer, RenderJobSerializer,
+    VideoUploadSerializer, SubtitleExportRequestSerializer, SubtitleSplitRequestSerializer,
+    SubtitleEmbedRequestSerializer, SubtitleMuxRequestSerializer, SubtitlePreviewRequestSerializer,
+    SubtitleBulkEditSerializer, SubtitleEntryBulkItemSerializer, SubtitleRetimeRequestSerializer,
+    SubtitleMergeRequestSerializer, SubtitleSyncRequestSerializer
 )
-from ..services.video_service import VideoService
+from ..services.export_service import ExportService
+from ..services.render_service import RenderService, RenderTimeout
+from ..services.preview_service import PreviewService
+from ..services.subtitle_service import SubtitleService, RevisionConflict
+from ..services.interval_index import IntervalIndex
+from ..services.encoder_profiles import EncoderProfiles
+from ..services.whisper_service import enqueue_video_processing, SubtitleFormatter
 
 User = get_user_model()
 
+def revision_conflict_response(conflict):
+    """409 response listing the entries a conditional write was rejected for"""
+    return Response({
+        'error': 'Subtitles were changed by another edit',
+        'conflicts': SubtitleEntryListSerializer(conflict.entries, many=True).data,
+        'deleted': conflict.deleted_ids
+    }, status=status.HTTP_409_CONFLICT)
+
+class SubtitleTimelinePagination(CursorPagination):
+    """Keyset pagination over a project's timeline (start_time, then id)"""
+    
+    ordering = ('start_time', 'id')
+    page_size = 500
+    page_size_query_param = 'limit'
+    max_page_size = 2000
+
 class SubtitleProjectViewSet(viewsets.ModelViewSet):
     queryset = SubtitleProject.objects.all()
     serializer_class = SubtitleProjectSerializer
     permission_classes = [AllowAny]  # Allow unauthenticated access for development
     
     def get_queryset(self):
+        # One query per page: user joined in, entry counts aggregated in SQL
+        queryset = SubtitleProject.objects.select_related('user').annotate(
+            entry_count=Count('subtitle_entries')
+        )
         if self.request.user.is_authenticated:
-            return SubtitleProject.objects.filter(user=self.request.user)
+            return queryset.filter(user=self.request.user)
         else:
             # Return all projects for development
-            return SubtitleProject.objects.all()
+            return queryset
     
     def perform_create(self, serializer):
         if self.request.user.is_authenticated:
-            serializer.save(user=self.request.user)
+            project = serializer.save(user=self.request.user)
         else:
             # Create or get a default user for development
             dev_user, created = User.objects.get_or_create(
                 username='dev_user',
                 defaults={'email': 'dev@example.com'}
             )
-            serializer.save(user=dev_user)
+            project = serializer.save(user=dev_user)
+        
+        # Return immediately; transcription progress is pushed over Channels
+        enqueue_video_processing(project)
     
     @action(detail=True, methods=['get'])
     def status(self, request, pk=None):
@@ -54,11 +89,141 @@ class SubtitleProjectViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def subtitles(self, request, pk=None):
-        """Get all subtitles for a project"""
+        """
+        Get a page of a project's subtitles in timeline order
+        
+        Query parameters:
+            start, end: Only cues overlapping this time window (seconds)
+            after_time: Only cues starting after this time (live transcription)
+            limit: Page size (default 500, max 2000)
+            cursor: Opaque cursor from the previous page's 'next' link
+        """
         project = self.get_object()
         subtitles = SubtitleEntry.objects.filter(project=project)
-        serializer = SubtitleEntrySerializer(subtitles, many=True)
-        return Response(serializer.data)
+        
+        try:
+            window_start = request.query_params.get('start')
+            if window_start is not None:
+                subtitles = subtitles.filter(end_time__gt=float(window_start))
+            
+            window_end = request.query_params.get('end')
+            if window_end is not None:
+                subtitles = subtitles.filter(start_time__lt=float(window_end))
+            
+            # Cursor for clients following a project that is still transcribing
+            after_time = request.query_params.get('after_time')
+            if after_time is not None:
+                subtitles = subtitles.filter(start_time__gt=float(after_time))
+        except ValueError:
+            return Response({
+                'error': 'start, end and after_time must be numbers of seconds'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        paginator = SubtitleTimelinePagination()
+        page = paginator.paginate_queryset(subtitles, request, view=self)
+        serializer = SubtitleEntryListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def changes(self, request, pk=None):
+        """
+        Entries created, updated or deleted since a revision, so editors resync with a delta
+        
+        Query parameters:
+            since: Last project revision (content_version) the client applied
+            limit: Most changed entries to return before asking for a full reload
+        """
+        project = self.get_object()
+        serializer = SubtitleSyncRequestSerializer(data=request.query_params)
+        
+        if serializer.is_valid():
+            result = SubtitleService.changes_since(
+                project, serializer.validated_data['since'], serializer.validated_data.get('limit')
+            )
+            result['changed'] = SubtitleEntryListSerializer(result['changed'], many=True).data
+            return Response(result)
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=True, methods=['get'])
+    def overlaps(self, request, pk=None):
+        """
+        List the pairs of cues that overlap in time
+        
+        Query parameters:
+            language: Timeline to check (default: the project language)
+        """
+        project = self.get_object()
+        index = IntervalIndex.for_project(project, request.query_params.get('language', project.language))
+        pairs = index.overlaps()
+        
+        return Response({
+            'content_version': project.content_version,
+            'count': len(pairs),
+            'overlaps': [
+                {'first': first, 'second': second, 'seconds': round(seconds, 3)}
+                for first, second, seconds in pairs
+            ]
+        })
+    
+    @action(detail=True, methods=['get'])
+    def cues_at(self, request, pk=None):
+        """
+        Get the cues showing at a time, with the cues before and after it
+        
+        Query parameters:
+            time: Player position in seconds
+            language: Timeline to look up (default: the project language)
+        """
+        project = self.get_object()
+        try:
+            time = float(request.query_params['time'])
+        except (KeyError, ValueError):
+            return Response({
+                'error': 'time must be a number of seconds'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        index = IntervalIndex.for_project(project, request.query_params.get('language', project.language))
+        showing = index.at(time)
+        previous_id, next_id = index.around(time)
+        if showing:
+            # The cue before the first one on screen, not one of those on screen
+            previous_id = index.neighbours(showing[0])[0]
+        
+        entries = SubtitleEntry.objects.in_bulk([i for i in showing + [previous_id, next_id] if i is not None])
+        data = {entry_id: SubtitleEntryListSerializer(entry).data for entry_id, entry in entries.items()}
+        
+        return Response({
+            'time': time,
+            'cues': [data[entry_id] for entry_id in showing if entry_id in data],
+            'previous': data.get(previous_id),
+            'next': data.get(next_id)
+        })
+    
+    @action(detail=True, methods=['post'])
+    def retime(self, request, pk=None):
+        """Shift, stretch or framerate-convert every subtitle of the project"""
+        project = self.get_object()
+        serializer = SubtitleRetimeRequestSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            data = serializer.validated_data
+            try:
+                # One UPDATE for the whole project instead of a request per entry
+                updated = SubtitleService.retime(project, data['scale'], data['offset'], data.get('language'))
+            except ValueError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            return Response({
+                'updated': updated,
+                'scale': data['scale'],
+                'offset': data['offset'],
+                'content_version': project.content_version
+            })
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=True, methods=['post'])
     def export(self, request, pk=None):
@@ -70,37 +235,28 @@ class SubtitleProjectViewSet(viewsets.ModelViewSet):
             format_type = serializer.validated_data['format']
             style_id = serializer.validated_data.get('style_id')
             
-            # Get subtitles
-            subtitles = SubtitleEntry.objects.filter(project=project)
-            subtitle_data = [{
-                'start_time': sub.start_time,
-                'end_time': sub.end_time,
-                'text': sub.text,
-                'language': sub.language
-            } for sub in subtitles]
+            if serializer.validated_data['stream']:
+                # Stream cues straight from the database cursor as plain tuples
+                # and render into the response as it is sent, without an export record
+                # ASS exports with a style_id get that style's compiled header
+                ass_header = ExportService.ass_header(format_type, style_id)
+                cues = SubtitleEntry.objects.filter(project=project).order_by('start_time').values_list(
+                    *SubtitleFormatter.CUE_FIELDS
+                ).iterator(chunk_size=2000)
+                response = StreamingHttpResponse(
+                    SubtitleFormatter.iter_export(cues, format_type, ass_header),
+                    content_type='text/plain; charset=utf-8'
+                )
+                response['Content-Disposition'] = f'attachment; filename="{project.id}.{format_type}"'
+                return response
             
-            # Export subtitles
-            from ..services.whisper_service import SubtitleFormatter
-            exported_content = SubtitleFormatter.export_subtitles(subtitle_data, format_type)
-            
-            # Create export record
-            export = SubtitleExport.objects.create(
-                project=project,
-                format=format_type,
-                file=f"exports/{project.id}_{format_type}.{format_type}",
-                style_id=style_id
-            )
-            
-            # Save exported file
-            export_dir = os.path.join(settings.MEDIA_ROOT, 'exports')
-            os.makedirs(export_dir, exist_ok=True)
-            export_path = os.path.join(export_dir, f"{project.id}_{format_type}.{format_type}")
-            
-            with open(export_path, 'w', encoding='utf-8') as f:
-                f.write(exported_content)
+            # Reuses the stored file unless the project's entries or the style changed
+            export, created = ExportService.get_or_render(project, format_type, style_id)
             
             return Response({
                 'export_id': export.id,
+                'content_version': export.content_version,
+                'cached': not created,
                 'download_url': f"/api/subtitle/exports/{export.id}/download/"
             })
         
@@ -108,64 +264,69 @@ class SubtitleProjectViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def embed_subtitles(self, request, pk=None):
-        """Embed subtitles directly into video"""
+        """Queue a render that burns the subtitles into the video"""
         project = self.get_object()
+        serializer = SubtitleEmbedRequestSerializer(data=request.data)
         
-        # Get embedding parameters
-        style = request.data.get('style', 'default')
-        font_size = request.data.get('font_size', 24)
-        font_color = request.data.get('font_color', 'white')
-        outline_color = request.data.get('outline_color', 'black')
+        if serializer.is_valid():
+            # Encoding runs on a Celery worker; progress is pushed as render_progress events.
+            # The encoder profile follows the owner's plan, not the request.
+            options = dict(serializer.validated_data, profile=EncoderProfiles.for_user(project.user))
+            job = RenderService.enqueue(project, 'burn_in', options)
+            return Response(RenderJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
         
-        # Get subtitles
-        subtitles = SubtitleEntry.objects.filter(project=project)
-        subtitle_data = [{
-            'start_time': sub.start_time,
-            'end_time': sub.end_time,
-            'text': sub.text,
-            'language': sub.language
-        } for sub in subtitles]
-        
-        # Get video path
-        video_path = project.video_file.path
-        
-        # Create output path
-        output_filename = f"{project.name}_with_subtitles.mp4"
-        output_dir = os.path.join(settings.MEDIA_ROOT, 'embedded_videos')
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, output_filename)
-        
-        # Embed subtitles
-        success = VideoService.embed_subtitles(
-            video_path=video_path,
-            subtitles=subtitle_data,
-            output_path=output_path,
-            style=style,
-            font_size=font_size,
-            font_color=font_color,
-            outline_color=outline_color
-        )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=True, methods=['post'])
+    def preview(self, request, pk=None):
+        """Burn the subtitles into a few low-resolution seconds around a timestamp"""
+        project = self.get_object()
+        serializer = SubtitlePreviewRequestSerializer(data=request.data)
         
-        if success:
-            # Create export record
-            export = SubtitleExport.objects.create(
-                project=project,
-                format='embedded_video',
-                file=f"embedded_videos/{output_filename}",
-                style_id=None
-            )
+        if serializer.is_valid():
+            if not project.video_file:
+                return Response({
+                    'error': 'Project has no video'
+                }, status=status.HTTP_400_BAD_REQUEST)
             
-            return Response({
-                'success': True,
-                'export_id': export.id,
-                'download_url': f"/api/subtitle/exports/{export.id}/download/",
-                'message': 'Subtitles embedded successfully'
-            })
-        else:
-            return Response({
-                'success': False,
-                'message': 'Failed to embed subtitles'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            data = serializer.validated_data
+            try:
+                # The one encode a web worker runs: a few seconds at preview size,
+                # capped by PREVIEW_TIMEOUT_SECONDS. Repeated requests are served from disk.
+                path, created = PreviewService.get_or_render(
+                    project, data, data['timestamp'], data['seconds'], data['height']
+                )
+            except RenderTimeout:
+                return Response({
+                    'error': 'Preview took too long to render; try a shorter or smaller preview'
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response = FileResponse(open(path, 'rb'), content_type='video/mp4')
+            response['X-Preview-Cached'] = 'false' if created else 'true'
+            return response
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=True, methods=['post'])
+    def mux(self, request, pk=None):
+        """Queue a copy of the video with the subtitles as selectable tracks"""
+        project = self.get_object()
+        serializer = SubtitleMuxRequestSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            entries = SubtitleEntry.objects.filter(project=project)
+            languages = serializer.validated_data.get('languages')
+            if languages:
+                entries = entries.filter(language__in=languages)
+            if not entries.exists():
+                return Response({
+                    'error': 'No subtitles to add as tracks'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Audio and video are stream-copied, the job only rewrites the container
+            job = RenderService.enqueue(project, 'mux', serializer.validated_data)
+            return Response(RenderJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class SubtitleEntryViewSet(viewsets.ModelViewSet):
     queryset = SubtitleEntry.objects.all()
@@ -173,11 +334,129 @@ class SubtitleEntryViewSet(viewsets.ModelViewSet):
     permission_classes = [AllowAny]  # Allow unauthenticated access for development
     
     def get_queryset(self):
+        # project is joined in for SubtitleEntrySerializer.project_name
+        queryset = SubtitleEntry.objects.select_related('project')
         if self.request.user.is_authenticated:
-            return SubtitleEntry.objects.filter(project__user=self.request.user)
+            return queryset.filter(project__user=self.request.user)
         else:
             # Return all entries for development
-            return SubtitleEntry.objects.all()
+            return queryset
+    
+    def expected_revision(self, request):
+        """Project revision a conditional write is based on, from the body or the query string"""
+        value = request.data.get('revision') if hasattr(request.data, 'get') else None
+        if value in (None, ''):
+            value = request.query_params.get('revision')
+        if value in (None, ''):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({'revision': ['A valid integer is required.']})
+    
+    def update(self, request, *args, **kwargs):
+        """Update an entry; with a revision, only if nobody changed it since"""
+        revision = self.expected_revision(request)
+        if revision is None:
+            return super().update(request, *args, **kwargs)
+        
+        subtitle = self.get_object()
+        try:
+            with transaction.atomic():
+                # The project lock holds other writers off between the check and the save
+                SubtitleService.lock_project(subtitle.project_id)
+                SubtitleService.check_revision(subtitle.project_id, [subtitle.pk], revision)
+                return super().update(request, *args, **kwargs)
+        except RevisionConflict as conflict:
+            return revision_conflict_response(conflict)
+    
+    def destroy(self, request, *args, **kwargs):
+        """Delete an entry; with a revision, only if nobody changed it since"""
+        revision = self.expected_revision(request)
+        if revision is None:
+            return super().destroy(request, *args, **kwargs)
+        
+        subtitle = self.get_object()
+        try:
+            with transaction.atomic():
+                SubtitleService.lock_project(subtitle.project_id)
+                SubtitleService.check_revision(subtitle.project_id, [subtitle.pk], revision)
+                return super().destroy(request, *args, **kwargs)
+        except RevisionConflict as conflict:
+            return revision_conflict_response(conflict)
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create, update and delete entries of one project in a single transaction"""
+        serializer = SubtitleBulkEditSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        
+        projects = SubtitleProject.objects.all()
+        if request.user.is_authenticated:
+            projects = projects.filter(user=request.user)
+        project = projects.filter(pk=data['project']).first()
+        if project is None:
+            return Response({
+                'error': 'Project not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        # One query for every row the batch touches
+        rows = SubtitleEntry.objects.filter(project=project).in_bulk(
+            [item['id'] for item in data['update']] + data['delete']
+        )
+        
+        # Validate everything before writing anything; errors are keyed by item index
+        errors = {}
+        creates = []
+        for index, item in enumerate(data['create']):
+            item_serializer = SubtitleEntryBulkItemSerializer(data=item)
+            if item_serializer.is_valid():
+                creates.append(item_serializer.validated_data)
+            else:
+                errors.setdefault('create', {})[index] = item_serializer.errors
+        
+        updates = []
+        for index, item in enumerate(data['update']):
+            entry = rows.get(item['id'])
+            if entry is None:
+                errors.setdefault('update', {})[index] = {'id': ['Entry not found in this project']}
+                continue
+            changes = {name: value for name, value in item.items() if name != 'id'}
+            item_serializer = SubtitleEntryBulkItemSerializer(entry, data=changes, partial=True)
+            if item_serializer.is_valid():
+                updates.append((entry.id, item_serializer.validated_data))
+            else:
+                errors.setdefault('update', {})[index] = item_serializer.errors
+        
+        for index, entry_id in enumerate(data['delete']):
+            if entry_id not in rows:
+                errors.setdefault('delete', {})[index] = ['Entry not found in this project']
+        
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            result = SubtitleService.apply_bulk(
+                project, creates, updates, data['delete'], revision=data.get('revision')
+            )
+        except RevisionConflict as conflict:
+            return revision_conflict_response(conflict)
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'content_version': project.content_version,
+            'created': [
+                dict(SubtitleEntryListSerializer(entry).data, index=index)
+                for index, entry in enumerate(result['created'])
+            ],
+            'updated': SubtitleEntryListSerializer(result['updated'], many=True).data,
+            'deleted': result['deleted']
+        })
     
     @action(detail=True, methods=['post'])
     def split(self, request, pk=None):
@@ -186,66 +465,56 @@ class SubtitleEntryViewSet(viewsets.ModelViewSet):
         serializer = SubtitleSplitRequestSerializer(data=request.data)
         
         if serializer.is_valid():
-            split_time = serializer.validated_data['split_time']
-            
-            # Validate split time
-            if split_time <= subtitle.start_time or split_time >= subtitle.end_time:
+            try:
+                # Validated and written with the project locked, in one transaction
+                original, new_subtitle = SubtitleService.split_entry(
+                    subtitle.pk, serializer.validated_data['split_time'],
+                    revision=serializer.validated_data.get('revision')
+                )
+            except SubtitleEntry.DoesNotExist:
                 return Response({
-                    'error': 'Split time must be between start and end time'
+                    'error': 'Subtitle was deleted by another edit'
+                }, status=status.HTTP_409_CONFLICT)
+            except RevisionConflict as conflict:
+                return revision_conflict_response(conflict)
+            except ValueError as e:
+                return Response({
+                    'error': str(e)
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Create new subtitle entry
-            new_subtitle = SubtitleEntry.objects.create(
-                project=subtitle.project,
-                start_time=split_time,
-                end_time=subtitle.end_time,
-                text=subtitle.text,
-                language=subtitle.language,
-                confidence=subtitle.confidence,
-                is_edited=True
-            )
-            
-            # Update original subtitle
-            subtitle.end_time = split_time
-            subtitle.is_edited = True
-            subtitle.save()
-            
             return Response({
-                'original_subtitle': SubtitleEntrySerializer(subtitle).data,
-                'new_subtitle': SubtitleEntrySerializer(new_subtitle).data
+                'original_entry': SubtitleEntrySerializer(original).data,
+                'new_entry': SubtitleEntrySerializer(new_subtitle).data
             })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=True, methods=['post'])
     def merge(self, request, pk=None):
-        """Merge with next subtitle entry"""
+        """Merge with the next subtitle entry, or the next count entries"""
         subtitle = self.get_object()
+        serializer = SubtitleMergeRequestSerializer(data=request.data)
         
-        # Find next subtitle
-        next_subtitle = SubtitleEntry.objects.filter(
-            project=subtitle.project,
-            start_time__gt=subtitle.start_time
-        ).order_by('start_time').first()
-        
-        if not next_subtitle:
-            return Response({
-                'error': 'No next subtitle to merge with'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Merge text
-        merged_text = f"{subtitle.text} {next_subtitle.text}"
-        
-        # Update original subtitle
-        subtitle.end_time = next_subtitle.end_time
-        subtitle.text = merged_text
-        subtitle.is_edited = True
-        subtitle.save()
-        
-        # Delete next subtitle
-        next_subtitle.delete()
+        if serializer.is_valid():
+            try:
+                merged, merged_ids = SubtitleService.merge_entries(
+                    subtitle.pk, serializer.validated_data['count'],
+                    revision=serializer.validated_data.get('revision')
+                )
+            except SubtitleEntry.DoesNotExist:
+                return Response({
+                    'error': 'Subtitle was deleted by another edit'
+                }, status=status.HTTP_409_CONFLICT)
+            except RevisionConflict as conflict:
+                return revision_conflict_response(conflict)
+            except ValueError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            return Response(dict(SubtitleEntrySerializer(merged).data, merged_ids=merged_ids))
         
-        return Response(SubtitleEntrySerializer(subtitle).data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class SubtitleStyleViewSet(viewsets.ModelViewSet):
     queryset = SubtitleStyle.objects.all()
@@ -261,11 +530,13 @@ class SubtitleExportViewSet(viewsets.ModelViewSet):
     permission_classes = [AllowAny]  # Allow unauthenticated access for development
     
     def get_queryset(self):
+        # project and style are joined in for the serializer's name fields
+        queryset = SubtitleExport.objects.select_related('project', 'style')
         if self.request.user.is_authenticated:
-            return SubtitleExport.objects.filter(project__user=self.request.user)
+            return queryset.filter(project__user=self.request.user)
         else:
             # Return all exports for development
-            return SubtitleExport.objects.all()
+            return queryset
     
     @action(detail=True, methods=['get'])
     def download(self, request, pk=None):
@@ -280,4 +551,25 @@ class SubtitleExportViewSet(viewsets.ModelViewSet):
         else:
             return Response({
                 'error': 'File not found'
-            }, status=status.HTTP_404_NOT_FOUND) 
\ No newline at end of file
+            }, status=status.HTTP_404_NOT_FOUND)
+
+class RenderJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = RenderJob.objects.all()
+    serializer_class = RenderJobSerializer
+    permission_classes = [AllowAny]  # Allow unauthenticated access for development
+    
+    def get_queryset(self):
+        queryset = RenderJob.objects.select_related('project')
+        if self.request.user.is_authenticated:
+            queryset = queryset.filter(project__user=self.request.user)
+        
+        project_id = self.request.query_params.get('project')
+        if project_id is not None:
+            queryset = queryset.filter(project_id=project_id)
+        return queryset
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a queued or running render"""
+        job = RenderService.cancel(self.get_object())
+        return Response(RenderJobSerializer(job).data)
\ No newline at end of file
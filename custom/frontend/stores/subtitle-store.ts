@@ -4,6 +4,14 @@ import { ref, computed } from "vue";
 // API base URL
 const API_BASE_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
+// WebSocket URL of the upload progress consumer
+const WS_BASE_URL =
+  import.meta.env.VITE_WS_URL || API_BASE_URL.replace(/^http/, "ws");
+
+// Projects with more cues than this stream their export instead of using the
+// server's per-version export cache
+const STREAM_EXPORT_MIN_CUES = 20000;
+
 // Helper function to make API calls
 const apiCall = async (endpoint: string, options: RequestInit = {}) => {
   const url = `${API_BASE_URL}${endpoint}`;
@@ -24,6 +32,21 @@ const apiCall = async (endpoint: string, options: RequestInit = {}) => {
   return response.json();
 };
 
+// Helper function to follow cursor pagination until the last page
+const fetchAllPages = async <T>(endpoint: string): Promise<T[]> => {
+  const results: T[] = [];
+  let next: string | null = endpoint;
+
+  while (next) {
+    const page: Page<T> = await apiCall(next);
+    results.push(...page.results);
+    // "next" is an absolute URL; apiCall expects a path relative to the API
+    next = page.next ? new URL(page.next).pathname + new URL(page.next).search : null;
+  }
+
+  return results;
+};
+
 // Helper function for file uploads
 const uploadFile = async (
   endpoint: string,
@@ -65,6 +88,12 @@ const uploadFile = async (
 };
 
 // Types
+export interface Page<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 export interface SubtitleProject {
   id: number;
   name: string;
@@ -77,6 +106,7 @@ export interface SubtitleProject {
   subtitle_count: number;
   is_processing: boolean;
   is_completed: boolean;
+  content_version: number;
   user: string;
   created_at: string;
   updated_at: string;
@@ -92,6 +122,8 @@ export interface SubtitleEntry {
   language: string;
   confidence: number;
   is_edited: boolean;
+  // Project content_version of the entry's last change
+  revision: number;
   formatted_start_time: string;
   formatted_end_time: string;
   duration: number;
@@ -99,6 +131,97 @@ export interface SubtitleEntry {
   updated_at: string;
 }
 
+export type SubtitleEntryFields = Pick<
+  SubtitleEntry,
+  "start_time" | "end_time" | "text" | "language"
+>;
+
+// Changes applied by the bulk endpoint in one transaction
+export interface SubtitleBulkEdit {
+  create?: SubtitleEntryFields[];
+  update?: (Partial<SubtitleEntryFields> & { id: number })[];
+  delete?: number[];
+  // Rejected with a conflict if an updated or deleted entry changed after it
+  revision?: number;
+}
+
+export interface SubtitleBulkResult {
+  content_version: number;
+  // index is the position of the item in SubtitleBulkEdit.create
+  created: (Partial<SubtitleEntry> & { id: number; index: number })[];
+  updated: (Partial<SubtitleEntry> & { id: number })[];
+  deleted: number[];
+}
+
+// Entries changed since a project revision, or a request to reload everything
+export interface SubtitleChanges {
+  revision: number;
+  since: number;
+  full_reload: boolean;
+  changed: Partial<SubtitleEntry>[];
+  deleted: number[];
+}
+
+export interface SubtitleOverlap {
+  first: number;
+  second: number;
+  seconds: number;
+}
+
+// Cues under the player position and the ones to jump to
+export interface CuesAtTime {
+  time: number;
+  cues: Partial<SubtitleEntry>[];
+  previous: Partial<SubtitleEntry> | null;
+  next: Partial<SubtitleEntry> | null;
+}
+
+export interface ProcessingProgress {
+  type: "upload_progress";
+  project_id: number;
+  stage: "queued" | "transcribing" | "completed" | "failed";
+  progress: number;
+  processed: number;
+  total: number;
+  segments_emitted: number;
+  current_file: string;
+  error?: string | null;
+}
+
+export type RenderStatus =
+  | "queued"
+  | "running"
+  | "completed"
+  | "failed"
+  | "cancelled";
+
+export interface RenderJob {
+  id: number;
+  project: number;
+  kind: "burn_in" | "mux";
+  status: RenderStatus;
+  options: Record<string, unknown>;
+  progress: number;
+  content_version: number;
+  cancel_requested: boolean;
+  error: string;
+  export: number | null;
+  download_url: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+export interface RenderProgress {
+  type: "render_progress";
+  project_id: number;
+  job_id: number;
+  status: RenderStatus;
+  progress: number;
+  error?: string | null;
+  download_url?: string | null;
+}
+
 export interface SubtitleStyle {
   id: number;
   name: string;
@@ -125,6 +248,9 @@ export const useSubtitleStore = defineStore("subtitle", () => {
   const projects = ref<SubtitleProject[]>([]);
   const currentProject = ref<SubtitleProject | null>(null);
   const subtitles = ref<SubtitleEntry[]>([]);
+  // Project and revision the loaded subtitles are in sync with
+  const syncedProjectId = ref<number | null>(null);
+  const syncedRevision = ref<number | null>(null);
   const styles = ref<SubtitleStyle[]>([]);
   const exports = ref<SubtitleExport[]>([]);
   const loading = ref(false);
@@ -223,15 +349,56 @@ export const useSubtitleStore = defineStore("subtitle", () => {
     }
   };
 
+  // Stream processing progress pushed by the backend instead of polling status.
+  // Subtitles stored while the project is still transcribing are appended to
+  // the local list as they arrive.
+  const subscribeToProgress = (
+    projectId: number,
+    onProgress: (progress: ProcessingProgress) => void,
+    onRender?: (progress: RenderProgress) => void
+  ) => {
+    const socket = new WebSocket(`${WS_BASE_URL}/ws/upload-progress/`);
+
+    socket.addEventListener("open", () => {
+      socket.send(
+        JSON.stringify({ type: "subscribe_upload", project_id: projectId })
+      );
+    });
+
+    socket.addEventListener("message", (event) => {
+      const message = JSON.parse(event.data);
+      if (message.project_id !== projectId) {
+        return;
+      }
+
+      if (message.type === "upload_progress") {
+        onProgress(message as ProcessingProgress);
+      } else if (message.type === "subtitle_segments") {
+        subtitles.value.push(...(message.subtitles as SubtitleEntry[]));
+      } else if (message.type === "render_progress" && onRender) {
+        onRender(message as RenderProgress);
+      }
+    });
+
+    socket.addEventListener("error", (event) => {
+      console.error("Progress socket error:", event);
+    });
+
+    return () => socket.close();
+  };
+
   const getProjectSubtitles = async (
     projectId: number
   ): Promise<SubtitleEntry[]> => {
     try {
-      const response = await apiCall(
-        `/api/subtitle/projects/${projectId}/subtitles/`
+      // Read the revision first: anything written while the pages load is newer
+      // and comes back on the next sync
+      const project: SubtitleProject = await apiCall(`/api/subtitle/projects/${projectId}/`);
+      subtitles.value = await fetchAllPages<SubtitleEntry>(
+        `/api/subtitle/projects/${projectId}/subtitles/?limit=2000`
       );
-      // Ensure we always set an array, even if the API returns something else
-      subtitles.value = Array.isArray(response) ? response : [];
+      syncedProjectId.value = projectId;
+      syncedRevision.value = project.content_version;
       return subtitles.value;
     } catch (err) {
       error.value = "Failed to fetch subtitles";
@@ -240,11 +407,92 @@ export const useSubtitleStore = defineStore("subtitle", () => {
     }
   };
 
+  // Apply only the changes since the last load or sync, falling back to a full reload
+  const syncSubtitles = async (projectId: number): Promise<SubtitleEntry[]> => {
+    if (syncedProjectId.value !== projectId || syncedRevision.value === null) {
+      return getProjectSubtitles(projectId);
+    }
+
+    try {
+      const changes: SubtitleChanges = await apiCall(
+        `/api/subtitle/projects/${projectId}/changes/?since=${syncedRevision.value}`
+      );
+      if (changes.full_reload) {
+        return getProjectSubtitles(projectId);
+      }
+
+      const deleted = new Set(changes.deleted);
+      const changed = new Map(changes.changed.map((entry) => [entry.id as number, entry]));
+      subtitles.value = subtitles.value
+        .filter((s) => !deleted.has(s.id))
+        .map((s) => {
+          const entry = changed.get(s.id);
+          changed.delete(s.id);
+          return entry ? { ...s, ...entry } : s;
+        });
+      for (const entry of changed.values()) {
+        subtitles.value.push({ ...entry, project: projectId } as SubtitleEntry);
+      }
+      subtitles.value.sort((a, b) => a.start_time - b.start_time || a.id - b.id);
+      syncedRevision.value = changes.revision;
+      return subtitles.value;
+    } catch (err) {
+      error.value = "Failed to sync subtitles";
+      console.error("Error syncing subtitles:", err);
+      throw err;
+    }
+  };
+
+  // Revision to send with a write, so it is rejected if someone else changed the entries
+  const revisionOf = (...ids: number[]) => {
+    const revisions = subtitles.value
+      .filter((s) => ids.includes(s.id) && s.revision !== undefined)
+      .map((s) => s.revision);
+    return revisions.length ? Math.max(...revisions) : undefined;
+  };
+
+  // Fetch only the subtitles that start after the last one we already have
+  const fetchNewSubtitles = async (
+    projectId: number
+  ): Promise<SubtitleEntry[]> => {
+    const last = subtitles.value[subtitles.value.length - 1];
+    const query = last ? `&after_time=${last.start_time}` : "";
+
+    try {
+      const newSubtitles = await fetchAllPages<SubtitleEntry>(
+        `/api/subtitle/projects/${projectId}/subtitles/?limit=2000${query}`
+      );
+      subtitles.value.push(...newSubtitles);
+      return newSubtitles;
+    } catch (err) {
+      error.value = "Failed to fetch subtitles";
+      console.error("Error fetching new subtitles:", err);
+      throw err;
+    }
+  };
+
+  // Fetch only the cues overlapping the part of the timeline on screen
+  const fetchSubtitleWindow = async (
+    projectId: number,
+    start: number,
+    end: number
+  ): Promise<SubtitleEntry[]> => {
+    try {
+      return await fetchAllPages<SubtitleEntry>(
+        `/api/subtitle/projects/${projectId}/subtitles/?start=${start}&end=${end}`
+      );
+    } catch (err) {
+      error.value = "Failed to fetch subtitles";
+      console.error("Error fetching subtitle window:", err);
+      throw err;
+    }
+  };
+
   const updateSubtitle = async (id: number, data: Partial<SubtitleEntry>) => {
     try {
       const response = await apiCall(`/api/subtitle/entries/${id}/`, {
         method: "PATCH",
-        body: JSON.stringify(data)
+        body: JSON.stringify({ revision: revisionOf(id), ...data })
       });
 
       // Update local state
@@ -261,12 +509,101 @@ export const useSubtitleStore = defineStore("subtitle", () => {
     }
   };
 
-  const deleteSubtitle = async (id: number) => {
+  const fetchOverlaps = async (
+    projectId: number,
+    language?: string
+  ): Promise<{ count: number; overlaps: SubtitleOverlap[] }> => {
+    const query = language ? `?language=${encodeURIComponent(language)}` : "";
+    return apiCall(`/api/subtitle/projects/${projectId}/overlaps/${query}`);
+  };
+
+  const fetchCuesAt = async (
+    projectId: number,
+    time: number,
+    language?: string
+  ): Promise<CuesAtTime> => {
+    const params = new URLSearchParams({ time: String(time) });
+    if (language) {
+      params.set("language", language);
+    }
+    return apiCall(`/api/subtitle/projects/${projectId}/cues_at/?${params}`);
+  };
+
+  // Apply many creates, updates and deletes in one request and one transaction
+  const bulkEditSubtitles = async (
+    projectId: number,
+    changes: SubtitleBulkEdit
+  ): Promise<SubtitleBulkResult> => {
+    const response = await fetch(`${API_BASE_URL}/api/subtitle/entries/bulk/`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json"
+      },
+      body: JSON.stringify({ project: projectId, ...changes })
+    });
+
+    if (!response.ok) {
+      // 400 responses carry the errors of each rejected item; nothing was written
+      const body = await response.json().catch(() => null);
+      error.value = "Failed to save subtitles";
+      throw new Error(
+        body ? JSON.stringify(body.errors ?? body) : `Bulk edit failed: ${response.status}`
+      );
+    }
+
+    const result: SubtitleBulkResult = await response.json();
+
+    // Update local state
+    const deleted = new Set(result.deleted);
+    const updated = new Map(result.updated.map((entry) => [entry.id, entry]));
+    subtitles.value = subtitles.value
+      .filter((s) => !deleted.has(s.id))
+      .map((s) => (updated.has(s.id) ? { ...s, ...updated.get(s.id) } : s));
+    for (const entry of result.created) {
+      const { index, ...fields } = entry;
+      subtitles.value.push({
+        ...(changes.create?.[index] ?? {}),
+        ...fields,
+        project: projectId
+      } as SubtitleEntry);
+    }
+    subtitles.value.sort((a, b) => a.start_time - b.start_time);
+
+    return result;
+  };
+
+  // Shift, stretch or framerate-convert every subtitle of a project on the server
+  const retimeSubtitles = async (
+    projectId: number,
+    options:
+      | { mode: "offset"; offset: number; language?: string }
+      | { mode: "stretch"; anchors: [[number, number], [number, number]]; language?: string }
+      | { mode: "framerate"; from_fps: number; to_fps: number; language?: string }
+  ) => {
     try {
-      await apiCall(`/api/subtitle/entries/${id}/`, {
-        method: "DELETE"
+      const response = await apiCall(`/api/subtitle/projects/${projectId}/retime/`, {
+        method: "POST",
+        body: JSON.stringify(options)
       });
 
+      // Every time changed; reload rather than recompute locally
+      await getProjectSubtitles(projectId);
+      return response;
+    } catch (err) {
+      error.value = "Failed to retime subtitles";
+      console.error("Error retiming subtitles:", err);
+      throw err;
+    }
+  };
+
+  const deleteSubtitle = async (id: number) => {
+    try {
+      const revision = revisionOf(id);
+      await apiCall(
+        `/api/subtitle/entries/${id}/${revision !== undefined ? `?revision=${revision}` : ""}`,
+        { method: "DELETE" }
+      );
+
       // Remove from local state
       const index = subtitles.value.findIndex((s) => s.id === id);
       if (index !== -1) {
@@ -284,7 +621,8 @@ export const useSubtitleStore = defineStore("subtitle", () => {
       const response = await apiCall(`/api/subtitle/entries/${id}/split/`, {
         method: "POST",
         body: JSON.stringify({
-          split_time: splitTime
+          split_time: splitTime,
+          revision: revisionOf(id)
         })
       });
 
@@ -303,17 +641,24 @@ export const useSubtitleStore = defineStore("subtitle", () => {
     }
   };
 
-  const mergeSubtitle = async (id: number) => {
+  // Merge an entry with the next one, or with the next `count` entries
+  const mergeSubtitle = async (id: number, count = 1) => {
     try {
-      const response = await apiCall(`/api/subtitle/entries/${id}/merge/`, {
-        method: "POST"
-      });
+      const index = subtitles.value.findIndex((s) => s.id === id);
+      const followers = subtitles.value.slice(index + 1, index + 1 + count).map((s) => s.id);
+      const { merged_ids, ...response } = await apiCall(
+        `/api/subtitle/entries/${id}/merge/`,
+        {
+          method: "POST",
+          body: JSON.stringify({ count, revision: revisionOf(id, ...followers) })
+        }
+      );
 
       // Update local state
-      const index = subtitles.value.findIndex((s) => s.id === id);
-      if (index !== -1) {
-        subtitles.value[index] = response;
-      }
+      const merged = new Set<number>(merged_ids);
+      subtitles.value = subtitles.value
+        .filter((s) => !merged.has(s.id))
+        .map((s) => (s.id === id ? response : s));
 
       return response;
     } catch (err) {
@@ -342,6 +687,13 @@ export const useSubtitleStore = defineStore("subtitle", () => {
     styleId?: number
   ): Promise<Blob> => {
     try {
+      const cueCount =
+        syncedProjectId.value === projectId
+          ? subtitles.value.length
+          : projects.value.find((project) => project.id === projectId)
+              ?.subtitle_count ?? 0;
+      const stream = cueCount > STREAM_EXPORT_MIN_CUES;
+
       const url = `${API_BASE_URL}/api/subtitle/projects/${projectId}/export/`;
       const response = await fetch(url, {
         method: "POST",
@@ -350,7 +702,8 @@ export const useSubtitleStore = defineStore("subtitle", () => {
         },
         body: JSON.stringify({
           format,
-          style_id: styleId
+          style_id: styleId,
+          stream
         })
       });
 
@@ -360,7 +713,19 @@ export const useSubtitleStore = defineStore("subtitle", () => {
         );
       }
 
-      return response.blob();
+      if (stream) {
+        return response.blob();
+      }
+
+      // Cached export: the file is reused until the cues or the style change
+      const { download_url } = await response.json();
+      const download = await fetch(`${API_BASE_URL}${download_url}`);
+      if (!download.ok) {
+        throw new Error(
+          `Export download failed: ${download.status} ${download.statusText}`
+        );
+      }
+      return download.blob();
     } catch (err) {
       error.value = "Failed to export subtitles";
       console.error("Error exporting subtitles:", err);
@@ -368,6 +733,104 @@ export const useSubtitleStore = defineStore("subtitle", () => {
     }
   };
 
+  // Queue a burn-in render; progress arrives as render_progress events
+  const embedSubtitles = async (
+    projectId: number,
+    options: {
+      style: string;
+      font_size: number;
+      font_color: string;
+      outline_color: string;
+    }
+  ): Promise<RenderJob> => {
+    const response = await fetch(
+      `${API_BASE_URL}/api/subtitle/projects/${projectId}/embed_subtitles/`,
+      {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json"
+        },
+        body: JSON.stringify(options)
+      }
+    );
+
+    if (!response.ok) {
+      throw new Error(`Render failed: ${response.status} ${response.statusText}`);
+    }
+
+    return response.json();
+  };
+
+  // Burn the subtitles into a few low-resolution seconds around a timestamp
+  const previewSubtitles = async (
+    projectId: number,
+    options: {
+      style: string;
+      font_size: number;
+      font_color: string;
+      outline_color: string;
+      timestamp: number;
+      seconds?: number;
+    }
+  ): Promise<Blob> => {
+    const response = await fetch(
+      `${API_BASE_URL}/api/subtitle/projects/${projectId}/preview/`,
+      {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json"
+        },
+        body: JSON.stringify(options)
+      }
+    );
+
+    if (!response.ok) {
+      throw new Error(`Preview failed: ${response.status} ${response.statusText}`);
+    }
+
+    return response.blob();
+  };
+
+  // Queue a copy of the video with the subtitles as selectable tracks
+  const muxSubtitles = async (
+    projectId: number,
+    options: {
+      container: "mp4" | "mkv";
+      languages?: string[];
+      subtitle_format?: "srt" | "ass";
+    }
+  ): Promise<RenderJob> => {
+    const response = await fetch(
+      `${API_BASE_URL}/api/subtitle/projects/${projectId}/mux/`,
+      {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json"
+        },
+        body: JSON.stringify(options)
+      }
+    );
+
+    if (!response.ok) {
+      throw new Error(`Mux failed: ${response.status} ${response.statusText}`);
+    }
+
+    return response.json();
+  };
+
+  const cancelRender = async (jobId: number): Promise<RenderJob> => {
+    const response = await fetch(
+      `${API_BASE_URL}/api/subtitle/renders/${jobId}/cancel/`,
+      { method: "POST" }
+    );
+
+    if (!response.ok) {
+      throw new Error(`Cancel failed: ${response.status} ${response.statusText}`);
+    }
+
+    return response.json();
+  };
+
   const fetchExports = async (projectId?: number) => {
     try {
       const url = projectId
@@ -424,6 +887,7 @@ export const useSubtitleStore = defineStore("subtitle", () => {
     projects,
     currentProject,
     subtitles,
+    syncedRevision,
     styles,
     exports,
     loading,
@@ -440,13 +904,25 @@ export const useSubtitleStore = defineStore("subtitle", () => {
     fetchProject,
     uploadVideo,
     getProjectStatus,
+    subscribeToProgress,
     getProjectSubtitles,
+    syncSubtitles,
+    fetchNewSubtitles,
+    fetchSubtitleWindow,
     updateSubtitle,
+    bulkEditSubtitles,
+    retimeSubtitles,
+    fetchOverlaps,
+    fetchCuesAt,
     deleteSubtitle,
     splitSubtitle,
     mergeSubtitle,
     fetchStyles,
     exportSubtitles,
+    embedSubtitles,
+    previewSubtitles,
+    muxSubtitles,
+    cancelRender,
     fetchExports,
     deleteProject,
     clearError,
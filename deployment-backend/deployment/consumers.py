@@ -60,5 +60,28 @@ class UploadProgressConsumer(AsyncWebsocketConsumer):
             'processed': event['processed'],
             'total': event['total'],
             'current_file': event['current_file'],
-            'project_id': event['project_id']
-        })) 
\ No newline at end of file
+            'project_id': event['project_id'],
+            'stage': event.get('stage'),
+            'segments_emitted': event.get('segments_emitted', 0),
+            'error': event.get('error')
+        })) 
+
+    async def subtitle_segments(self, event):
+        """Handle subtitle entries stored while transcription is running"""
+        await self.send(text_data=json.dumps({
+            'type': 'subtitle_segments',
+            'project_id': event['project_id'],
+            'subtitles': event['subtitles']
+        }))
+
+    async def render_progress(self, event):
+        """Handle render job progress (subtitle burn-in)"""
+        await self.send(text_data=json.dumps({
+            'type': 'render_progress',
+            'project_id': event['project_id'],
+            'job_id': event['job_id'],
+            'status': event['status'],
+            'progress': event['progress'],
+            'error': event.get('error'),
+            'download_url': event.get('download_url')
+        }))
\ No newline at end of file
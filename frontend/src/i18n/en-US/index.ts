@@ -392,6 +392,8 @@ export default {
     outputFilename: "Output Filename",
     embedButton: "Embed Subtitles",
     previewStyle: "Preview Style",
+    previewAt: "Preview at (seconds)",
+    previewFailed: "Failed to render preview",
     processing: "Processing...",
     preparingVideo: "Preparing video...",
     extractingSubtitles: "Extracting subtitles...",
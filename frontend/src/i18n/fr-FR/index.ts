@@ -394,6 +394,8 @@ export default {
     outputFilename: "Nom de Fichier de Sortie",
     embedButton: "Intégrer les Sous-titres",
     previewStyle: "Aperçu du Style",
+    previewAt: "Aperçu à (secondes)",
+    previewFailed: "Échec du rendu de l'aperçu",
     processing: "Traitement...",
     preparingVideo: "Préparation de la vidéo...",
     extractingSubtitles: "Extraction des sous-titres...",
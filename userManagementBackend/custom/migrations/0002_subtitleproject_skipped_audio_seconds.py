@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subtitleproject",
+            name="skipped_audio_seconds",
+            field=models.FloatField(
+                blank=True,
+                help_text="Silent audio skipped by the VAD pre-pass, in seconds",
+                null=True,
+            ),
+        ),
+    ]
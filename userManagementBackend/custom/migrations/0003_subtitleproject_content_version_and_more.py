@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-17 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom", "0002_subtitleproject_skipped_audio_seconds"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subtitleproject",
+            name="content_version",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Incremented whenever any of the project's subtitle entries change",
+            ),
+        ),
+        migrations.AddField(
+            model_name="subtitleexport",
+            name="content_version",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Project content_version the file was rendered from"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="subtitleexport",
+            index=models.Index(
+                fields=["project", "format", "style", "content_version"],
+                name="export_cache_key_idx",
+            ),
+        ),
+    ]
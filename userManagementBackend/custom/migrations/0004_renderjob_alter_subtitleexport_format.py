@@ -0,0 +1,110 @@
+# Generated by Django 5.2.4 on 2026-10-17 22:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom", "0003_subtitleproject_content_version_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="subtitleexport",
+            name="format",
+            field=models.CharField(
+                choices=[
+                    ("srt", "SRT"),
+                    ("vtt", "VTT"),
+                    ("ass", "ASS"),
+                    ("txt", "TXT"),
+                    ("burn_in", "Burned-in video"),
+                ],
+                max_length=10,
+            ),
+        ),
+        migrations.CreateModel(
+            name="RenderJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("burn_in", "Burn-in")],
+                        default="burn_in",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        default="queued",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "options",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Render parameters (style, font size, colors)",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.FloatField(default=0.0, help_text="Percent complete (0-100)"),
+                ),
+                (
+                    "content_version",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Project content_version the render was started from",
+                    ),
+                ),
+                ("cancel_requested", models.BooleanField(default=False)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "export",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="render_jobs",
+                        to="custom.subtitleexport",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="render_jobs",
+                        to="custom.subtitleproject",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Render Job",
+                "verbose_name_plural": "Render Jobs",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom", "0004_renderjob_alter_subtitleexport_format"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="renderjob",
+            name="kind",
+            field=models.CharField(
+                choices=[("burn_in", "Burn-in"), ("mux", "Subtitle track mux")],
+                default="burn_in",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="renderjob",
+            name="options",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Render parameters (style and colors, or container and languages)",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="subtitleexport",
+            name="format",
+            field=models.CharField(
+                choices=[
+                    ("srt", "SRT"),
+                    ("vtt", "VTT"),
+                    ("ass", "ASS"),
+                    ("txt", "TXT"),
+                    ("burn_in", "Burned-in video"),
+                    ("mux_mp4", "MP4 with subtitle tracks"),
+                    ("mux_mkv", "MKV with subtitle tracks"),
+                ],
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom", "0005_alter_renderjob_kind_alter_subtitleexport_format"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="font_name",
+            field=models.CharField(default="Arial", max_length=100),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="font_size",
+            field=models.PositiveIntegerField(
+                default=24, help_text="Font size at a 288-line script resolution"
+            ),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="primary_color",
+            field=models.CharField(
+                default="white", help_text="Color name, #RRGGBB or #RRGGBBAA", max_length=20
+            ),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="outline_color",
+            field=models.CharField(
+                default="black",
+                help_text="Outline color, or box color for an opaque box",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="back_color",
+            field=models.CharField(default="black", help_text="Shadow color", max_length=20),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="bold",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="italic",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="border_style",
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, "Outline and shadow"), (3, "Opaque box")], default=1
+            ),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="outline",
+            field=models.FloatField(
+                default=2.0, help_text="Outline width, or box padding for an opaque box"
+            ),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="shadow",
+            field=models.FloatField(default=1.0, help_text="Shadow offset"),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="alignment",
+            field=models.PositiveSmallIntegerField(
+                default=2, help_text="Numpad position (2 = bottom center)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="margin_v",
+            field=models.PositiveIntegerField(default=10, help_text="Vertical margin"),
+        ),
+        migrations.AddField(
+            model_name="subtitlestyle",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1, help_text="Incremented on every change, keys compiled styles"
+            ),
+        ),
+    ]
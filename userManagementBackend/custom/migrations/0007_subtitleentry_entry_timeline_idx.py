@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom", "0006_subtitlestyle_rendering_fields"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="subtitleentry",
+            index=models.Index(
+                fields=["project", "start_time"], name="entry_timeline_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom", "0007_subtitleentry_entry_timeline_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subtitleentry",
+            name="revision",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Project content_version of the last change to this entry",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="subtitleentry",
+            index=models.Index(
+                fields=["project", "revision"], name="entry_revision_idx"
+            ),
+        ),
+        migrations.CreateModel(
+            name="SubtitleChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "revision",
+                    models.PositiveIntegerField(
+                        help_text="content_version this change produced"
+                    ),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("deleted", "Deleted"),
+                            ("split", "Split"),
+                            ("merged", "Merged"),
+                            ("bulk", "Bulk edit"),
+                            ("retimed", "Retimed"),
+                            ("transcribed", "Transcribed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "deleted_ids",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="IDs of the entries this change deleted",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="changes",
+                        to="custom.subtitleproject",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Subtitle Change",
+                "verbose_name_plural": "Subtitle Changes",
+                "ordering": ["revision"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("project", "revision"), name="unique_change_revision"
+                    )
+                ],
+            },
+        ),
+    ]
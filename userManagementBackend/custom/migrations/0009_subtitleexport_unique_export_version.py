@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+def remove_duplicate_exports(apps, schema_editor):
+    """Keep the newest of any text exports rendered twice for the same version"""
+    SubtitleExport = apps.get_model("custom", "SubtitleExport")
+    seen = set()
+    for export in SubtitleExport.objects.filter(
+        format__in=["srt", "vtt", "ass", "txt"]
+    ).order_by("-id"):
+        key = (export.project_id, export.format, export.style_id, export.content_version)
+        if key in seen:
+            export.delete()
+        else:
+            seen.add(key)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("custom", "0008_subtitleentry_revision_subtitlechange"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_exports, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="subtitleexport",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("format__in", ["srt", "vtt", "ass", "txt"])),
+                fields=("project", "format", "style", "content_version"),
+                name="unique_export_version",
+                nulls_distinct=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,143 @@
+"""
+Tests for the bulk edit action on subtitle entries.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from custom.models.subtitle_models import SubtitleEntry, SubtitleProject
+from custom.services.subtitle_service import RevisionConflict, SubtitleService
+
+User = get_user_model()
+
+BULK_URL = '/api/subtitle/entries/bulk/'
+
+
+class BulkEditTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create(username='bulk_user', email='bulk@example.com')
+        self.project = SubtitleProject.objects.create(
+            user=user, name='bulk', video_file='videos/test.mp4', status='completed'
+        )
+        SubtitleService.save_transcription(self.project, [{
+            'start_time': i * 2.0,
+            'end_time': i * 2.0 + 1.5,
+            'text': f"cue {i}",
+        } for i in range(4)])
+        self.ids = list(
+            SubtitleEntry.objects.filter(project=self.project).order_by('start_time').values_list('id', flat=True)
+        )
+        self.project.refresh_from_db()
+
+    def snapshot(self):
+        return list(SubtitleEntry.objects.filter(project=self.project).order_by('id').values_list(
+            'id', 'start_time', 'end_time', 'text'
+        ))
+
+    def test_mixed_update_and_delete(self):
+        version = self.project.content_version
+        response = self.client.post(BULK_URL, {
+            'project': self.project.id,
+            'update': [
+                {'id': self.ids[0], 'text': 'first'},
+                {'id': self.ids[1], 'start_time': 2.5, 'end_time': 3.0},
+            ],
+            'delete': [self.ids[2]],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['deleted'], [self.ids[2]])
+        self.assertEqual({entry['id'] for entry in response.data['updated']}, {self.ids[0], self.ids[1]})
+        # One revision for the whole batch
+        self.assertEqual(response.data['content_version'], version + 1)
+
+        entries = SubtitleEntry.objects.in_bulk()
+        self.assertNotIn(self.ids[2], entries)
+        self.assertEqual(entries[self.ids[0]].text, 'first')
+        self.assertEqual((entries[self.ids[1]].start_time, entries[self.ids[1]].end_time), (2.5, 3.0))
+        self.assertTrue(entries[self.ids[0]].is_edited)
+        self.assertEqual(entries[self.ids[3]].text, 'cue 3')
+
+    def test_invalid_times_are_rejected(self):
+        before = self.snapshot()
+        response = self.client.post(BULK_URL, {
+            'project': self.project.id,
+            'update': [{'id': self.ids[0], 'start_time': 5.0, 'end_time': 4.0}],
+            'create': [{'start_time': 9.0, 'end_time': 8.0, 'text': 'backwards'}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(0, response.data['errors']['update'])
+        self.assertIn(0, response.data['errors']['create'])
+        self.assertEqual(self.snapshot(), before)
+
+    def test_invalid_item_rolls_back_the_batch(self):
+        before = self.snapshot()
+        response = self.client.post(BULK_URL, {
+            'project': self.project.id,
+            'update': [{'id': self.ids[0], 'text': 'changed'}],
+            'delete': [self.ids[1]],
+            # Start after end: the whole batch is refused
+            'create': [{'start_time': 20.0, 'end_time': 21.0, 'text': 'ok'},
+                       {'start_time': 23.0, 'end_time': 22.0, 'text': 'bad'}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data['errors']['create']), [1])
+        self.assertEqual(self.snapshot(), before)
+
+    def test_write_failure_rolls_back_the_batch(self):
+        before = self.snapshot()
+        version = self.project.content_version
+        with mock.patch.object(SubtitleEntry.objects, 'bulk_create', side_effect=DatabaseError('insert failed')):
+            with self.assertRaises(DatabaseError):
+                self.client.post(BULK_URL, {
+                    'project': self.project.id,
+                    'update': [{'id': self.ids[0], 'text': 'changed'}],
+                    'delete': [self.ids[1]],
+                    'create': [{'start_time': 20.0, 'end_time': 21.0, 'text': 'new'}],
+                }, format='json')
+
+        # The delete, the update and the version bump ran before the insert failed
+        self.assertEqual(self.snapshot(), before)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.content_version, version)
+
+    def test_duplicate_update_ids_are_rejected(self):
+        before = self.snapshot()
+        response = self.client.post(BULK_URL, {
+            'project': self.project.id,
+            'update': [{'id': self.ids[0], 'text': 'one'}, {'id': self.ids[0], 'text': 'two'}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_updates_apply_to_fresh_rows(self):
+        # Read and validated by the view before another edit moved the cue
+        updates = [(self.ids[0], {'text': 'first'}), (self.ids[1], {'start_time': 2.5, 'end_time': 3.0})]
+        SubtitleEntry.objects.filter(pk=self.ids[0]).update(end_time=1.8)
+
+        SubtitleService.apply_bulk(self.project, [], updates, [])
+
+        entries = SubtitleEntry.objects.in_bulk(self.ids[:2])
+        # Only the fields an item changes are written
+        self.assertEqual((entries[self.ids[0]].text, entries[self.ids[0]].end_time), ('first', 1.8))
+        self.assertEqual((entries[self.ids[1]].start_time, entries[self.ids[1]].end_time), (2.5, 3.0))
+
+    def test_update_of_an_entry_deleted_meanwhile_conflicts(self):
+        updates = [(self.ids[0], {'text': 'first'}), (self.ids[1], {'text': 'second'})]
+        SubtitleEntry.objects.filter(pk=self.ids[1]).delete()
+        version = self.project.content_version
+
+        with self.assertRaises(RevisionConflict) as ctx:
+            SubtitleService.apply_bulk(self.project, [], updates, [])
+
+        self.assertEqual(ctx.exception.deleted_ids, [self.ids[1]])
+        self.assertEqual(SubtitleEntry.objects.get(pk=self.ids[0]).text, 'cue 0')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.content_version, version)
@@ -0,0 +1,160 @@
+"""
+Split and merge of subtitle entries, alone and concurrently.
+
+The concurrent tests need real row locks (SubtitleService.lock_project is a
+no-op without SELECT ... FOR UPDATE), so they are skipped on SQLite; the
+transaction and validation tests run everywhere.
+"""
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from rest_framework.test import APIClient
+
+from custom.models.subtitle_models import SubtitleEntry, SubtitleProject
+from custom.services.interval_index import IntervalIndex
+from custom.services.subtitle_service import SubtitleService
+
+User = get_user_model()
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentSplitMergeTests(TransactionTestCase):
+    def setUp(self):
+        user = User.objects.create(username='concurrent_user', email='concurrent@example.com')
+        self.project = SubtitleProject.objects.create(
+            user=user, name='concurrent', video_file='videos/test.mp4', status='completed'
+        )
+        SubtitleService.save_transcription(self.project, [{
+            'start_time': i * 2.0,
+            'end_time': i * 2.0 + 1.5,
+            'text': f"cue {i}",
+        } for i in range(6)])
+
+    def run_together(self, *requests):
+        """Send the (url, body) requests from one thread each, released at once"""
+        barrier = threading.Barrier(len(requests))
+        responses = [None] * len(requests)
+
+        def send(index, url, body):
+            try:
+                barrier.wait()
+                responses[index] = APIClient().post(url, body, format='json')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=send, args=(i, url, body)) for i, (url, body) in enumerate(requests)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    def cues(self):
+        return list(SubtitleEntry.objects.filter(project=self.project).values_list('id', 'start_time', 'end_time'))
+
+    def assert_timeline_intact(self, expected_count):
+        cues = self.cues()
+        self.assertEqual(len(cues), expected_count)
+        self.assertEqual(IntervalIndex(cues).overlaps(), [])
+        self.assertEqual(min(start for _, start, _ in cues), 0.0)
+        self.assertEqual(max(end for _, _, end in cues), 11.5)
+
+    def test_conditional_split_and_merge_of_the_same_entry(self):
+        entry = SubtitleEntry.objects.filter(project=self.project).order_by('start_time').first()
+        split, merge = self.run_together(
+            (f"/api/subtitle/entries/{entry.id}/split/", {'split_time': 0.75, 'revision': entry.revision}),
+            (f"/api/subtitle/entries/{entry.id}/merge/", {'count': 1, 'revision': entry.revision}),
+        )
+
+        # Both were based on the same revision: whichever runs second is refused
+        self.assertEqual(sorted([split.status_code, merge.status_code]), [200, 409])
+        if split.status_code == 200:
+            self.assert_timeline_intact(7)
+        else:
+            self.assert_timeline_intact(5)
+
+    def test_unconditional_split_and_merge_serialize(self):
+        first, second = SubtitleEntry.objects.filter(project=self.project).order_by('start_time')[:2]
+        split, merge = self.run_together(
+            (f"/api/subtitle/entries/{second.id}/split/", {'split_time': 2.75}),
+            (f"/api/subtitle/entries/{first.id}/merge/", {'count': 1}),
+        )
+
+        # The second request waits on the project lock and then sees the first one's result
+        self.assertEqual(merge.status_code, 200)
+        if split.status_code == 200:
+            # Split first: the merge absorbed the first half of the split cue
+            self.assert_timeline_intact(6)
+        else:
+            # Merge first: the split entry was merged away, before or after the lookup
+            self.assertIn(split.status_code, (404, 409))
+            self.assert_timeline_intact(5)
+
+
+class SplitMergeTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create(username='split_merge_user', email='split_merge@example.com')
+        self.project = SubtitleProject.objects.create(
+            user=user, name='split-merge', video_file='videos/test.mp4', status='completed'
+        )
+        SubtitleService.save_transcription(self.project, [{
+            'start_time': i * 2.0,
+            'end_time': i * 2.0 + 1.5,
+            'text': f"cue {i}",
+        } for i in range(3)])
+        self.entries = list(SubtitleEntry.objects.filter(project=self.project).order_by('start_time'))
+        self.project.refresh_from_db()
+        self.before = self.snapshot()
+
+    def snapshot(self):
+        self.project.refresh_from_db()
+        return self.project.content_version, list(
+            SubtitleEntry.objects.filter(project=self.project).order_by('id').values_list(
+                'id', 'start_time', 'end_time', 'text'
+            )
+        )
+
+    def post(self, entry, action, body):
+        return self.client.post(f"/api/subtitle/entries/{entry.id}/{action}/", body, format='json')
+
+    def test_repeated_split_is_validated_against_the_shortened_cue(self):
+        entry = self.entries[0]
+        self.assertEqual(self.post(entry, 'split', {'split_time': 0.75}).status_code, 200)
+        # A double click sends the same split again: the cue now ends at 0.75
+        self.assertEqual(self.post(entry, 'split', {'split_time': 0.75}).status_code, 400)
+        self.assertEqual(SubtitleEntry.objects.filter(project=self.project).count(), 4)
+
+    def test_split_at_a_boundary_changes_nothing(self):
+        for split_time in (0.0, 1.5):
+            response = self.post(self.entries[0], 'split', {'split_time': split_time})
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.snapshot(), self.before)
+
+    def test_merge_with_too_few_followers_changes_nothing(self):
+        self.assertEqual(self.post(self.entries[1], 'merge', {'count': 2}).status_code, 400)
+        self.assertEqual(self.post(self.entries[2], 'merge', {'count': 1}).status_code, 400)
+        self.assertEqual(self.snapshot(), self.before)
+
+    def test_merge_based_on_a_stale_revision_conflicts(self):
+        revision = self.project.content_version
+        follower = self.entries[1]
+        follower.text = 'edited elsewhere'
+        follower.save()
+        before = self.snapshot()
+
+        response = self.post(self.entries[0], 'merge', {'count': 1, 'revision': revision})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([entry['id'] for entry in response.data['conflicts']], [follower.id])
+        self.assertEqual(self.snapshot(), before)
+
+    def test_failed_split_write_rolls_back(self):
+        with mock.patch.object(SubtitleEntry.objects, 'bulk_update', side_effect=DatabaseError('update failed')):
+            with self.assertRaises(DatabaseError):
+                SubtitleService.split_entry(self.entries[0].id, 0.75)
+
+        # The new half and the version bump were written before the update failed
+        self.assertEqual(self.snapshot(), self.before)
@@ -0,0 +1,109 @@
+"""
+Tests for the subtitle change log and SubtitleService.changes_since.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from custom.models.subtitle_models import SubtitleChange, SubtitleEntry, SubtitleProject
+from custom.services.subtitle_service import SubtitleService
+
+User = get_user_model()
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(username='sync_user', email='sync@example.com')
+        self.project = SubtitleProject.objects.create(
+            user=user, name='sync', video_file='videos/test.mp4', status='completed'
+        )
+        SubtitleService.save_transcription(self.project, [{
+            'start_time': i * 2.0,
+            'end_time': i * 2.0 + 1.5,
+            'text': f"cue {i}",
+        } for i in range(4)])
+        self.entries = list(SubtitleEntry.objects.filter(project=self.project).order_by('start_time'))
+        self.since = self.project.content_version
+
+    def sync(self):
+        result = SubtitleService.changes_since(self.project, self.since)
+        self.assertFalse(result['full_reload'])
+        self.since = result['revision']
+        return {entry.id for entry in result['changed']}, result['deleted']
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.sync(), (set(), []))
+
+    def test_clear_unedited_entries_keeps_edits(self):
+        edited = self.entries[1]
+        edited.text = 'edited'
+        edited.is_edited = True
+        edited.save()
+        self.sync()
+
+        self.assertEqual(SubtitleService.clear_unedited_entries(self.project), 3)
+        self.assertEqual(list(self.project.subtitle_entries.values_list('id', flat=True)), [edited.id])
+        _, deleted = self.sync()
+        self.assertEqual(sorted(deleted), sorted(e.id for e in self.entries if e.id != edited.id))
+
+    def test_update(self):
+        entry = self.entries[1]
+        entry.text = 'edited'
+        entry.save()
+
+        self.assertEqual(self.sync(), ({entry.id}, []))
+        self.assertEqual(self.since, entry.revision)
+
+    def test_split(self):
+        original, new_entry = SubtitleService.split_entry(self.entries[0].id, 0.75)
+
+        self.assertEqual(self.sync(), ({original.id, new_entry.id}, []))
+        self.assertEqual(original.revision, new_entry.revision)
+
+    def test_merge(self):
+        merged, merged_ids = SubtitleService.merge_entries(self.entries[0].id, 2)
+
+        self.assertEqual(self.sync(), ({merged.id}, sorted(merged_ids)))
+
+    def test_delete(self):
+        # delete() clears the instance's pk
+        deleted_id = self.entries[2].id
+        self.entries[2].delete()
+
+        self.assertEqual(self.sync(), (set(), [deleted_id]))
+
+    def test_sequence_of_edits(self):
+        SubtitleService.split_entry(self.entries[0].id, 0.75)
+        self.sync()
+        deleted_id = self.entries[3].id
+        self.entries[3].delete()
+        entry = self.entries[1]
+        entry.text = 'edited'
+        entry.save()
+
+        # Only what happened since the last sync, one log row per revision
+        self.assertEqual(self.sync(), ({entry.id}, [deleted_id]))
+        self.project.refresh_from_db()
+        self.assertEqual(
+            list(self.project.changes.values_list('revision', flat=True)),
+            list(range(1, self.project.content_version + 1))
+        )
+
+    def test_future_revision_requires_full_reload(self):
+        result = SubtitleService.changes_since(self.project, self.since + 5)
+        self.assertTrue(result['full_reload'])
+
+    @override_settings(SUBTITLE_CHANGE_LOG_RETENTION=10)
+    def test_revision_older_than_retention_requires_full_reload(self):
+        entry = self.entries[0]
+        while self.project.content_version < 50:
+            entry.text = f"edit {self.project.content_version}"
+            entry.save()
+            self.project.refresh_from_db()
+
+        # Revisions older than the retained window are pruned
+        self.assertEqual(SubtitleChange.objects.filter(project=self.project).count(), 10)
+        result = SubtitleService.changes_since(self.project, self.since)
+        self.assertTrue(result['full_reload'])
+
+        self.since = 45
+        self.assertEqual(self.sync(), ({entry.id}, []))
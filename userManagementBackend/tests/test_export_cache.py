@@ -0,0 +1,66 @@
+"""
+Tests for the per-version export cache in ExportService.
+"""
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings, skipIfDBFeature
+
+from custom.models.subtitle_models import SubtitleExport, SubtitleProject
+from custom.services.export_service import ExportService
+from custom.services.subtitle_service import SubtitleService
+
+User = get_user_model()
+
+
+class ExportCacheTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        user = User.objects.create(username='export_user', email='export@example.com')
+        self.project = SubtitleProject.objects.create(
+            user=user, name='export', video_file='videos/test.mp4', status='completed'
+        )
+        SubtitleService.save_transcription(self.project, [{
+            'start_time': i * 2.0,
+            'end_time': i * 2.0 + 1.5,
+            'text': f"cue {i}",
+        } for i in range(3)])
+
+    def test_repeated_request_reuses_the_export(self):
+        export, created = ExportService.get_or_render(self.project, 'srt')
+        self.assertTrue(created)
+        again, created = ExportService.get_or_render(self.project, 'srt')
+        self.assertFalse(created)
+        self.assertEqual(again.pk, export.pk)
+
+    def test_edit_renders_again_and_prunes_the_old_version(self):
+        old, _ = ExportService.get_or_render(self.project, 'srt')
+        entry = self.project.subtitle_entries.first()
+        entry.text = 'edited'
+        entry.save()
+
+        export, created = ExportService.get_or_render(self.project, 'srt')
+        self.assertTrue(created)
+        self.assertNotEqual(export.pk, old.pk)
+        self.assertEqual(list(SubtitleExport.objects.values_list('pk', flat=True)), [export.pk])
+        with open(export.file.path, encoding='utf-8') as f:
+            self.assertIn('edited', f.read())
+
+    @skipIfDBFeature('supports_nulls_distinct_unique_constraints')
+    def test_duplicate_rows_are_tolerated_and_pruned(self):
+        # Without NULLS NOT DISTINCT two concurrent misses can each insert a row
+        self.project.refresh_from_db()
+        for _ in range(2):
+            SubtitleExport.objects.create(
+                project=self.project, format='srt', style_id=None,
+                content_version=self.project.content_version, file='exports/missing.srt'
+            )
+
+        export, created = ExportService.get_or_render(self.project, 'srt')
+        self.assertTrue(created)
+        self.assertEqual(list(SubtitleExport.objects.values_list('pk', flat=True)), [export.pk])
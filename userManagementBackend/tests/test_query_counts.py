@@ -0,0 +1,49 @@
+"""
+Query-count regression tests for the subtitle list endpoints.
+
+Each listing must stay at one query no matter how many rows it returns.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from custom.models.subtitle_models import SubtitleExport, SubtitleProject, SubtitleStyle
+from custom.services.subtitle_service import SubtitleService
+
+User = get_user_model()
+
+
+class ListQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='query_count_user', email='queries@example.com')
+        style = SubtitleStyle.objects.create(name='query-count', css_class='query-count')
+        for i in range(5):
+            project = SubtitleProject.objects.create(
+                user=user, name=f"project {i}", video_file='videos/test.mp4', status='completed'
+            )
+            SubtitleService.save_transcription(project, [{
+                'start_time': n * 2.0,
+                'end_time': n * 2.0 + 1.5,
+                'text': f"cue {n}",
+            } for n in range(10)])
+            SubtitleExport.objects.create(project=project, format='srt', file='exports/test.srt')
+            SubtitleExport.objects.create(project=project, format='ass', file='exports/test.ass', style=style)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assert_list_queries(self, url, expected_rows):
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), expected_rows)
+
+    def test_project_list_is_one_query(self):
+        self.assert_list_queries('/api/subtitle/projects/', 5)
+
+    def test_entry_list_is_one_query(self):
+        self.assert_list_queries('/api/subtitle/entries/', 50)
+
+    def test_export_list_is_one_query(self):
+        self.assert_list_queries('/api/subtitle/exports/', 10)
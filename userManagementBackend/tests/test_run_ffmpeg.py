@@ -0,0 +1,39 @@
+"""
+Tests for how run_ffmpeg reports failures and timeouts.
+"""
+import os
+import stat
+import tempfile
+
+from django.test import SimpleTestCase
+
+from custom.services.render_service import RenderTimeout, run_ffmpeg
+
+
+class RunFfmpegTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def script(self, body):
+        # Stands in for ffmpeg: ignores the -progress arguments run_ffmpeg adds
+        path = os.path.join(self.tmp.name, 'ffmpeg')
+        with open(path, 'w') as f:
+            f.write(f"#!/bin/sh\n{body}\n")
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return [path]
+
+    def test_failure_without_timeout_keeps_the_log(self):
+        args = self.script('echo "Invalid data found" >&2\nexit 3')
+        with self.assertRaises(RuntimeError) as ctx:
+            run_ffmpeg(args, 1.0, timeout=30)
+        self.assertNotIsInstance(ctx.exception, RenderTimeout)
+        self.assertIn('status 3', str(ctx.exception))
+        self.assertIn('Invalid data found', str(ctx.exception))
+
+    def test_timeout(self):
+        with self.assertRaises(RenderTimeout):
+            run_ffmpeg(self.script('exec sleep 30'), 1.0, timeout=0.5)
+
+    def test_success(self):
+        run_ffmpeg(self.script('echo progress=end'), 1.0, timeout=30)